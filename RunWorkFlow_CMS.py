@@ -1,13 +1,11 @@
 # -*- coding: utf-8 -*-
 #!/home/number/anaconda2/bin/python
-import matplotlib
-matplotlib.use('Agg')
-import os, getopt, sys, shutil, glob, logging, yaml
+import os
+os.environ.setdefault('MPLBACKEND', 'Agg')  # for cron, set without importing matplotlib before it's needed
+import getopt, sys, shutil, glob, logging, yaml
 import datetime as DT
 from subprocess import check_output
 import numpy as np
-from frontback.frontBackCMS import CMSanalyze
-from frontback.frontBackCMS import CMSsimSetup
 
 
 def Master_CMS_run(inputDict):
@@ -20,6 +18,8 @@ def Master_CMS_run(inputDict):
       None
 
     """
+    # the model stack (netCDF4, scipy, matplotlib, data access) is only loaded when a simulation is handled
+    from frontback.frontBackCMS import CMSanalyze, CMSsimSetup
     ## unpack Dictionary
     version_prefix = inputDict['version_prefix']
     endTime = inputDict['endTime']
@@ -81,6 +81,10 @@ def Master_CMS_run(inputDict):
 
     errors, errorDates = [],[]
     curdir = os.getcwd()
+    if pFlag == True and inputDict.get('backgroundPlots', False) == True:
+        # plots are made in the background while the next window runs, failures are reported at the end
+        from plotting.plotQueue import PlotQueue
+        inputDict['plotQueue'] = PlotQueue(maxJobs=inputDict.get('backgroundPlotJobs', 2))
     # ______________________________decide process and run _____________________________
     # run the process through each of the above dates
     print '\n-\n-\nMASTER WorkFLOW for SIMULATIONS\n-\n-\n'
@@ -114,6 +118,8 @@ def Master_CMS_run(inputDict):
                 CMSanalyze(time, inputDict=inputDict)
 
             if pFlag == True and DT.date.today() == projectEnd:
+                if inputDict.get('plotQueue', None) is not None:
+                    inputDict['plotQueue'].wait()  # the plots have to be made before they're moved
                 # move files
                 moveFnames = glob.glob(curdir + 'cmtb*.png')
                 moveFnames.extend(glob.glob(curdir + 'cmtb*.gif'))
@@ -127,6 +133,9 @@ def Master_CMS_run(inputDict):
             print e
             logging.exception('\nERROR FOUND @ %s\n' %time, exc_info=True)
             os.chdir(curdir)
+    if inputDict.get('plotQueue', None) is not None:
+        for name, message in inputDict.pop('plotQueue').report().items():  # plot failures don't fail the window
+            logging.error('\nPLOT FAILED %s\n%s' % (name, message))
 
 
 if __name__ == "__main__":
@@ -1,14 +1,11 @@
 # -*- coding: utf-8 -*-
 #!/home/number/anaconda2/bin/python
-import matplotlib
-matplotlib.use('Agg')
-import os, getopt, sys, shutil, logging
+import os
+os.environ.setdefault('MPLBACKEND', 'Agg')  # for cron, set without importing matplotlib before it's needed
+import getopt, sys, shutil, logging
 import numpy as np
 from subprocess import check_output
 import datetime as DT
-from frontback.frontBackCSHORE import CSHORE_analysis, CSHOREsimSetup
-from prepdata import inputOutput
-from getdatatestbed.getDataFRF import getDataTestBed
 import yaml
 import platform
 
@@ -33,6 +30,10 @@ def master_CSHORE_run(inputDict):
       None
 
     """
+    # the model stack (netCDF4, scipy, matplotlib, data access) is only loaded when a simulation is handled
+    from frontback.frontBackCSHORE import CSHORE_analysis, CSHOREsimSetup
+    from prepdata import inputOutput
+    from getdatatestbed.getDataFRF import getDataTestBed
 
     version_prefix = inputDict['version_prefix']
     endTime = inputDict['endTime']
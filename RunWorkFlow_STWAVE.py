@@ -1,12 +1,11 @@
 # -*- coding: utf-8 -*-
 #!/home/number/anaconda2/bin/python
-import matplotlib
-matplotlib.use('Agg')
+import os
+os.environ.setdefault('MPLBACKEND', 'Agg')  # for cron, set without importing matplotlib before it's needed
 import datetime as DT
 from subprocess import check_output
 import numpy as np
-from frontback.frontBackSTWAVE import STanalyze, STsimSetup
-import os, getopt, sys, shutil, glob, platform, logging, yaml
+import getopt, sys, shutil, glob, platform, logging, yaml
 
 def Master_STWAVE_run(inputDict):
     """This will run STWAVE with any version prefix given start, end, and timestep
@@ -31,6 +30,8 @@ def Master_STWAVE_run(inputDict):
       None
 
     """
+    # the model stack (netCDF4, scipy, matplotlib, data access) is only loaded when a simulation is handled
+    from frontback.frontBackSTWAVE import STanalyze, STsimSetup
     # globals:
     model = 'STWAVE'
     inputDict['model'] = model
@@ -117,6 +118,10 @@ def Master_STWAVE_run(inputDict):
 
     errors, errorDates = [],[]
     curdir = os.getcwd()
+    if pFlag == True and inputDict.get('backgroundPlots', False) == True:
+        # plots are made in the background while the next window runs, failures are reported at the end
+        from plotting.plotQueue import PlotQueue
+        inputDict['plotQueue'] = PlotQueue(maxJobs=inputDict.get('backgroundPlotJobs', 2))
     # run the process through each of the above dates
     print '\n-\n-\nMASTER WorkFLOW for STWAVE SIMULATIONS\n-\n-\n'
     print 'Batch Process Start: %s     Finish: %s '% (d1, d2)
@@ -166,6 +171,8 @@ def Master_STWAVE_run(inputDict):
             if analyzeFlag == True:
                 STanalyze(time, inputDict)
             if pFlag == True and DT.date.today() == d2.date():
+                if inputDict.get('plotQueue', None) is not None:
+                    inputDict['plotQueue'].wait()  # the plots have to be made before they're moved
                 print '**\n Moving Plots! \n &&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&'
                 # move files
                 moveFnames = glob.glob(datadir + '/figures/CMTB*.png')
@@ -180,6 +187,9 @@ def Master_STWAVE_run(inputDict):
             # print e
             print e.args
             logging.exception('\nERROR FOUND @ %s\n' %time, exc_info=True)
+    if inputDict.get('plotQueue', None) is not None:
+        for name, message in inputDict.pop('plotQueue').report().items():  # plot failures don't fail the window
+            logging.error('\nPLOT FAILED %s\n%s' % (name, message))
 
 if __name__ == "__main__":
     opts, args = getopt.getopt(sys.argv[1:], "h", ["help"])
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""Memory benchmark of makenc_CSHORErun on a multi-day MOBILE run.  Synthetic hourly CSHORE output on a model grid
+shorter than the netCDF grid (so the data are padded, masked and flipped) is written in a forked process, and the
+peak memory the write needed on top of the data it was handed is reported as a multiple of the size of that data.
+Every extra full copy of the CSHORE fields adds about 1x.  Needs the testbedutils submodule and the makenc
+requirements, Linux only (fork, /proc), run from the root of the repo:
+
+    python docs/benchmarks/cshoreMemory.py --days 30
+"""
+import argparse, os, resource, shutil, sys, tempfile, time, traceback
+import numpy as np
+repoDir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, repoDir)
+import makenc
+
+fields = ['aveE', 'stdE', 'aveN', 'stdN', 'waveHs', 'waveMeanDirection', 'waterLevel', 'stdWaterLevel', 'setup',
+          'qbx', 'qsx', 'qby', 'qsy', 'probabilitySuspension', 'probabilityMovement', 'suspendedSedVolume',
+          'bottomElevation']
+
+def mobileRun(days, offshore=914, onshore=60):
+    """hourly MOBILE output as CSHORE_analysis hands it to makenc_CSHORErun, the model grid runs offshore to onshore"""
+    rand = np.random.RandomState(0)
+    xFRF = np.arange(offshore, onshore - 1, -1.)
+    nt = days * 24
+    dataDict = dict((key, rand.randn(nt, xFRF.size)) for key in fields)
+    dataDict['bottomElevation'][:, -10:] = np.nan  # dry nodes are masked
+    dataDict.update({'xFRF': xFRF, 'time': np.arange(nt) * 3600. + 1.5e9, 'runup2perc': rand.randn(nt),
+                     'runupMean': rand.randn(nt), 'surveyNumber': np.ones(nt), 'profileNumber': np.ones(nt) * 945,
+                     'bathymetryDate': np.ones(nt) * 1.5e9, 'yFRF': 945.})
+    return dataDict
+
+def residentMB():
+    """current resident memory of this process"""
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * resource.getpagesize() / 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--days', type=int, default=30, help='days of hourly model output')
+    parser.add_argument('--workDir', default=None, help='where to write the file (Default: system temp)')
+    args = parser.parse_args()
+    workDir = tempfile.mkdtemp(dir=args.workDir)
+    globalYaml = os.path.join(repoDir, 'yaml_files/CSHORE/CSHORE_mobile_global.yml')
+    varYaml = os.path.join(repoDir, 'yaml_files/CSHORE/CSHORE_mobile_var.yml')
+    try:
+        dataDict = mobileRun(args.days)
+        makenc.import_template_file(globalYaml), makenc.import_template_file(varYaml)  # parsed before the fork
+        inputMB = sum([np.asarray(value).nbytes for value in dataDict.values()]) / 1e6
+        before = residentMB()
+        t0 = time.time()
+        pid = os.fork()
+        if pid == 0:  # the child writes the file and reports its peak memory through its exit status
+            try:
+                makenc.makenc_CSHORErun(os.path.join(workDir, 'CMTB-morphModels_CSHORE_MOBILE_test.nc'), dataDict,
+                                        globalYaml, varYaml)
+            except BaseException:
+                traceback.print_exc()
+                os._exit(1)
+            os._exit(0)
+        pid, status, usage = os.wait4(pid, 0)
+        assert status == 0, 'makenc_CSHORErun failed'
+        peakMB = usage.ru_maxrss / 1e3  # kilobytes on Linux
+        print('%d days, %.1f MB of CSHORE output: write %.2f s, peak %.1f MB over the data (%.2fx the output)'
+              % (args.days, inputMB, time.time() - t0, peakMB - before, (peakMB - before) / inputMB))
+    finally:
+        shutil.rmtree(workDir, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""Equivalence check and benchmark of the CSHORE output rotation in frontBackCSHORE.makeCSHORE_ncdict.  The per pair
+vectorRotation loop it used to run and the [time, x] array rotation it runs now are both applied to a multi-day
+MOBILE sized output with NaN pairs, the currents, their standard deviations, the transport and waveMeanDirection must
+match.  The array rotation is only valid if vectorRotation is linear, that is checked first.  Without the testbedutils
+submodule, stand-ins of vectorRotation and STWangle2geo are used.  Pure numpy, runs on python 2.7 and 3:
+
+    python docs/benchmarks/cshoreRotation.py --days 5
+"""
+import argparse, sys, time
+import numpy as np
+try:
+    from testbedutils.anglesLib import vectorRotation, STWangle2geo
+except ImportError:
+    def vectorRotation(vector, theta=90, axis='z'):
+        """stand-in of testbedutils.anglesLib.vectorRotation, rotates a 2-D vector counter clockwise by theta"""
+        theta = np.deg2rad(theta)
+        return np.dot(np.array([[np.cos(theta), -np.sin(theta)], [np.sin(theta), np.cos(theta)]]), vector)
+
+    def STWangle2geo(STWangle, pierang=71.8, METout=True):
+        """stand-in of testbedutils.anglesLib.STWangle2geo, shore normal angles to geographic angles"""
+        return np.mod(270 - np.asarray(STWangle) - (90 - pierang) + (180 if METout else 0), 360)
+
+def checkLinear(theta, trials=100):
+    """Checks vectorRotation(a * u + b * v) is a * vectorRotation(u) + b * vectorRotation(v)
+
+    Args:
+      theta (float): rotation angle
+      trials (int): random vectors to try (Default value = 100)
+
+    Returns:
+      None, raises an AssertionError if vectorRotation is not linear
+
+    """
+    rand = np.random.RandomState(0)
+    for tt in range(trials):
+        u, v, (a, b) = rand.randn(2), rand.randn(2), rand.randn(2) * 10
+        assert np.allclose(vectorRotation(a * u + b * v, theta=theta),
+                           a * np.asarray(vectorRotation(u, theta=theta)) + b * np.asarray(vectorRotation(v, theta=theta))), \
+            'vectorRotation is not linear, the array rotation in makeCSHORE_ncdict does not hold'
+
+def loopRotation(hydro, sed, pierang):
+    """the per pair rotation makeCSHORE_ncdict used to run"""
+    dim_t, dim_x = np.shape(hydro['umean'])
+    test_fun = lambda x: vectorRotation(x, theta=pierang + (90 - pierang) + pierang)
+    out = dict((key, np.zeros([dim_t, dim_x])) for key in ['aveE', 'aveN', 'stdE', 'stdN', 'qbx', 'qby', 'qsx', 'qsy'])
+    out['waveMeanDirection'] = np.zeros([dim_t, dim_x]) + np.nan
+    for ii in range(0, len(hydro['umean'])):
+        newV = [test_fun(x) for x in zip(hydro['umean'][ii][:], hydro['vmean'][ii][:])]
+        out['aveE'][ii], out['aveN'][ii] = list(zip(*newV))[0], list(zip(*newV))[1]
+        newStd = [test_fun(x) for x in zip(hydro['ustd'][ii][:], hydro['vstd'][ii][:])]
+        out['stdE'][ii], out['stdN'][ii] = list(zip(*newStd))[0], list(zip(*newStd))[1]
+        t1 = 360 / float(2 * np.pi) * hydro['stheta'][ii]
+        t1[~np.isnan(t1)] = STWangle2geo(t1[~np.isnan(t1)], pierang=pierang)
+        out['waveMeanDirection'][ii] = t1
+        new_qb = [test_fun(x) for x in zip(sed['qbx'][ii][:], sed['qby'][ii][:])]
+        out['qbx'][ii], out['qby'][ii] = list(zip(*new_qb))[0], list(zip(*new_qb))[1]
+        new_qs = [test_fun(x) for x in zip(sed['qsx'][ii][:], sed['qsy'][ii][:])]
+        out['qsx'][ii], out['qsy'][ii] = list(zip(*new_qs))[0], list(zip(*new_qs))[1]
+
+    return out
+
+def arrayRotation(hydro, sed, pierang):
+    """the [time, x] array rotation of makeCSHORE_ncdict"""
+    dim_t, dim_x = np.shape(hydro['umean'])
+    out = {}
+    theta = pierang + (90 - pierang) + pierang
+    rotation = np.array([vectorRotation((1, 0), theta=theta), vectorRotation((0, 1), theta=theta)], dtype=float).T
+    def rotate(x, y):
+        x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+        return rotation[0, 0] * x + rotation[0, 1] * y, rotation[1, 0] * x + rotation[1, 1] * y
+
+    out['aveE'], out['aveN'] = rotate(hydro['umean'], hydro['vmean'])
+    out['stdE'], out['stdN'] = rotate(hydro['ustd'], hydro['vstd'])
+    t1 = np.rad2deg(np.asarray(hydro['stheta'], dtype=float))
+    out['waveMeanDirection'] = np.zeros([dim_t, dim_x]) + np.nan
+    out['waveMeanDirection'][~np.isnan(t1)] = STWangle2geo(t1[~np.isnan(t1)], pierang=pierang)
+    out['qbx'], out['qby'] = rotate(sed['qbx'], sed['qby'])
+    out['qsx'], out['qsy'] = rotate(sed['qsx'], sed['qsy'])
+
+    return out
+
+def mobileOutput(days, dim_x, nanFraction=0.05):
+    """synthetic hourly CSHORE output, nodes that go dry are NaN in one or both components of a pair"""
+    rand = np.random.RandomState(1)
+    shape = (days * 24, dim_x)
+    hydro = dict((key, rand.randn(*shape)) for key in ['umean', 'vmean', 'ustd', 'vstd'])
+    hydro['stheta'] = np.deg2rad(rand.uniform(-60, 60, shape))
+    sed = dict((key, rand.randn(*shape) * 1e-4) for key in ['qbx', 'qby', 'qsx', 'qsy'])
+    for data in [hydro, sed]:
+        for key in data:
+            data[key][rand.uniform(size=shape) < nanFraction] = np.nan
+    hydro['umean'][:, -20:] = np.nan  # dry end of the profile, NaN in both components
+    return hydro, sed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--days', type=int, default=5, help='days of hourly output')
+    parser.add_argument('--nodes', type=int, default=400, help='cross-shore nodes')
+    args = parser.parse_args()
+    pierang = 71.8
+    checkLinear(pierang + (90 - pierang) + pierang)
+    hydro, sed = mobileOutput(args.days, args.nodes)
+    t0 = time.time()
+    old = loopRotation(hydro, sed, pierang)
+    t1 = time.time()
+    new = arrayRotation(hydro, sed, pierang)
+    t2 = time.time()
+    for key in sorted(old):
+        assert np.array_equal(np.isnan(old[key]), np.isnan(new[key])), 'NaNs differ in %s' % key
+        assert np.allclose(old[key], new[key], equal_nan=True), '%s differs' % key
+    print('%d x %d output, %d NaN pairs: loop %.3f s, array %.4f s (%.0fx), all fields match'
+          % (np.shape(hydro['umean']) + (np.isnan(hydro['umean'] + hydro['vmean']).sum(), t1 - t0, t2 - t1,
+             (t1 - t0) / max(t2 - t1, 1e-9))))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""Benchmark of diskless (in memory) netCDF assembly for many small files.  Station sized files (twenty time series
+and a small spectrum, like makenc_Station writes) are written through new_nc_file and write_data_to_nc, on disk
+variable by variable and assembled in memory then written and renamed in one go.  Point --workDir at the netCDF
+directory's file system (e.g. the NFS mount), that's where the difference shows.  Run from the root of the repo:
+
+    python docs/benchmarks/disklessFiles.py --files 200 --workDir /path/on/nfs
+"""
+import argparse, os, shutil, sys, tempfile, time
+import numpy as np
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import makenc
+
+seriesVars = ['var%02d' % ii for ii in range(20)]
+
+def stationTemplate():
+    """a station like variable template"""
+    template = {'_variables': ['time', 'spectra'] + seriesVars,
+                'time': {'name': 'time', 'units': 'seconds since 1970-01-01 00:00:00', 'data_type': 'f8',
+                         'dim': ['time']},
+                'spectra': {'name': 'spectra', 'units': 'm^2/Hz/deg', 'data_type': 'f4',
+                            'dim': ['time', 'waveFrequency', 'waveDirectionBins'], 'fill_value': -999.}}
+    for var in seriesVars:
+        template[var] = {'name': var, 'units': 'm', 'data_type': 'f4', 'dim': ['time'], 'fill_value': -999.,
+                         'long_name': 'station time series', 'standard_name': var}
+    template['_compiled'] = makenc.compile_template(template)
+    return template
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--files', type=int, default=200, help='files to write each way')
+    parser.add_argument('--workDir', default=None, help='where to write the files (Default: system temp)')
+    args = parser.parse_args()
+    template = stationTemplate()
+    rand = np.random.RandomState(0)
+    data = dict((var, rand.randn(24)) for var in seriesVars)
+    data.update({'time': np.arange(24) * 3600., 'spectra': rand.rand(24, 62, 72)})
+    globalAtts = {'title': 'diskless benchmark', 'institution': 'USACE/CHL/Field Research Facility'}
+    workDir = tempfile.mkdtemp(dir=args.workDir)
+    try:
+        for diskless in [False, True]:
+            t0 = time.time()
+            for ff in range(args.files):
+                with makenc.new_nc_file(os.path.join(workDir, 'station%04d.nc' % ff), globalAtts,
+                                        diskless=diskless) as fid:
+                    fid.createDimension('time', 24)
+                    fid.createDimension('waveFrequency', 62)
+                    fid.createDimension('waveDirectionBins', 72)
+                    makenc.write_data_to_nc(fid, template, data)
+            seconds = time.time() - t0
+            print('%-9s %d files in %.2f s, %.1f ms a file' % ('diskless' if diskless else 'on disk', args.files,
+                                                               seconds, seconds / args.files * 1e3))
+    finally:
+        shutil.rmtree(workDir, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
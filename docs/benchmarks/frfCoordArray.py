@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""Equivalence check and benchmark of makenc.FRFcoordArray against the scalar testbedutils.geoprocess.FRFcoord it
+replaced in makenc_FRFGrid and makenc_CSHORErun.  Every node of an FRF grid is converted both ways, the stateplane
+coordinates must agree to a millimeter and lat/lon to 1e-8 degrees.  Needs the testbedutils submodule and the makenc
+requirements (netCDF4, yaml), run from the root of the repo:
+
+    python docs/benchmarks/frfCoordArray.py --dx 10
+"""
+import argparse, os, sys, time
+import numpy as np
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from testbedutils import geoprocess as gp
+import makenc
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--dx', type=float, default=10, help='grid spacing [m] of the FRF grid that is converted')
+    args = parser.parse_args()
+    xx, yy = np.meshgrid(np.arange(50, 1000, args.dx), np.arange(-100, 1100, args.dx))
+    t0 = time.time()
+    scalar = dict((key, np.zeros(np.shape(xx))) for key in ['StateplaneE', 'StateplaneN', 'Lat', 'Lon'])
+    for iy in range(xx.shape[0]):
+        for ix in range(xx.shape[1]):
+            coords = gp.FRFcoord(xx[iy, ix], yy[iy, ix])
+            for key in scalar:
+                scalar[key][iy, ix] = coords[key]
+    t1 = time.time()
+    array = makenc.FRFcoordArray(xx, yy)
+    t2 = time.time()
+    for key, atol in [('StateplaneE', 1e-3), ('StateplaneN', 1e-3), ('Lat', 1e-8), ('Lon', 1e-8)]:
+        assert np.shape(array[key]) == np.shape(xx), '%s has the wrong shape' % key
+        assert np.allclose(array[key], scalar[key], rtol=0, atol=atol), \
+            '%s differs by up to %g' % (key, np.abs(array[key] - scalar[key]).max())
+    assert np.array_equal(array['FRF_X'], xx) and np.array_equal(array['FRF_Y'], yy)
+    print('%d nodes: FRFcoord %.3f s, FRFcoordArray %.4f s (%.0fx), all coordinates match'
+          % (xx.size, t1 - t0, t2 - t1, (t1 - t0) / max(t2 - t1, 1e-9)))
+
+if __name__ == '__main__':
+    main()
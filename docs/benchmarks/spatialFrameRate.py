@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""Frames per second of plotSpatialFieldData.  The figure, colorbar, gauge labels and bathymetry contours are built
+once and reused for every time step, this is timed against the loop plotSpatialFieldData had before (a copy of it
+for the nested STWAVE grid is below), which built the whole figure for each frame.  Nested 5 m STWAVE sized wave
+height fields with direction arrows are written to pngs.  Needs the plotting requirements, run from the root of the
+repo:
+
+    python docs/benchmarks/spatialFrameRate.py --frames 24
+"""
+import argparse, os, shutil, sys, tempfile, time
+import datetime as DT
+os.environ.setdefault('MPLBACKEND', 'Agg')
+import numpy as np
+from matplotlib import pyplot as plt
+import matplotlib.colors as mc
+from scipy.interpolate import RectBivariateSpline
+repoDir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path[:0] = [repoDir, os.path.join(repoDir, 'plotting')]
+from plotting import operationalPlots as oP
+from plottingTools import MidpointNormalize
+
+def nestedHs(frames):
+    """wave height, direction and bathymetry packets on the 5 m nested grid"""
+    xFRF, yFRF = np.arange(0, 1000, 5.), np.arange(-200, 1600, 5.)
+    xx = np.meshgrid(xFRF, yFRF)[0]
+    bathy = np.repeat((0.01 * xx - 1)[np.newaxis], frames, axis=0)
+    Hs = np.array([np.clip(0.01 * xx * (1 + 0.1 * np.sin(tt)), 0, 3) for tt in range(frames)])
+    fieldpacket = {'title': 'Local FRF North Property: Significant wave height $H_s$', 'field': Hs,
+                   'xlabel': 'Longshore distance [m]', 'ylabel': 'Cross-shore distance [m]', 'xcoord': xFRF,
+                   'ycoord': yFRF, 'cblabel': 'Wave height $H_s [m]$',
+                   'time': [DT.datetime(2018, 1, 1) + DT.timedelta(hours=tt) for tt in range(frames)]}
+    return {'bathy': bathy}, fieldpacket, np.zeros_like(Hs) + 10.
+
+def perFrameFigures(contourpacket, fieldpacket, prefix, directions):
+    """the frame loop of plotSpatialFieldData before the figure was reused, for the nested STWAVE grid (nested=True,
+    model='STWAVE', dx = dy = 5 m), a new figure is built, saved and closed for every time step"""
+    decimals, Norm = False, False # setting defaults
+    ycoord, xcoord = fieldpacket['ycoord'], fieldpacket['xcoord']
+    time = fieldpacket['time']
+    numrecs = np.size(fieldpacket['field'], axis=0)
+    clabel_text = fieldpacket['cblabel']
+    colormap = 'GnBu'  # wave height
+    if np.diff((np.nanmin(fieldpacket['field']), np.nanmax(fieldpacket['field']))) < 3:
+        cbar_min = float('{:.3g}'.format(np.nanmin(fieldpacket['field'])))
+        cbar_max = float('{:.3g}'.format(np.nanmax(fieldpacket['field'])))
+        decimals=True
+    else:
+        cbar_min = np.floor(np.nanmin(fieldpacket['field']))
+        cbar_max = np.ceil(np.nanmax(fieldpacket['field']))
+    cbarlabels = np.linspace(cbar_min, cbar_max, num=5, endpoint=True)  # a list of labels
+    # wave gauges in approx position
+    x_pier, y_pier, L_pier = (0, 580), (516, 516), 'FRF Pier'
+    y_8m, x_8m, L_8m = 915, 825, '8m Array'
+    y_5m, x_5m, L_5m = 937, 606, '6m AWAC'
+    y_4m, x_4m = 939, 400
+    y_3m, x_3m, L_3m = 940, 306, '3.5m Aquadopp'
+    x_xp200, y_xp200, L_xp200 = 200, 940, 'XP200m Paros'
+    x_xp150, y_xp150, L_xp150 = 150, 940, 'XP150m Paros'
+    x_xp125, y_xp125, L_xp125 = 125, 950, 'XP125m Paros'
+    fgsize = (6, 9)
+    levels = np.linspace(cbar_min, cbar_max, 35)  # draw 35 levels
+    norm = mc.BoundaryNorm(levels, 256)
+    bathyContour = contourpacket['bathy']
+    if np.ndim(bathyContour) == 2:
+        bathyContour = bathyContour[np.newaxis]
+    bathyIdx = lambda tt: tt if bathyContour.shape[0] == numrecs else 0
+    for tt in range(0, numrecs):
+        plt.figure(figsize=fgsize, dpi=80, tight_layout=True)
+        plt.title(fieldpacket['title'] + '\n%s' % time[tt])
+        if Norm == True:
+            cont = plt.contourf(xcoord, ycoord, fieldpacket['field'][tt, :, :], levels, vmin=cbar_min, vmax=cbar_max,
+                     cmap=colormap, levels=levels, norm=MidpointNormalize(midpoint=0,vmin=cbar_min, vmax=cbar_max))
+        else:
+            cont = plt.contourf(xcoord, ycoord, fieldpacket['field'][tt, :, :], levels, vmin=cbar_min, vmax=cbar_max,
+                     cmap=colormap, levels=levels)
+        Us = -np.rad2deg(np.cos(np.deg2rad(directions[tt])))
+        Vs = -np.rad2deg(np.sin(np.deg2rad(directions[tt])))
+        nx, ny = 14, 25
+        x = np.linspace(xcoord[0], xcoord[-1], nx)
+        y = np.linspace(ycoord[0], ycoord[-1], ny)
+        Us = RectBivariateSpline(ycoord, xcoord, Us)(y, x)
+        Vs = RectBivariateSpline(ycoord, xcoord, Vs)(y, x)
+        locsX, locsY = np.meshgrid(x, y)
+        Q = plt.quiver(locsX, locsY, Us, Vs, pivot='mid', angles='xy')
+        ## write out text labels on plot
+        ptStr = 'or'
+        for xx, yy, label in [(x_8m, y_8m, L_8m), (x_5m, y_5m, L_5m), (x_4m, y_4m, L_3m), (x_3m, y_3m, L_3m)]:
+            plt.plot(xx, yy, ptStr)
+            plt.text(xx, yy, label, fontsize=12, va='bottom', rotation=45, color='white', weight='bold')
+        for xx, yy, label in [(x_xp200, y_xp200, L_xp200), (x_xp150, y_xp150, L_xp150)]:
+            plt.plot(xx, yy, ptStr)
+            plt.text(xx, yy, label, rotation=45, fontsize=12, va='bottom', color='white', weight='bold')
+        plt.plot(x_xp125, y_xp125, ptStr)
+        plt.text(x_xp125, y_xp125, L_xp125, rotation=45, fontsize=12,va='bottom',
+                 color='white', weight='bold',ha='right')
+        plt.plot(x_pier, y_pier, 'k-', linewidth=5)
+        plt.text(x_pier[1], y_pier[1], L_pier, fontsize=12, va='bottom', ha='right',
+                 color='black', rotation=315, weight='bold')
+        cont_labels = [0, 2, 4, 6, 8, 10]  # labels for contours
+        plt.xlim(0, 1000)
+        plt.ylim(-200, 1600)
+        plt.ylabel(fieldpacket['ylabel'])
+        plt.xlabel(fieldpacket['xlabel'])
+        if decimals == True:
+            cbar = plt.colorbar(cont, format='%.3g')
+        else:
+            cbar = plt.colorbar(cont)
+        cbar.set_ticks(cbarlabels)
+        cbar.set_label(clabel_text, fontsize=12)
+        con = plt.contour(xcoord, ycoord, bathyContour[bathyIdx(tt)], levels=cont_labels, colors='k')
+        plt.clabel(con, inline=True, fmt='%d')
+        plt.savefig(os.path.join(prefix +'_{}.png'.format(time[tt].strftime("%Y%m%d%H%M"))))
+        plt.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--frames', type=int, default=24, help='time steps to render')
+    args = parser.parse_args()
+    contourpacket, fieldpacket, directions = nestedHs(args.frames)
+    fieldpacket['fieldRange'] = (np.nanmin(fieldpacket['field']), np.nanmax(fieldpacket['field']))
+    workDir = tempfile.mkdtemp()
+    try:
+        t0 = time.time()
+        perFrameFigures(contourpacket, fieldpacket, os.path.join(workDir, 'perFrame'), directions)
+        perFrame = args.frames / (time.time() - t0)
+        t0 = time.time()
+        oP.plotSpatialFieldData(contourpacket, fieldpacket, os.path.join(workDir, 'reused'), directions=directions)
+        reused = args.frames / (time.time() - t0)
+        print('%d frames: figure per frame %.2f fps, reused figure %.2f fps (%.1fx)'
+              % (args.frames, perFrame, reused, reused / perFrame))
+    finally:
+        shutil.rmtree(workDir, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+"""Timing of the raster draw path of plotSpatialFieldData (raster=True, pcolormesh through a BoundaryNorm with the
+35 contour bands) against the filled contours, on the 5 m nested STWAVE grid (see spatialFrameRate).  The frames are
+rendered into an in memory animation like the gifs STanalyze streams, so png compression isn't timed.  Needs the
+plotting requirements, run from the root of the repo:
+
+    python docs/benchmarks/spatialRaster.py --frames 24 --textured
+"""
+import argparse, time
+import numpy as np
+from spatialFrameRate import nestedHs, oP
+from plottingTools import FrameSink
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--frames', type=int, default=24, help='time steps to render')
+    parser.add_argument('--textured', action='store_true', help='add bar and rip like structure to the field, more '
+                                                                  'contour polygons as in real wave fields')
+    args = parser.parse_args()
+    contourpacket, fieldpacket, directions = nestedHs(args.frames)
+    if args.textured:
+        xx, yy = np.meshgrid(fieldpacket['xcoord'], fieldpacket['ycoord'])
+        fieldpacket['field'] = fieldpacket['field'] + 0.3 * np.sin(yy / 40.) * np.sin(xx / 25.)
+    timing = {}
+    for raster in [False, True]:
+        t0 = time.time()
+        oP.plotSpatialFieldData(contourpacket, fieldpacket, sink=FrameSink(), raster=raster, directions=directions)
+        timing[raster] = (time.time() - t0) / args.frames
+    print('%d frames: filled contours %.1f ms a frame, raster %.1f ms a frame (%.1fx)'
+          % (args.frames, timing[False] * 1e3, timing[True] * 1e3, timing[False] / timing[True]))
+
+if __name__ == '__main__':
+    main()
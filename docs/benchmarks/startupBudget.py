@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""Start-up budget of the workflow drivers.  Each RunWorkFlow_*.py is imported in a fresh interpreter, then the modules
+its Master_*_run imports before the first simulation (the frontback module of the model and the plot queue) are
+imported in the same interpreter.  Both imports are timed and the heavy modules they loaded are listed:
+
+  * the driver import must load none of the plotting, netCDF and data access stacks
+  * the Master_*_run import path legitimately loads netCDF4, getdatatestbed, prepdata, etc. but must not load the
+    plotting stack (matplotlib and the plotting modules), that's only imported when plots are made
+
+A model fails when either import loads a forbidden module, takes longer than its budget or raises, the exit status is
+then 1.  Runs on python 2.7 and 3 (python -X importtime is 3.7+ only), from the root of the repo:
+
+    python docs/benchmarks/startupBudget.py --budget 1.0 --runBudget 5.0
+"""
+import argparse, os, subprocess, sys
+
+# (driver, modules its Master_*_run imports ahead of the simulations)
+drivers = [('RunWorkFlow_STWAVE', ['frontback.frontBackSTWAVE', 'plotting.plotQueue']),
+           ('RunWorkFlow_CMS', ['frontback.frontBackCMS', 'plotting.plotQueue']),
+           ('RunWorkFlow_CSHORE', ['frontback.frontBackCSHORE', 'prepdata.inputOutput', 'getdatatestbed.getDataFRF'])]
+heavyModules = ['matplotlib', 'netCDF4', 'scipy', 'getdatatestbed', 'prepdata', 'testbedutils', 'frontback',
+                'plotting']
+plottingStack = ['matplotlib', 'imageio', 'plotting.operationalPlots', 'plotting.nonoperationalPlots',
+                 'plotting.plottingTools', 'plotting.dailyPlots', 'plotting.dailyPlotsCSHORE']
+childCode = """
+import sys, time
+sys.path.insert(0, %r)
+def loaded(forbidden):
+    return sorted(set(mm for mm in forbidden for name in list(sys.modules)
+                      if sys.modules[name] is not None and (name == mm or name.startswith(mm + '.'))))
+for phase, modules, forbidden in [('driver', [%r], %r), ('run', %r, %r)]:
+    t0 = time.time()
+    try:
+        for module in modules:
+            __import__(module)
+    except Exception as err:
+        print('%%s error %%s: %%s' %% (phase, type(err).__name__, str(err).replace(chr(10), ' ')))
+        break
+    print('%%s %%f %%s' %% (phase, time.time() - t0, ' '.join(loaded(forbidden))))
+"""
+
+def importDriver(driver, runModules, repoDir):
+    """Imports a driver and then the modules of its Master_*_run in a new interpreter
+
+    Args:
+      driver (str): module name of the driver
+      runModules (list): modules Master_*_run imports ahead of the simulations
+      repoDir (str): root of the repo
+
+    Returns:
+      dictionary keyed by phase ('driver', 'run') of the seconds the import took (None when it raised) and a list of
+      the forbidden modules it loaded (or the error)
+
+    """
+    code = childCode % (repoDir, driver, heavyModules, runModules, plottingStack)
+    out = subprocess.check_output([sys.executable, '-c', code], cwd=repoDir)
+    results = {}
+    for line in out.decode('utf-8').strip().split('\n'):
+        phase, seconds, rest = (line.split(' ', 2) + [''])[:3]
+        if seconds == 'error':
+            results[phase] = (None, [rest])
+        else:
+            results[phase] = (float(seconds), rest.split())
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--budget', type=float, default=1.0, help='seconds each driver import may take')
+    parser.add_argument('--runBudget', type=float, default=5.0,
+                        help='seconds the import path of each Master_*_run may take')
+    parser.add_argument('--repeat', type=int, default=3, help='imports per driver, the fastest is kept')
+    args = parser.parse_args()
+    repoDir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    failed = False
+    for driver, runModules in drivers:
+        runs = [importDriver(driver, runModules, repoDir) for rr in range(args.repeat)]
+        for phase, budget, label in [('driver', args.budget, driver), ('run', args.runBudget, '  Master_*_run path')]:
+            results = [run[phase] for run in runs if phase in run]
+            if len(results) == 0:
+                continue  # the driver import failed
+            seconds, loaded = min(results, key=lambda result: float('inf') if result[0] is None else result[0])
+            if seconds is None:
+                ok = False
+                print('%-20s  import failed: %s' % (label, loaded[0]))
+            else:
+                ok = seconds <= budget and len(loaded) == 0
+                print('%-20s %6.3f s  forbidden modules: %-30s %s' % (label, seconds, ', '.join(loaded) or 'none',
+                                                                      'ok' if ok else 'FAILED'))
+            failed = failed or not ok
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
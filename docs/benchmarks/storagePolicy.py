@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""Benchmark of the makenc chunking and compression policies (the '_storage' block and per variable keys of a var
+yaml).  A day of hourly [time, y, x] field and [time, freq, dir] spectra is written with each policy, and with the
+'_storage' block of the repo's own var yaml (STWAVE Field_var.yml and Station_Directional_Wave_var.yml), through
+compile_template and write_data_to_nc.  The file size and read time are reported, for fields a long time series at
+single grid points (how CheckOffshoreBoundaryConsistancy and dailyPlots read the files) and for spectra whole spectra
+at single times.  Run from the root of the repo:
+
+    python docs/benchmarks/storagePolicy.py --hours 24 --workDir /tmp
+"""
+import argparse, os, shutil, sys, tempfile, time
+import numpy as np
+import netCDF4 as nc
+repoDir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, repoDir)
+import makenc
+
+policies = [('library default', {}, {}),
+            ('zlib + shuffle', {'zlib': True, 'complevel': 4, 'shuffle': True}, {}),
+            ('zlib + shuffle, quantized', {'zlib': True, 'complevel': 4, 'shuffle': True},
+             {'least_significant_digit': 3})]
+shapes = {'field': ('xShore', 'yShore', 200, 360), 'spectra': ('waveFrequency', 'waveDirectionBins', 62, 72)}
+# var yaml the model output of each kind is written with
+templates = {'field': os.path.join('yaml_files', 'waveModels', 'STWAVE', 'Field_var.yml'),
+             'spectra': os.path.join('yaml_files', 'waveModels', 'STWAVE', 'Station_Directional_Wave_var.yml')}
+
+def repoPolicy(kind):
+    """the '_storage' block of the repo's var yaml for this kind of output"""
+    template = makenc.import_template_file(os.path.join(repoDir, templates[kind]))
+    return ('%s _storage' % os.path.basename(templates[kind]), template.get('_storage', None) or {}, {})
+
+def synthetic(kind, hours):
+    """smooth data with a little noise, like model output, so compression is realistic"""
+    rand = np.random.RandomState(0)
+    dim1, dim2, n1, n2 = shapes[kind]
+    tt, ii, jj = np.meshgrid(np.arange(hours), np.linspace(0, 3, n1), np.linspace(0, 5, n2), indexing='ij')
+    return 1 + np.sin(ii + tt / 6.) * np.cos(jj) + rand.randn(hours, n1, n2) * 1e-3
+
+def writeFile(fname, kind, data, storage, varKeys):
+    """writes data with a storage policy through the makenc template path"""
+    dim1, dim2, n1, n2 = shapes[kind]
+    template = {'_variables': ['time', 'data'], '_storage': storage,
+                'time': {'name': 'time', 'units': 'seconds since 1970-01-01 00:00:00', 'data_type': 'f8',
+                         'dim': ['time']},
+                'data': dict({'name': 'data', 'units': 'm', 'data_type': 'f4', 'dim': ['time', dim1, dim2],
+                              'fill_value': -999.}, **varKeys)}
+    template['_compiled'] = makenc.compile_template(template)
+    with makenc.new_nc_file(fname, {}) as fid:
+        fid.createDimension('time', data.shape[0])
+        fid.createDimension(dim1, n1)
+        fid.createDimension(dim2, n2)
+        makenc.write_data_to_nc(fid, template, {'time': np.arange(data.shape[0]) * 3600., 'data': data})
+
+def readTime(fname, kind, points=50):
+    """mean seconds to read the whole time series at one grid point (fields) or a whole spectrum at one time
+    (spectra), each read from a freshly opened file"""
+    rand = np.random.RandomState(1)
+    dim1, dim2, n1, n2 = shapes[kind]
+    t0 = time.time()
+    for pp in range(points):
+        with nc.Dataset(fname) as fid:
+            if kind == 'spectra':
+                fid['data'][rand.randint(len(fid.dimensions['time']))]
+            else:
+                fid['data'][:, rand.randint(n1), rand.randint(n2)]
+    return (time.time() - t0) / points
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--hours', type=int, default=24, help='hourly time steps in each file')
+    parser.add_argument('--workDir', default=None, help='where to write the files (Default: system temp)')
+    args = parser.parse_args()
+    workDir = tempfile.mkdtemp(dir=args.workDir)
+    try:
+        for kind in sorted(shapes):
+            data = synthetic(kind, args.hours)
+            for name, storage, varKeys in policies + [repoPolicy(kind)]:
+                fname = os.path.join(workDir, 'policy.nc')
+                t0 = time.time()
+                writeFile(fname, kind, data, storage, varKeys)
+                writeTime = time.time() - t0
+                print('%-8s %-42s %8.2f MB  write %6.3f s  %s read %7.2f ms'
+                      % (kind, name, os.path.getsize(fname) / 1e6, writeTime,
+                         'spectrum' if kind == 'spectra' else 'point series', readTime(fname, kind) * 1e3))
+    finally:
+        shutil.rmtree(workDir, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""Microbenchmark of the makenc template cache.  A writer call (the global and variable yaml loaded, then every
+variable of a window of model output written to an in-memory netCDF file) is timed with the implementation from
+before the cache (import_template_file parsing the yaml on every call and write_data_to_nc walking the template and
+branching on the dimensions for every variable, copied below) and with the current import_template_file and
+write_data_to_nc, which parse and compile each yaml once per process.  STanalyze makes up to 12 files a window from
+the same yaml pairs.  The var yamls are copied without their '_storage' block so both write uncompressed, unless
+--keepStorage is given.  Run from the root of the repo:
+
+    python docs/benchmarks/templateCache.py --calls 200
+"""
+import argparse, os, shutil, sys, tempfile, time
+import numpy as np
+import netCDF4 as nc
+import yaml
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import makenc
+
+yamlPairs = [('yaml_files/waveModels/STWAVE/CB/Field_Local_CB_globalmeta.yml', 'yaml_files/waveModels/STWAVE/Field_var.yml'),
+             ('yaml_files/waveModels/STWAVE/CB/Station_CB_globalmeta.yml',
+              'yaml_files/waveModels/STWAVE/Station_Directional_Wave_var.yml')]
+# dimension lengths of the synthetic window, a small grid so the template handling isn't hidden by the data
+dimSizes = {'time': 24, 'X_shore': 60, 'Y_shore': 40, 'waveFrequency': 30, 'waveDirectionBins': 36, 'Lat': 1,
+            'Lon': 1, 'input_types_length': 3, 'station_name_length': 12, 'in_type': 3}
+
+def oldImportTemplateFile(yaml_location):
+    """import_template_file from before the cache, the yaml is parsed on every call"""
+    # load the template
+    f = open(yaml_location)
+    # use safe_load instead load
+    vars_dict = yaml.safe_load(f)
+    f.close()
+    return vars_dict
+
+def oldWriteDataToNc(ncfile, template_vars, data_dict, write_vars='_variables'):
+    """write_data_to_nc from before the templates were compiled"""
+    # Keep track of any errors found
+    num_errors = 0
+    error_str = ''
+
+    # write some more global attributes if present
+    if '_attributes' in template_vars:
+        for var in template_vars['_attributes']:
+            if var in data_dict:
+                setattr(ncfile, var, data_dict[var])
+
+    # List all possible variable attributes in the template
+    possible_var_attr = ['standard_name', 'long_name', 'coordinates', 'flag_values', 'flag_meanings', 'description',
+                         'notes', 'positive', 'valid_min', 'valid_max', 'calendar', 'description', 'cf_role',
+                         'missing_value']
+
+    # Write variables to file
+    accept_vars = template_vars['_variables']
+
+    for var in accept_vars:  # only write varibles that were loaded from .yaml file
+        if var in data_dict:
+            try:
+                if "fill_value" in template_vars[var] and "least_significant_digit" in template_vars[var]:
+                    new_var = ncfile.createVariable(template_vars[var]["name"],
+                                                    template_vars[var]["data_type"],
+                                                    template_vars[var]["dim"],
+                                                    fill_value=template_vars[var]["fill_value"],
+                                                    least_significant_digit=template_vars[var]['least_significant_digit'] )
+                elif "fill_value" in template_vars[var]:
+                    new_var = ncfile.createVariable(template_vars[var]["name"], template_vars[var]["data_type"],
+                            template_vars[var]["dim"], fill_value=template_vars[var]["fill_value"])
+                else:
+                    new_var = ncfile.createVariable(template_vars[var]["name"],
+                                                    template_vars[var]["data_type"],
+                                                    template_vars[var]["dim"])
+
+                new_var.units = template_vars[var]["units"]
+
+                # Write the attributes
+                for attr in possible_var_attr:  # only write attributes listed in this list above
+                    if attr in template_vars[var]:
+                        if template_vars[var][attr] == 'NaN':
+                            setattr(new_var, attr, np.nan)
+                        else:
+                            setattr(new_var, attr, template_vars[var][attr])
+                # Write the short_name attribute as the variable name
+                if 'short_name' in template_vars[var]:
+                    new_var.short_name = template_vars[var]["short_name"]
+                else:
+                    new_var.short_name = template_vars[var]["name"]
+                # _____________________________________________________________________________________
+                # Write the data (1D, 2D, or 3D)
+                #______________________________________________________________________________________
+                if var == "station_name":
+                    station_id = data_dict[var]
+                    data = np.empty((1,), 'S'+repr(len(station_id)))
+                    data[0] = station_id
+                    new_var[:] = nc.stringtochar(data)
+                elif len(template_vars[var]["dim"]) == 0:
+                    try:
+                        new_var[:] = data_dict[var]
+                    except Exception as e:
+                        new_var = data_dict[var]
+
+                elif len(template_vars[var]["dim"]) == 1:
+                    # catch some possible errors for frequency and direction arrays
+                    if template_vars[var]["data_type"] == 'str':
+                        for i, c in enumerate(template_vars[var]["data_type"]):
+                            new_var[i] = data_dict[var][i]
+                    else:
+                        try:
+                            new_var[:] = data_dict[var]
+                        except IndexError:
+                            try:
+                                new_var[:] = data_dict[var][0][0]
+                            except Exception as e:
+                                raise
+
+                elif len(template_vars[var]["dim"]) == 2:
+                    # write the callers array directly (netCDF4 casts to the template data_type on write)
+                    data = np.asanyarray(data_dict[var])  # no copy for arrays
+                    if np.ndim(data) > 2:
+                        # squeeze the 3d array in to 2d as dimension is not needed, a view not a copy
+                        data = data.reshape(data.shape[0], -1)
+                    if np.shape(data) != new_var.shape and np.shape(data)[::-1] == new_var.shape:
+                        # handles row vs col data, the transpose is a strided view
+                        data = data.T
+                    new_var[:] = data
+
+                elif len(template_vars[var]["dim"]) == 3:
+                    # this portion was modified by Spicer Bak
+                    assert data_dict[var].shape == new_var.shape, 'The data must have the Same Dimensions  (missing time?)'
+                    new_var[:] = data_dict[var]
+
+            except Exception as e:
+                num_errors += 1
+                print('ERROR WRITING VARIABLE: {} - {} \n'.format(var, str(e)))
+
+    return num_errors, error_str
+
+def syntheticData(varAtts):
+    """a window of model output for every variable of a template"""
+    data = {}
+    for var in varAtts['_variables']:
+        if var not in varAtts:
+            continue  # e.g. qcFlags, listed without a template
+        if var == 'station_name':
+            data[var] = 'benchStation'
+        elif var == 'time':
+            data[var] = np.arange(dimSizes['time']) * 3600.
+        else:
+            data[var] = np.ones([dimSizes[dim] for dim in varAtts[var]['dim']], dtype=varAtts[var]['data_type'])
+    return data
+
+def writerCall(globalYaml, varYaml, data, loadTemplate, writeData):
+    """loads the templates and writes data to an in-memory netCDF file like the makenc_* writers"""
+    globalAtts = loadTemplate(globalYaml)
+    varAtts = loadTemplate(varYaml)
+    fid = nc.Dataset('templateCache.nc', 'w', diskless=True, persist=False)
+    try:
+        for name, value in globalAtts.items():
+            setattr(fid, name, value)
+        for dim in varAtts['_dimensions']:
+            fid.createDimension(dim, dimSizes.get(dim, 1))
+        for dim in ['input_types_length']:  # used by the station template without being listed
+            if dim not in fid.dimensions:
+                fid.createDimension(dim, dimSizes[dim])
+        num_errors = writeData(fid, varAtts, data)[0]
+    finally:
+        fid.close()
+    assert num_errors == 0, 'errors writing %s' % varYaml
+
+def withoutStorage(varYaml, workDir):
+    """a copy of a var yaml without its '_storage' block"""
+    fname = os.path.join(workDir, os.path.basename(varYaml))
+    with open(varYaml) as f:
+        lines = [line for line in f if not line.startswith('_storage')]
+    with open(fname, 'w') as f:
+        f.writelines(lines)
+    return fname
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--calls', type=int, default=200, help='writer calls to time for each yaml pair')
+    parser.add_argument('--keepStorage', action='store_true', help="write with the var yaml's '_storage' block")
+    args = parser.parse_args()
+    workDir = tempfile.mkdtemp()
+    try:
+        for globalYaml, varYaml in yamlPairs:
+            if not args.keepStorage:
+                varYaml = withoutStorage(varYaml, workDir)
+            data = syntheticData(oldImportTemplateFile(varYaml))
+            implementations = [(oldImportTemplateFile, oldWriteDataToNc),
+                               (makenc.import_template_file, makenc.write_data_to_nc)]
+            timing = []
+            for loadTemplate, writeData in implementations:
+                writerCall(globalYaml, varYaml, data, loadTemplate, writeData)  # warm up (fills the cache)
+                t0 = time.time()
+                for cc in range(args.calls):
+                    writerCall(globalYaml, varYaml, data, loadTemplate, writeData)
+                timing.append((time.time() - t0) / args.calls * 1e3)
+            print('%-35s before the cache %7.3f ms, cached %7.3f ms per writer call (%.1fx)'
+                  % (os.path.basename(varYaml), timing[0], timing[1], timing[0] / max(timing[1], 1e-9)))
+    finally:
+        shutil.rmtree(workDir, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
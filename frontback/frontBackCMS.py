@@ -17,10 +17,8 @@ import makenc
 from prepdata import prepDataLib as STPD
 from prepdata.inputOutput import cmsIO, stwaveIO
 from getdatatestbed import getDataFRF
-import plotting.operationalPlots as oP
 from testbedutils import sblib as sb
 from testbedutils import waveLib as sbwave
-from plotting.operationalPlots import obs_V_mod_TS
 from testbedutils import geoprocess as gp
 
 def CMSsimSetup(startTime, inputDict):
@@ -189,6 +187,10 @@ def CMSanalyze(startTime, inputDict):
         netCDF files to the inputDict['netCDFdir'] directory
 
     """
+    # matplotlib is only loaded when results are analyzed
+    import plotting.operationalPlots as oP
+    from plotting.operationalPlots import obs_V_mod_TS_batch
+    from plotting import plotQueue
     # ___________________define Global Variables___________________________________
     if 'pFlag' in inputDict:
         pFlag = inputDict['pFlag']
@@ -326,12 +328,16 @@ def CMSanalyze(startTime, inputDict):
     assert os.path.isfile(fieldYaml), 'NetCDF yaml files are not created'  # make sure yaml file is in place
     makenc.makenc_field(data_lib=spatial, globalyaml_fname=fieldYaml, flagfname=flagfname,
                         ofname=fieldOfname, var_yaml_fname=varYaml)
+    makenc.update_nc_catalog(os.path.join(TdsFldrBase, 'Field', 'Field.catalog.sqlite'), fieldOfname,
+                             spatial['time'], version_prefix, 'Field')
     ###################################################################################################################
     ###############################   Plotting  Below   ###############################################################
     ###################################################################################################################
     dep_pack['bathy'] = np.transpose(dep_pack['bathy'], (0, 2, 1))  # dims [t, y, x]
     plotParams = [('waveHs', '$m$'), ('bathymetry', 'NAVD88 $[m]$'), ('waveTp', '$s$'), ('waveDm', '$degTn$')]
+    plotCalls = []  # (name, function, args, kwargs) of the plots, made once all of the netCDF files are written
     if pFlag == True:
+        plotJobs = []
         for param in plotParams:
             print '    plotting %s...' % param[0]
             spatialPlotPack = {'title': 'Regional Grid: %s' % param[0],
@@ -342,15 +348,22 @@ def CMSanalyze(startTime, inputDict):
                                'ycoord': spatial['yFRF'],
                                'cblabel': '%s - %s' % (param[0], param[1]),
                                'time': nc.num2date(spatial['time'], 'seconds since 1970-01-01')}
+            if param[0] == 'bathymetry':  # an unchanged grid is drawn once, so it is reused from the render cache
+                spatialPlotPack['static'] = np.ma.allequal(np.ma.masked_invalid(spatial[param[0]]),
+                                                           np.ma.masked_invalid(spatial[param[0]][:1]))
             fnameSuffix = 'figures/CMTB_CMS_%s_%s' % (version_prefix, param[0])
+            # frames are streamed straight into a gif for each one, pngs only on request
+            plotJobs.append({'contourpacket': dep_pack, 'fieldpacket': spatialPlotPack, 'nested': 0,
+                             'prefix': os.path.join(fpath, fnameSuffix),
+                             'animation': fpath + '/figures/CMTB_%s_%s_%s.gif' % (version_prefix, param[0], datestring),
+                             'savePng': inputDict.get('savePngFrames', False),
+                             'raster': inputDict.get('rasterPlots', False)})  # pcolormesh rather than contourf fields
             if param[0] == 'waveHs':
-                oP.plotSpatialFieldData(dep_pack, spatialPlotPack, os.path.join(fpath, fnameSuffix), nested=0, directions=spatial['waveDm'])
-            else:
-                oP.plotSpatialFieldData(dep_pack, spatialPlotPack, os.path.join(fpath, fnameSuffix), nested=0)
-            # now make a gif for each one, then delete pictures
-            fList = sorted(glob.glob(fpath + '/figures/*%s*.png' % param[0]))
-            sb.makegif(fList, fpath + '/figures/CMTB_%s_%s_%s.gif' % (version_prefix, param[0], datestring))
-            [os.remove(ff) for ff in fList]
+                plotJobs[-1]['directions'] = spatial['waveDm']
+        plotCalls.append(('CMS spatial plots {}'.format(datestring), oP.plotSpatialFrames, (plotJobs,),
+                          {'nproc': plotQueue.workersPerJob(inputDict.get('plotQueue', None),
+                                                            inputDict.get('plotWorkers', None)),
+                           'renderCache': inputDict.get('renderCache', None)}))  # reuse identical frames (e.g. bathymetry)
 
     ######################################################################################################################
     ######################################################################################################################
@@ -417,6 +430,8 @@ def CMSanalyze(startTime, inputDict):
             # make netCDF
             makenc.makenc_Station(stat_data, globalyaml_fname=globalyaml_fname, flagfname=flagfname,
                                   ofname=outFileName, stat_yaml_fname=stat_yaml_fname)
+            makenc.update_nc_catalog(os.path.join(TdsFldrBase, station + '.catalog.sqlite'), outFileName,
+                                     stat_data['time'], version_prefix, station)
 
             print "netCDF file's created for station: %s " % station
             ###################################################################################################################
@@ -436,6 +451,7 @@ def CMSanalyze(startTime, inputDict):
                                                 nc.date2num(stat_packet['time'][:], 'seconds since 1970-01-01'),
                                                 np.arange(len(stat_packet['time'])))  # time match
 
+                ofnames, p_dicts = [], []  # all of the parameters at this station are plotted together below
                 for param in modStats:  # loop through each bulk statistic
                     if len(time) > 1 and param in ['Hm0', 'Tm', 'sprdF', 'sprdD', 'Tp', 'Dm']:
                         print '    plotting %s: %s' % (station, param)
@@ -461,7 +477,8 @@ def CMSanalyze(startTime, inputDict):
                                   'p_title': title}
 
                         ofname = os.path.join(fpath, 'figures/Station_%s_%s_%s.png' % (station, param, datestring))
-                        stats = obs_V_mod_TS(ofname, p_dict, logo_path='ArchiveFolder/CHL_logo.png')
+                        ofnames.append(ofname)
+                        p_dicts.append(p_dict)
 
                         if station == 'waverider-26m' and param == 'Hm0':
                             # this is a fail safe to abort run if the boundary conditions don't
@@ -479,6 +496,12 @@ def CMSanalyze(startTime, inputDict):
                             #     os.remove(fieldOfname)
                             #     os.remove(outFileName)
                             #     raise RuntimeError('The Model Is not validating its offshore boundary condition')
+                plotCalls.append(('CMS {} plots {}'.format(station, datestring), obs_V_mod_TS_batch,
+                                  (ofnames, p_dicts), {'logo_path': 'ArchiveFolder/CHL_logo.png'}))
         except IndexError:
             # if an index error is raised (from get data, returns no data), keep processing the rest of the stations
-            continue
\ No newline at end of file
+            continue
+
+    # the data products are written, now make the plots (in the background with a plot queue)
+    for name, func, args, kwargs in plotCalls:
+        plotQueue.dispatch(inputDict.get('plotQueue', None), name, func, *args, **kwargs)
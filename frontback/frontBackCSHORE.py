@@ -9,9 +9,7 @@ from getdatatestbed.getDataFRF import getObs, getDataTestBed
 from testbedutils.geoprocess import FRFcoord
 from testbedutils.sblib import timeMatch, timeMatch_altimeter, makeNCdir
 from testbedutils.anglesLib import geo2STWangle, STWangle2geo, vectorRotation
-import plotting.operationalPlots as oP
 import makenc
-from matplotlib import pyplot as plt
 from subprocess import check_output
 
 def CSHORE_analysis(startTime, inputDict):
@@ -27,6 +25,7 @@ def CSHORE_analysis(startTime, inputDict):
           None
 
     """
+    import plotting.operationalPlots as oP  # matplotlib is only loaded when results are analyzed
     version_prefix = inputDict['version_prefix']
     workingDir = inputDict['workingDirectory']
     pFlag = inputDict['pFlag']
@@ -76,61 +75,6 @@ def CSHORE_analysis(startTime, inputDict):
         Alt04 = oP.alt_PlotData('Alt04', model_time, times)
         Alt03 = oP.alt_PlotData('Alt03', model_time, times)
 
-        # go ahead and time match the altimeter data
-        if Alt05['TS_toggle']:
-            # ALT05
-            obs_zb = Alt05['zb']
-            obs_time = Alt05['time']
-            obs_loc = round(Alt05['xFRF'])
-            mod_zb = morpho['zb'][:, np.where(abs(x_n - obs_loc) == min(abs(x_n - obs_loc)), 1, 0) == 1].squeeze()
-            comp_time = times[1:]
-            comp_time_n, obs_n, mod_n = timeMatch_altimeter(obs_time, obs_zb, comp_time, mod_zb)
-            plot_ind = np.where(abs(comp_time_n - model_time) == min(abs(comp_time_n - model_time)), 1, 0)
-            # delete and re-assign
-            del Alt05['zb']
-            del Alt05['time']
-            del Alt05['plot_ind']
-            Alt05['zb'] = obs_n
-            Alt05['time'] = comp_time_n
-            Alt05['plot_ind'] = plot_ind
-
-        if Alt04['TS_toggle']:
-            # ALT04
-            obs_zb = Alt04['zb']
-            obs_time = Alt04['time']
-            obs_loc = round(Alt04['xFRF'])
-            mod_zb = morpho['zb'][:, np.where(abs(x_n - obs_loc) == min(abs(x_n - obs_loc)), 1, 0) == 1].squeeze()
-            comp_time = times[1:]
-            comp_time_n, obs_n, mod_n = timeMatch_altimeter(obs_time, obs_zb, comp_time, mod_zb)
-            plot_ind = np.where(abs(comp_time_n - model_time) == min(abs(comp_time_n - model_time)), 1, 0)
-            # delete and re-assign
-            del Alt04['zb']
-            del Alt04['time']
-            del Alt04['plot_ind']
-            Alt04['zb'] = obs_n
-            Alt04['time'] = comp_time_n
-            Alt04['plot_ind'] = plot_ind
-
-        if Alt03['TS_toggle']:
-            # ALT03
-            obs_zb = Alt03['zb']
-            obs_time = Alt03['time']
-            obs_loc = round(Alt03['xFRF'])
-            mod_zb = morpho['zb'][:, np.where(abs(x_n - obs_loc) == min(abs(x_n - obs_loc)), 1, 0) == 1].squeeze()
-            comp_time = times[1:]
-            comp_time_n, obs_n, mod_n = timeMatch_altimeter(obs_time, obs_zb, comp_time, mod_zb)
-            plot_ind = np.where(abs(comp_time_n - model_time) == min(abs(comp_time_n - model_time)), 1, 0)
-            # delete and re-assign
-            del Alt03['zb']
-            del Alt03['time']
-            del Alt03['plot_ind']
-            Alt03['zb'] = obs_n
-            Alt03['time'] = comp_time_n
-            Alt03['plot_ind'] = plot_ind
-
-
-
-
         # wave data & current data!!!
         Adopp_35 = oP.wave_PlotData('adop-3.5m', model_time, times)
         AWAC6m = oP.wave_PlotData('awac-6m', model_time, times)
@@ -150,150 +94,16 @@ def CSHORE_analysis(startTime, inputDict):
         else:
             pass
 
-        # go ahead and time match the wave and current dat!
-
-        if Adopp_35['TS_toggle']:
-            # Adopp_35
-            # get time-matched data!!!!!! waves
-            obs_Hs = Adopp_35['Hs']
-            obs_time = Adopp_35['wave_time']
-            obs_loc = round(Adopp_35['xFRF'])
-            mod_Hs = hydro['Hs'][:, np.where(abs(x_n - obs_loc) == min(abs(x_n - obs_loc)), 1, 0) == 1].squeeze()
-            comp_time = times[1:]
-            comp_time_n, obs_Hs_n, mod_Hs_n = timeMatch(obs_time, obs_Hs, comp_time, mod_Hs)
-            plot_ind = np.where(abs(comp_time_n - model_time) == min(abs(comp_time_n - model_time)), 1, 0)
-            # delete and re-assign
-            del Adopp_35['Hs']
-            del Adopp_35['wave_time']
-            del Adopp_35['plot_ind']
-            Adopp_35['Hs'] = obs_Hs_n
-            Adopp_35['wave_time'] = comp_time_n
-            Adopp_35['plot_ind'] = plot_ind
-
-            # get time-matched data!!!!!! currents
-            # V
-            obs_V = Adopp_35['V']
-            obs_time = Adopp_35['cur_time']
-            obs_loc = round(Adopp_35['xFRF'])
-            mod_V = hydro['vmean'][:, np.where(abs(x_n - obs_loc) == min(abs(x_n - obs_loc)), 1, 0) == 1].squeeze()
-            comp_time = times[1:]
-            comp_time_n, obs_V_n, mod_V_n = timeMatch(obs_time, obs_V, comp_time, mod_V)
-            plot_ind_V = np.where(abs(comp_time_n - model_time) == min(abs(comp_time_n - model_time)), 1, 0)
-            # delete and re-assign
-            del Adopp_35['V']
-            temp_cur_time = Adopp_35['cur_time']
-            del Adopp_35['cur_time']
-            del Adopp_35['plot_ind_V']
-            Adopp_35['V'] = obs_V_n
-            Adopp_35['cur_time'] = comp_time_n
-            Adopp_35['plot_ind_V'] = plot_ind_V
-
-            # U
-            obs_U = Adopp_35['U']
-            obs_time = temp_cur_time
-            obs_loc = round(Adopp_35['xFRF'])
-            mod_U = hydro['umean'][:, np.where(abs(x_n - obs_loc) == min(abs(x_n - obs_loc)), 1, 0) == 1].squeeze()
-            comp_time = times[1:]
-            comp_time_n, obs_U_n, mod_U_n = timeMatch(obs_time, obs_U, comp_time, mod_U)
-            # delete and re-assign
-            del Adopp_35['U']
-            Adopp_35['U'] = obs_U_n
-
-        if AWAC6m['TS_toggle']:
-            # AWAC6m
-            # get time-matched data!!!!!! waves
-            obs_Hs = AWAC6m['Hs']
-            obs_time = AWAC6m['wave_time']
-            obs_loc = round(AWAC6m['xFRF'])
-            mod_Hs = hydro['Hs'][:, np.where(abs(x_n - obs_loc) == min(abs(x_n - obs_loc)), 1, 0) == 1].squeeze()
-            comp_time = times[1:]
-            comp_time_n, obs_Hs_n, mod_Hs_n = timeMatch(obs_time, obs_Hs, comp_time, mod_Hs)
-            plot_ind = np.where(abs(comp_time_n - model_time) == min(abs(comp_time_n - model_time)), 1, 0)
-            # delete and re-assign
-            del AWAC6m['Hs']
-            del AWAC6m['wave_time']
-            del AWAC6m['plot_ind']
-            AWAC6m['Hs'] = obs_Hs_n
-            AWAC6m['wave_time'] = comp_time_n
-            AWAC6m['plot_ind'] = plot_ind
-
-            # get time-matched data!!!!!! currents
-            # V
-            obs_V = AWAC6m['V']
-            obs_time = AWAC6m['cur_time']
-            obs_loc = round(AWAC6m['xFRF'])
-            mod_V = hydro['vmean'][:, np.where(abs(x_n - obs_loc) == min(abs(x_n - obs_loc)), 1, 0) == 1].squeeze()
-            comp_time = times[1:]
-            comp_time_n, obs_V_n, mod_V_n = timeMatch(obs_time, obs_V, comp_time, mod_V)
-            plot_ind_V = np.where(abs(comp_time_n - model_time) == min(abs(comp_time_n - model_time)), 1, 0)
-            # delete and re-assign
-            del AWAC6m['V']
-            temp_cur_time = AWAC6m['cur_time']
-            del AWAC6m['cur_time']
-            del AWAC6m['plot_ind_V']
-            AWAC6m['V'] = obs_V_n
-            AWAC6m['cur_time'] = comp_time_n
-            AWAC6m['plot_ind_V'] = plot_ind_V
-
-            # U
-            obs_U = AWAC6m['U']
-            obs_time = temp_cur_time
-            obs_loc = round(AWAC6m['xFRF'])
-            mod_U = hydro['umean'][:, np.where(abs(x_n - obs_loc) == min(abs(x_n - obs_loc)), 1, 0) == 1].squeeze()
-            comp_time = times[1:]
-            comp_time_n, obs_U_n, mod_U_n = timeMatch(obs_time, obs_U, comp_time, mod_U)
-            # delete and re-assign
-            del AWAC6m['U']
-            AWAC6m['U'] = obs_U_n
-
-        if AWAC8m['TS_toggle']:
-            # AWAC8m
-            # get time-matched data!!!!!! waves
-            obs_Hs = AWAC8m['Hs']
-            obs_time = AWAC8m['wave_time']
-            obs_loc = round(AWAC8m['xFRF'])
-            mod_Hs = hydro['Hs'][:, np.where(abs(x_n - obs_loc) == min(abs(x_n - obs_loc)), 1, 0) == 1].squeeze()
-            comp_time = times[1:]
-            comp_time_n, obs_Hs_n, mod_Hs_n = timeMatch(obs_time, obs_Hs, comp_time, mod_Hs)
-            plot_ind = np.where(abs(comp_time_n - model_time) == min(abs(comp_time_n - model_time)), 1, 0)
-            # delete and re-assign
-            del AWAC8m['Hs']
-            del AWAC8m['wave_time']
-            del AWAC8m['plot_ind']
-            AWAC8m['Hs'] = obs_Hs_n
-            AWAC8m['wave_time'] = comp_time_n
-            AWAC8m['plot_ind'] = plot_ind
-
-            # get time-matched data!!!!!! currents
-            # V
-            obs_V = AWAC8m['V']
-            obs_time = AWAC8m['cur_time']
-            obs_loc = round(AWAC8m['xFRF'])
-            mod_V = hydro['vmean'][:, np.where(abs(x_n - obs_loc) == min(abs(x_n - obs_loc)), 1, 0) == 1].squeeze()
-            comp_time = times[1:]
-            comp_time_n, obs_V_n, mod_V_n = timeMatch(obs_time, obs_V, comp_time, mod_V)
-            plot_ind_V = np.where(abs(comp_time_n - model_time) == min(abs(comp_time_n - model_time)), 1, 0)
-            # delete and re-assign
-            del AWAC8m['V']
-            temp_cur_time = AWAC8m['cur_time']
-            del AWAC8m['cur_time']
-            del AWAC8m['plot_ind_V']
-            AWAC8m['V'] = obs_V_n
-            AWAC8m['cur_time'] = comp_time_n
-            AWAC8m['plot_ind_V'] = plot_ind_V
-
-            # U
-            obs_U = AWAC8m['U']
-            obs_time = temp_cur_time
-            obs_loc = round(AWAC8m['xFRF'])
-            mod_U = hydro['umean'][:, np.where(abs(x_n - obs_loc) == min(abs(x_n - obs_loc)), 1, 0) == 1].squeeze()
-            comp_time = times[1:]
-            comp_time_n, obs_U_n, mod_U_n = timeMatch(obs_time, obs_U, comp_time, mod_U)
-            # delete and re-assign
-            del AWAC8m['U']
-            AWAC8m['U'] = obs_U_n
-
-
+        # go ahead and time match the altimeter, wave and current data!
+        # the model node of each gauge is found once and every comparison is matched in one pass, these matchups are
+        # used by the snapshot plots (obs_dict) and the time-series plots
+        gauges = {'Alt05': Alt05, 'Alt04': Alt04, 'Alt03': Alt03, 'Adopp_35': Adopp_35, 'AWAC6m': AWAC6m,
+                  'AWAC8m': AWAC8m}
+        matchVars = [('zb', 'time', 'plot_ind', morpho['zb'], timeMatch_altimeter),
+                     ('Hs', 'wave_time', 'plot_ind', hydro['Hs'], timeMatch),
+                     ('V', 'cur_time', 'plot_ind_V', hydro['vmean'], timeMatch),
+                     ('U', None, None, hydro['umean'], timeMatch)]
+        matchups = gaugeMatchups(gauges, matchVars, x_n, times[1:], model_time)
 
         # LiDAR stuff goes here...
         lidar = oP.lidar_PlotData(times)
@@ -379,275 +189,71 @@ def CSHORE_analysis(startTime, inputDict):
 
         # now we want time-series comparisons at all my gages!!!!!!!
         # this is necessary for the preservation of the empire
-
         # 5 sig wave height at all gages!!!!
         # 6 alongshore current at all gages!!!!
-
-        # adopp_35
-        if Adopp_35['TS_toggle']:
-
-            # 5 a) adopp_35 Hs
-            # get time-matched data!!!!!!
-            obs_Hs = Adopp_35['Hs']
-            obs_time = Adopp_35['wave_time']
-            obs_loc = round(Adopp_35['xFRF'])
-            mod_Hs = hydro['Hs'][:, np.where(abs(x_n - obs_loc) == min(abs(x_n - obs_loc)), 1, 0) == 1].squeeze()
-            comp_time = times[1:]
-            comp_time_n, obs_Hs_n, mod_Hs_n = timeMatch(obs_time, obs_Hs, comp_time, mod_Hs)
-
-            if len(comp_time_n) <= 1:
-                pass
-            else:
-                p_dict = {'time': comp_time_n,
-                          'obs': obs_Hs_n,
-                          'model': mod_Hs_n,
-                          'var_name': '$H_{s}$',
-                          'units': 'm',
-                          'p_title': '%s CSHORE %s - %s' % (version_prefix, startTime, 'Adopp 3.5')}
-
-                oP.obs_V_mod_TS(path+'adop35_Hs.png', p_dict)
-
-            # 6 a) adopp_35 V
-            # get time-matched data!!!!!!
-            obs_V = Adopp_35['V']
-            obs_time = Adopp_35['cur_time']
-            obs_loc = round(Adopp_35['xFRF'])
-            mod_V = hydro['vmean'][:, np.where(abs(x_n - obs_loc) == min(abs(x_n - obs_loc)), 1, 0) == 1].squeeze()
-            comp_time = times[1:]
-            comp_time_n, obs_V_n, mod_V_n = timeMatch(obs_time, obs_V, comp_time, mod_V)
-
-            if len(comp_time_n) <= 1:
-                pass
-            else:
-                p_dict = {'time': comp_time_n,
-                          'obs': obs_V_n,
-                          'model': mod_V_n,
-                          'var_name': '$V$',
-                          'units': 'm/s',
-                          'p_title': '%s CSHORE %s - %s' % (version_prefix, startTime, 'Adopp 3.5')}
-
-                oP.obs_V_mod_TS(path+'adop35_V.png', p_dict)
-        else:
-            pass
-
-
-        # AWAC6m
-        if AWAC6m['TS_toggle']:
-
-            # 5 b) AWAC6m Hs
-            # get time-matched data!!!!!!
-            obs_Hs = AWAC6m['Hs']
-            obs_time = AWAC6m['wave_time']
-            obs_loc = round(AWAC6m['xFRF'])
-            mod_Hs = hydro['Hs'][:, np.where(abs(x_n - obs_loc) == min(abs(x_n - obs_loc)), 1, 0) == 1].squeeze()
-            comp_time = times[1:]
-            comp_time_n, obs_Hs_n, mod_Hs_n = timeMatch(obs_time, obs_Hs, comp_time, mod_Hs)
-
-            if len(comp_time_n) <= 1:
-                pass
-            else:
-                p_dict = {'time': comp_time_n,
-                          'obs': obs_Hs_n,
-                          'model': mod_Hs_n,
-                          'var_name': '$H_{s}$',
-                          'units': 'm',
-                          'p_title': '%s CSHORE %s - %s' % (version_prefix, startTime, 'AWAC 6m')}
-
-                oP.obs_V_mod_TS(path + 'AWAC6m_Hs.png', p_dict)
-
-            # 6 b) AWAC6m V
-            # get time-matched data!!!!!!
-            obs_V = AWAC6m['V']
-            obs_time = AWAC6m['cur_time']
-            obs_loc = round(AWAC6m['xFRF'])
-            mod_V = hydro['vmean'][:, np.where(abs(x_n - obs_loc) == min(abs(x_n - obs_loc)), 1, 0) == 1].squeeze()
-            comp_time = times[1:]
-            comp_time_n, obs_V_n, mod_V_n = timeMatch(obs_time, obs_V, comp_time, mod_V)
-
-            if len(comp_time_n) <= 1:
-                pass
-            else:
-                p_dict = {'time': comp_time_n,
-                          'obs': obs_V_n,
-                          'model': mod_V_n,
-                          'var_name': '$V$',
-                          'units': 'm/s',
-                          'p_title': '%s CSHORE %s - %s' % (version_prefix, startTime, 'AWAC 6m')}
-
-                oP.obs_V_mod_TS(path+'AWAC6m_V.png', p_dict)
-        else:
-            pass
-
-
-        # 5 c) AWAC8m Hs
-        if AWAC8m['TS_toggle']:
-
-            # 5 c) AWAC8m Hs
-            # get time-matched data!!!!!!
-            obs_Hs = AWAC8m['Hs']
-            obs_time = AWAC8m['wave_time']
-            obs_loc = round(AWAC8m['xFRF'])
-            mod_Hs = hydro['Hs'][:, np.where(abs(x_n - obs_loc) == min(abs(x_n - obs_loc)), 1, 0) == 1].squeeze()
-            comp_time = times[1:]
-            comp_time_n, obs_Hs_n, mod_Hs_n = timeMatch(obs_time, obs_Hs, comp_time, mod_Hs)
-
-            if len(comp_time_n) <= 1:
-                pass
-            else:
-                p_dict = {'time': comp_time_n,
-                          'obs': obs_Hs_n,
-                          'model': mod_Hs_n,
-                          'var_name': '$H_{s}$',
-                          'units': 'm',
-                          'p_title': '%s CSHORE %s - %s' % (version_prefix, startTime, 'AWAC 8m')}
-
-                oP.obs_V_mod_TS(path + 'AWAC8m_Hs.png', p_dict)
-
-            # 6 c) AWAC8m V
-            #  get time-matched data!!!!!!
-            obs_V = AWAC8m['V']
-            obs_time = AWAC8m['cur_time']
-            obs_loc = round(AWAC8m['xFRF'])
-            mod_V = hydro['vmean'][:, np.where(abs(x_n - obs_loc) == min(abs(x_n - obs_loc)), 1, 0) == 1].squeeze()
-            comp_time = times[1:]
-            comp_time_n, obs_V_n, mod_V_n = timeMatch(obs_time, obs_V, comp_time, mod_V)
-
-            if len(comp_time_n) <= 1:
-                pass
-            else:
-                p_dict = {'time': comp_time_n,
-                          'obs': obs_V_n,
-                          'model': mod_V_n,
-                          'var_name': '$V$',
-                          'units': 'm/s',
-                          'p_title': '%s CSHORE %s - %s' % (version_prefix, startTime, 'AWAC 8m')}
-
-                oP.obs_V_mod_TS(path + 'AWAC8m_V.png', p_dict)
-
+        # 7 bottom elevation at all gages!!!! (MOBILE only)
+        tsPlots = [('Adopp_35', 'Hs', 'adop35_Hs.png', 'Adopp 3.5'),
+                   ('Adopp_35', 'V', 'adop35_V.png', 'Adopp 3.5'),
+                   ('AWAC6m', 'Hs', 'AWAC6m_Hs.png', 'AWAC 6m'),
+                   ('AWAC6m', 'V', 'AWAC6m_V.png', 'AWAC 6m'),
+                   ('AWAC8m', 'Hs', 'AWAC8m_Hs.png', 'AWAC 8m'),
+                   ('AWAC8m', 'V', 'AWAC8m_V.png', 'AWAC 8m')]
         if 'MOBILE' in version_prefix:
-            # 7 bottom elevation at all gages!!!!
-
-            # 7 a) alt 05 bottom elevation
-            if Alt05['TS_toggle']:
-                # get time-matched data!!!!!!
-                obs_zb = Alt05['zb']
-                obs_time = Alt05['time']
-                obs_loc = round(Alt05['xFRF'])
-                mod_zb = morpho['zb'][:, np.where(abs(x_n - obs_loc) == min(abs(x_n - obs_loc)), 1, 0) == 1].squeeze()
-                comp_time = times[1:]
-
-                prepData = prepDataLib.PrepDataTools()
-                matchObs = prepData.prep_obs2mod(obs_time, obs_zb, comp_time)
-
-                # check to see if we masked anything!!
-                if np.sum(matchObs['mask']) > 0:
-                    mod_zb = mod_zb[np.where(~matchObs['mask'])]
-
-                p_dict = {'time': matchObs['time'],
-                          'obs': matchObs['meanObs'],
-                          'model': mod_zb,
-                          'var_name': 'Bottom Elevation',
-                          'units': 'm',
-                          'p_title': '%s CSHORE %s - %s' % (version_prefix, startTime, 'Alt-05')}
-
-                if np.size(p_dict['obs']) >= 2:
-                    oP.obs_V_mod_TS(path + 'alt05_BE.png', p_dict)
-
-            # 7 b) alt 04 bottom elevation
-            if Alt04['TS_toggle']:
-                # get time-matched data!!!!!!
-                obs_zb = Alt04['zb']
-                obs_time = Alt04['time']
-                obs_loc = round(Alt04['xFRF'])
-                mod_zb = morpho['zb'][:, np.where(abs(x_n - obs_loc) == min(abs(x_n - obs_loc)), 1, 0) == 1].squeeze()
-                comp_time = times[1:]
-
-                prepData = prepDataLib.PrepDataTools()
-                matchObs = prepData.prep_obs2mod(obs_time, obs_zb, comp_time)
-
-                # check to see if we masked anything!!
-                if np.sum(matchObs['mask']) > 0:
-                    mod_zb = mod_zb[np.where(~matchObs['mask'])]
-
-                p_dict = {'time': matchObs['time'],
-                          'obs': matchObs['meanObs'],
-                          'model': mod_zb,
-                          'var_name': 'Bottom Elevation',
-                          'units': 'm',
-                          'p_title': '%s CSHORE %s - %s' % (version_prefix, startTime, 'Alt-04')}
-
-                if np.size(p_dict['obs']) >= 2:
-                    oP.obs_V_mod_TS(path + 'alt04_BE.png', p_dict)
-
-            # 7 c) alt 03 bottom elevation
-            if Alt03['TS_toggle']:
-                # get time-matched data!!!!!!
-                obs_zb = Alt03['zb']
-                obs_time = Alt03['time']
-                obs_loc = round(Alt03['xFRF'])
-                mod_zb = morpho['zb'][:, np.where(abs(x_n - obs_loc) == min(abs(x_n - obs_loc)), 1, 0) == 1].squeeze()
-                comp_time = times[1:]
-
+            tsPlots += [('Alt05', 'zb', 'alt05_BE.png', 'Alt-05'),
+                        ('Alt04', 'zb', 'alt04_BE.png', 'Alt-04'),
+                        ('Alt03', 'zb', 'alt03_BE.png', 'Alt-03')]
+        varLabels = {'Hs': ('$H_{s}$', 'm'),
+                     'V': ('$V$', 'm/s'),
+                     'zb': ('Bottom Elevation', 'm')}
+        ofnames, p_dicts = [], []
+        for gauge, var, ofname, title in tsPlots:
+            if var not in matchups.get(gauge, {}):
+                continue
+            matched = matchups[gauge][var]
+            if var == 'zb':
+                # the matched altimeter data are averaged onto the model times for the time series
                 prepData = prepDataLib.PrepDataTools()
-                matchObs = prepData.prep_obs2mod(obs_time, obs_zb, comp_time)
-
+                matchObs = prepData.prep_obs2mod(matched['time'], matched['obs'], times[1:])
+                mod_zb = morpho['zb'][:, matched['node']]
                 # check to see if we masked anything!!
                 if np.sum(matchObs['mask']) > 0:
                     mod_zb = mod_zb[np.where(~matchObs['mask'])]
-                else:
-                    pass
-
-                p_dict = {'time': matchObs['time'],
-                          'obs': matchObs['meanObs'],
-                          'model': mod_zb,
-                          'var_name': 'Bottom Elevation',
-                          'units': 'm',
-                          'p_title': '%s CSHORE %s - %s' % (version_prefix, startTime, 'Alt-03')}
-
-                if np.size(p_dict['obs']) >= 2:
-                    oP.obs_V_mod_TS(path + 'alt03_BE.png', p_dict)
+                matched = {'time': matchObs['time'], 'obs': matchObs['meanObs'], 'model': mod_zb}
+                if np.size(matched['obs']) < 2:
+                    continue
+            elif len(matched['time']) <= 1:
+                continue
+            p_dicts.append({'time': matched['time'],
+                            'obs': matched['obs'],
+                            'model': matched['model'],
+                            'var_name': varLabels[var][0],
+                            'units': varLabels[var][1],
+                            'p_title': '%s CSHORE %s - %s' % (version_prefix, startTime, title)})
+            ofnames.append(path + ofname)
 
         # 8 - LiDAR runup comparison plots
-
         if lidar['TS_toggle']:
-            # get time-matched data!!!!!!
-            obs_runupMean = lidar['runupMean']
-            obs_time = lidar['runupTime']
-            mod_runupMean = hydro['runup_mean']
-            comp_time = times[1:]
-            comp_time_n, obs_runupMean_n, mod_runupMean_n = timeMatch(obs_time, obs_runupMean, comp_time, mod_runupMean)
-
-            if len(comp_time_n) <= 1:
-                pass
-            else:
-                p_dict = {'time': comp_time_n,
-                          'obs': obs_runupMean_n,
-                          'model': mod_runupMean_n,
-                          'var_name': 'Mean Run-up',
-                          'units': 'm',
-                          'p_title': '%s CSHORE %s - %s' % (version_prefix, startTime, 'LiDAR')}
-
-                oP.obs_V_mod_TS(path + 'runupMean.png', p_dict)
-
-            # 8 b) 2% runup
-            # get time-matched data!!!!!!
-            obs_runup = lidar['runup2perc']
-            obs_time = lidar['runupTime']
-            mod_runup = hydro['runup_2_percent']
             comp_time = times[1:]
-            comp_time_n, obs_runup_n, mod_runup_n = timeMatch(obs_time, obs_runup, comp_time, mod_runup)
-
-            if len(comp_time_n) <= 1:
-                pass
-            else:
-                p_dict = {'time': comp_time_n,
-                          'obs': obs_runup_n,
-                          'model': mod_runup_n,
-                          'var_name': '$2\%$ Exceedance Run-up',
-                          'units': 'm',
-                          'p_title': '%s CSHORE %s - %s' % (version_prefix, startTime, 'LiDAR')}
-
-                oP.obs_V_mod_TS(path + 'runup2perc.png', p_dict)
+            # 8 a) mean runup, 8 b) 2% runup
+            for obsKey, modKey, var_name, ofname in [('runupMean', 'runup_mean', 'Mean Run-up', 'runupMean.png'),
+                                                     ('runup2perc', 'runup_2_percent', '$2\%$ Exceedance Run-up',
+                                                      'runup2perc.png')]:
+                # get time-matched data!!!!!!
+                comp_time_n, obs_runup_n, mod_runup_n = timeMatch(lidar['runupTime'], lidar[obsKey], comp_time,
+                                                                  hydro[modKey])
+                if len(comp_time_n) <= 1:
+                    continue
+                p_dicts.append({'time': comp_time_n,
+                                'obs': obs_runup_n,
+                                'model': mod_runup_n,
+                                'var_name': var_name,
+                                'units': 'm',
+                                'p_title': '%s CSHORE %s - %s' % (version_prefix, startTime, 'LiDAR')})
+                ofnames.append(path + ofname)
+
+        # all the time series on one figure
+        if len(p_dicts) > 0:
+            oP.obs_V_mod_TS_batch(ofnames, p_dicts)
 
     # make the nc files
     nc_dict = makeCSHORE_ncdict(startTime=startTime, inputDict=inputDict)
@@ -674,9 +280,68 @@ def CSHORE_analysis(startTime, inputDict):
     NCname = 'CMTB-morphModels_CSHORE_%s_%s.nc' %(version_prefix, date_str)
 
     makenc.makenc_CSHORErun(os.path.join(NCpath, NCname), nc_dict, globalYaml, varYaml)
+    catalogDir = os.path.join(netCDFdir, 'CSHORE', version_prefix)
+    if not os.path.exists(catalogDir):
+        os.makedirs(catalogDir)
+    makenc.update_nc_catalog(os.path.join(catalogDir, version_prefix + '.catalog.sqlite'), os.path.join(NCpath, NCname),
+                             nc_dict['time'], version_prefix, 'CSHORE')
 
     t = 1
 
+def gaugeMatchups(gauges, matchVars, x_n, comp_time, model_time):
+    """Time matches the model to the observations at every gauge.  The model node closest to each gauge is found once
+    and the model time series at all of the gauges are pulled out of each model variable with a single index.  The
+    observation dictionaries are then updated with the time matched data for the snapshot plots.
+
+    Args:
+        gauges (dict): gauge name: observation dictionary (from alt_PlotData or wave_PlotData), only the gauges
+            with 'TS_toggle' are matched
+        matchVars (list): (variable, time key, plot index key, model output [t, x], time matching function) of
+            each comparison, the variable is the observation key; comparisons without a time key only update the
+            observations in the dictionary
+        x_n: cross-shore position of the model nodes
+        comp_time: model times
+        model_time: time of the snapshot plots
+
+    Returns:
+        matchups (dict): gauge name: {variable: {'time', 'obs', 'model', 'plot_ind', 'node'}} of the time matched
+            data and the index of the model node of the gauge
+
+    """
+    names = [name for name in sorted(gauges) if gauges[name]['TS_toggle']]
+    if len(names) == 0:
+        return {}
+    # closest node to every gauge at once
+    obs_loc = np.array([round(gauges[name]['xFRF']) for name in names])
+    nodes = np.argmin(np.abs(np.subtract.outer(obs_loc, np.asarray(x_n))), axis=1)
+
+    matchups = dict((name, {}) for name in names)
+    for var, timeKey, plotIndKey, modelOut, matchFunc in matchVars:
+        names_v = [name for name in names if var in gauges[name]]
+        if len(names_v) == 0:
+            continue
+        # model time series at all the gauges with this variable, [t, gauge]
+        modAll = np.asarray(modelOut)[:, nodes[[names.index(name) for name in names_v]]]
+        for ii, name in enumerate(names_v):
+            # the currents of a gauge share one time, U is matched with it before V replaces it below
+            obs_time = gauges[name][timeKey if timeKey is not None else 'cur_time']
+            comp_time_n, obs_n, mod_n = matchFunc(obs_time, gauges[name][var], comp_time, modAll[:, ii])
+            plot_ind = np.where(abs(comp_time_n - model_time) == min(abs(comp_time_n - model_time)), 1, 0)
+            matchups[name][var] = {'time': comp_time_n, 'obs': obs_n, 'model': mod_n, 'plot_ind': plot_ind,
+                                   'node': nodes[names.index(name)]}
+
+    # re-assign the time matched data for the snapshot plots
+    for var, timeKey, plotIndKey, modelOut, matchFunc in matchVars:
+        for name in names:
+            if var not in matchups[name]:
+                continue
+            gauges[name][var] = matchups[name][var]['obs']
+            if timeKey is not None:
+                gauges[name][timeKey] = matchups[name][var]['time']
+                gauges[name][plotIndKey] = matchups[name][var]['plot_ind']
+
+    return matchups
+
 def makeCSHORE_ncdict(startTime,inputDict):
     """
 
@@ -730,39 +395,26 @@ def makeCSHORE_ncdict(startTime,inputDict):
     nc_dict['yFRF'] = meta["BC_FRF_Y"]
 
     # get my stuff that needs to be rotated
-    test_fun = lambda x: vectorRotation(x, theta=pierang + (90 - pierang) + pierang)
-    nc_dict['aveE'] = np.zeros([dim_t, dim_x])
-    nc_dict['aveN'] = np.zeros([dim_t, dim_x])
-    nc_dict['stdE'] = np.zeros([dim_t, dim_x])
-    nc_dict['stdN'] = np.zeros([dim_t, dim_x])
+    # vectorRotation is a linear rotation, probing it with the unit vectors gives its matrix which is then applied to
+    # the whole [time, x] arrays at once
+    theta = pierang + (90 - pierang) + pierang
+    rotation = np.array([vectorRotation((1, 0), theta=theta), vectorRotation((0, 1), theta=theta)], dtype=float).T
+    def rotate(x, y):
+        x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+        return rotation[0, 0] * x + rotation[0, 1] * y, rotation[1, 0] * x + rotation[1, 1] * y
+
+    # current stuff
+    nc_dict['aveE'], nc_dict['aveN'] = rotate(hydro['umean'], hydro['vmean'])
+    nc_dict['stdE'], nc_dict['stdN'] = rotate(hydro['ustd'], hydro['vstd'])
+
+    # wave angle
+    t1 = np.rad2deg(np.asarray(hydro['stheta'], dtype=float))
     nc_dict['waveMeanDirection'] = np.zeros([dim_t, dim_x]) + np.nan
-    nc_dict['qbx'] = np.zeros([dim_t, dim_x])
-    nc_dict['qby'] = np.zeros([dim_t, dim_x])
-    nc_dict['qsx'] = np.zeros([dim_t, dim_x])
-    nc_dict['qsy'] = np.zeros([dim_t, dim_x])
-    for ii in range(0, len(hydro['umean'])):
-        # current stuff
-        newV = [test_fun(x) for x in zip(hydro['umean'][ii][:], hydro['vmean'][ii][:])]
-        nc_dict['aveE'][ii] = zip(*newV)[0]
-        nc_dict['aveN'][ii] = zip(*newV)[1]
-
-        newStd = [test_fun(x) for x in zip(hydro['ustd'][ii][:], hydro['vstd'][ii][:])]
-        nc_dict['stdE'][ii] = zip(*newStd)[0]
-        nc_dict['stdN'][ii] = zip(*newStd)[1]
-
-        # wave angle
-        t1 = 360 / float(2 * np.pi) * hydro['stheta'][ii]
-        t1[~np.isnan(t1)] = STWangle2geo(t1[~np.isnan(t1)], pierang=pierang)
-        nc_dict['waveMeanDirection'][ii] = t1
-
-        # sediment transport rate
-        new_qb = [test_fun(x) for x in zip(sed['qbx'][ii][:], sed['qby'][ii][:])]
-        nc_dict['qbx'][ii] = zip(*new_qb)[0]
-        nc_dict['qby'][ii] = zip(*new_qb)[1]
-
-        new_qs = [test_fun(x) for x in zip(sed['qsx'][ii][:], sed['qsy'][ii][:])]
-        nc_dict['qsx'][ii] = zip(*new_qs)[0]
-        nc_dict['qsy'][ii] = zip(*new_qs)[1]
+    nc_dict['waveMeanDirection'][~np.isnan(t1)] = STWangle2geo(t1[~np.isnan(t1)], pierang=pierang)
+
+    # sediment transport rate
+    nc_dict['qbx'], nc_dict['qby'] = rotate(sed['qbx'], sed['qby'])
+    nc_dict['qsx'], nc_dict['qsy'] = rotate(sed['qsx'], sed['qsy'])
 
     # wave and WL stuff!!!!
     nc_dict['waveHs'] = hydro['Hs']
@@ -812,6 +464,7 @@ def CSHOREsimSetup(startTime, inputDict):
             workindDir - location where the user wants to have all the data and stuff
 
     """
+    from matplotlib import pyplot as plt  # only for the bathymetry QA plots
     # pull the stuff I need out of the dict
     timerun = inputDict['simulationDuration']
     version_prefix = inputDict['version_prefix']
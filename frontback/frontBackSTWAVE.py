@@ -10,7 +10,6 @@
 import prepdata.prepDataLib
 from testbedutils import anglesLib
 from prepdata.inputOutput import stwaveIO
-from plotting import operationalPlots as oP
 from prepdata import inputOutput
 from getdatatestbed import getDataFRF
 import prepdata.prepDataLib as STPD
@@ -253,6 +252,103 @@ def STsimSetup(startTime, inputDict):
 
     return nproc_parent, nproc_nest
 
+def getProductSelection(inputDict):
+    """Parses the optional 'products' block of the input yaml, this controls which output products the analyze
+    routine will load, rotate and write.  Anything left out of the block defaults to everything
+
+    Args:
+        inputDict (dict): dictionary of input parameters read in by input file, will look for key 'products' with
+            fields (list): field variables to write ['waveHs', 'waveTm', 'waveDm', 'waveTp', 'xRadGrad', 'yRadGrad',
+                'dissipation'], waveHs is always written as it sets the field file dimensions
+            grids (list): field grids to write ['Local', 'Regional']
+            stations (list): station file names to write (eg. ['8m-array', 'awac-6m'])
+            spectra (bool): rotate and write the directional spectra into the station files, without them the station
+                comparison plots are made from the bulk Hs, Tp and Dm
+
+    Returns:
+        products (dict): with keys 'fields', 'grids', 'stations' and 'spectra', stations is None when all stations
+            are selected
+
+    Raises:
+        ValueError: if the block has a key, field or grid that isn't one of the above
+
+    """
+    allFields = ['waveHs', 'waveTm', 'waveDm', 'waveTp', 'xRadGrad', 'yRadGrad', 'dissipation']
+    allGrids = ['Local', 'Regional']
+    selection = inputDict.get('products', None)
+    if selection is None:
+        selection = {}
+    for key in selection:
+        if key not in ['fields', 'grids', 'stations', 'spectra']:
+            raise ValueError('products key {} must be in {}'.format(key, ['fields', 'grids', 'stations', 'spectra']))
+    products = {'fields': selection.get('fields', 'all'),
+                'grids': selection.get('grids', 'all'),
+                'stations': selection.get('stations', 'all'),
+                'spectra': selection.get('spectra', True)}
+    if products['fields'] in ['all', None]:
+        products['fields'] = allFields
+    if products['grids'] in ['all', None]:
+        products['grids'] = allGrids
+    if products['stations'] in ['all', None]:
+        products['stations'] = None
+    for field in products['fields']:
+        if field not in allFields:
+            raise ValueError('products fields {} must be in {}'.format(field, allFields))
+    for grid in products['grids']:
+        if grid not in allGrids:
+            raise ValueError('products grids {} must be in {}'.format(grid, allGrids))
+    if 'waveHs' not in products['fields']:
+        products['fields'] = ['waveHs'] + list(products['fields'])  # waveHs defines field file dimensions
+
+    return products
+
+def checkBoundarySkill(obs, modSpec, modFreqs, modDirs, modTime, full, angadj=70, RMSE=0.1, bias=0.1):
+    """Validates the offshore boundary condition of a simulation by comparing the modeled significant wave height at
+    the offshore gauge to the observed,  this is a fail safe to abort the run before any products are written if the
+    boundary conditions don't meet the quality standards below
+
+    Args:
+        obs (dict): observed directional wave spectra (from getObs.getWaveSpec) for the boundary gauge, this will be
+            chopped to the half plane in place if the simulation is not full plane
+        modSpec (array): modeled spectra at the boundary gauge rotated to true north [t, freq, dir]
+        modFreqs (array): modeled frequencies
+        modDirs (array): modeled directions (true north)
+        modTime (list): datetimes of the modeled spectra
+        full (bool): True for full plane simulation, False for half plane
+        angadj (int): angle to adjust the half plane chop by (default=70)
+        RMSE (float): RMSE threshold on the boundary Hm0 (default=0.1 m, within 10 centimeters)
+        bias (float): bias threshold on the boundary Hm0 (default=0.1 m, within 10 centimeters)
+
+    Returns:
+        stats (dict): statsBryant statistics of the boundary Hm0, None if there were not enough matched observations
+            to evaluate
+
+    Raises:
+        RuntimeError: if the boundary condition fails the RMSE or bias threshold
+
+    """
+    from testbedutils import waveLib as sbwave
+    if full == False:
+        obs['dWED'], obs['wavedirbin'] = sbwave.HPchop_spec(obs['dWED'], obs['wavedirbin'], angadj=angadj)
+    obsStats = sbwave.waveStat(obs['dWED'], obs['wavefreqbin'], obs['wavedirbin'])
+    modStats = sbwave.waveStat(modSpec, modFreqs, modDirs)
+    time, obsi, modi = sb.timeMatch(obs['epochtime'], np.arange(obs['time'].shape[0]),
+                                    nc.date2num(modTime, 'seconds since 1970-01-01'), np.arange(len(modTime)))
+    if np.size(obsi) <= 1 or np.size(modi) <= 1:
+        print('   not enough boundary observations to validate the offshore boundary')
+        return None
+    obsHs = obsStats['Hm0'][obsi.astype(np.int)]
+    if isinstance(obsHs, np.ma.masked_array) and ~obsHs.mask.any():
+        obsHs = np.array(obsHs)
+    stats = sb.statsBryant(obsHs, modStats['Hm0'][modi.astype(np.int)])
+    if stats['RMSE'] >= RMSE or np.abs(stats['bias']) >= bias:
+        print('!!!!!!!!!!FAILED BOUNDARY!!!!!!!!')
+        print('boundary condition RMSE  = {} threshold = {}'.format(stats['RMSE'], RMSE))
+        print('boundary condition bias  = {} threshold = {}'.format(stats['bias'], bias))
+        raise RuntimeError('The Model Is not validating its offshore boundary condition')
+
+    return stats
+
 def STanalyze(startTime, inputDict):
     """the master call for the simulation post process for STWAVE
     plots and netCDF files are made at request
@@ -267,6 +363,8 @@ def STanalyze(startTime, inputDict):
           None
 
     """
+    from plotting import operationalPlots as oP  # matplotlib is only loaded when results are analyzed
+    from plotting import plotQueue
     # ___________________ Unpack input dictionary _________________________________
     # _____________________________________________________________________________
     # globals
@@ -286,6 +384,17 @@ def STanalyze(startTime, inputDict):
     else:
         print('Chosing CHL thredds by Default, this may be slower!')
         server = 'CHL'
+    products = getProductSelection(inputDict)  # which fields, grids, stations and spectra to make
+    staticBathymetry = inputDict.get('staticBathymetry', False)  # write field bathymetry once, not every time step
+    ncAppend = inputDict.get('ncAppend', None)  # append windows to 'month' or 'year' files rather than one per window
+    assert ncAppend in [None, 'month', 'year'], "ncAppend must be 'month' or 'year'"
+    outputFormat = inputDict.get('outputFormat', 'netCDF')  # 'netCDF' or 'zarr' (chunked directory store)
+    assert outputFormat in ['netCDF', 'zarr'], "outputFormat must be 'netCDF' or 'zarr'"
+    outExt = '.zarr' if outputFormat == 'zarr' else '.nc'
+    ncDiskless = inputDict.get('ncDiskless', False)  # assemble netCDF files in memory, one write each
+    fields = products['fields']
+    grids = products['grids']
+    stationSelected = lambda station: station != ':' and (products['stations'] is None or station in products['stations'])
     ######### model static global setups
     if type(timerun) == str:
         timerun = int(timerun)
@@ -300,6 +409,13 @@ def STanalyze(startTime, inputDict):
     datestring = startTime.strftime('%Y-%m-%dT%H%M%SZ')  # a string for file names
     fpath = os.path.join(path_prefix, datestring)
     fldrArch = os.path.join(model, version_prefix)
+    # station output file names, ordered as the stations in the sim files
+    RegionalStations = ['waverider-26m', 'waverider-17m', 'awac-11m', ':', ':', ':', ':', ':', ':', ':'] # where :'s are for sims in the nested
+    NestedStations = [':', ':', ':','8m-array', 'awac-6m', 'awac-4.5m', 'adop-3.5m', 'xp200m', 'xp150m', 'xp125m']
+    if (version_prefix == 'CB' or version_prefix == 'CBHP') and \
+            (startTime >= DT.datetime(2015,10,15) and endTime < DT.datetime(2015, 11, 1)):
+        NestedStations.extend(('Station_p11', 'Station_p12', 'Station_p13', 'Station_p14', 'Station_p21', 'Station_p22',
+                              'Station_p23', 'Station_p24'))
     print('\nBeggining of Analyze Script\nLooking for file in {}'.format(fpath))
     print('\nData Start: {}  Finish: {}'.format(startTime, endTime))
 
@@ -340,44 +456,65 @@ def STanalyze(startTime, inputDict):
     obse_packet = stio.obseload(nested=False)
     obse_nested = stio.obseload(nested=True)
 
-    # creating template for spec to go into netCDF files
-    obse_packet['ncSpec'] = np.ones((obse_packet['spec'].shape[0], obse_packet['spec'].shape[1], obse_packet['spec'].shape[2], 72)) * 1e-6
-    obse_nested['ncSpec'] = np.ones((obse_nested['spec'].shape[0], obse_nested['spec'].shape[1], obse_nested['spec'].shape[2], 72)) * 1e-6
-    # rotating the spectra back to true north (TN) then
-    for station in range(0, np.size(obse_packet['spec'], axis=1)):
-        obse_packet['ncSpec'][:, station, :, :], obse_packet['ncDirs'] = prepdata.grid2geo_spec_rotate(
-            obse_packet['directions'], obse_packet['spec'][:, station, :, :])
-        obse_nested['ncSpec'][:, station, :, :], obse_nested['ncDirs'] = prepdata.grid2geo_spec_rotate(
-            obse_nested['directions'], obse_nested['spec'][:, station, :, :])
-        # converting m^2/Hz/radians back to m^2/Hz/degree
-        # note that units of degrees are on the denominator which requires a deg2rad conversion instead of rad2deg
-        obse_packet['ncSpec'][:, station, :, :] = np.deg2rad(obse_packet['ncSpec'][:, station, :, :])
-        obse_nested['ncSpec'][:, station, :, :] = np.deg2rad(obse_nested['ncSpec'][:, station, :, :])
+    if products['spectra'] == True:
+        # creating template for spec to go into netCDF files
+        obse_packet['ncSpec'] = np.ones((obse_packet['spec'].shape[0], obse_packet['spec'].shape[1], obse_packet['spec'].shape[2], 72)) * 1e-6
+        obse_nested['ncSpec'] = np.ones((obse_nested['spec'].shape[0], obse_nested['spec'].shape[1], obse_nested['spec'].shape[2], 72)) * 1e-6
+        # rotating the spectra back to true north (TN) then, only for the stations that will be written
+        for station in range(0, np.size(obse_packet['spec'], axis=1)):
+            if station < len(RegionalStations) and stationSelected(RegionalStations[station]):
+                obse_packet['ncSpec'][:, station, :, :], obse_packet['ncDirs'] = prepdata.grid2geo_spec_rotate(
+                    obse_packet['directions'], obse_packet['spec'][:, station, :, :])
+                # converting m^2/Hz/radians back to m^2/Hz/degree
+                # note that units of degrees are on the denominator which requires a deg2rad conversion instead of rad2deg
+                obse_packet['ncSpec'][:, station, :, :] = np.deg2rad(obse_packet['ncSpec'][:, station, :, :])
+            if station < len(NestedStations) and stationSelected(NestedStations[station]):
+                obse_nested['ncSpec'][:, station, :, :], obse_nested['ncDirs'] = prepdata.grid2geo_spec_rotate(
+                    obse_nested['directions'], obse_nested['spec'][:, station, :, :])
+                obse_nested['ncSpec'][:, station, :, :] = np.deg2rad(obse_nested['ncSpec'][:, station, :, :])
     if obse_packet['spec'].shape[3] == 72:
         full = True
     else:
         full = False
+    # ____________________ validate the offshore boundary before anything is written ____________________
+    boundaryObs = go.getWaveSpec('waverider-26m')
+    if 'time' in boundaryObs:  # simulations initalized from the 17m have no 26m data to compare
+        if products['spectra'] == True and stationSelected(RegionalStations[0]):
+            boundarySpec, boundaryDirs = obse_packet['ncSpec'][:, 0, :, :], obse_packet['ncDirs']
+        else:  # rotate the boundary spectra just for the check
+            boundarySpec, boundaryDirs = prepdata.grid2geo_spec_rotate(obse_packet['directions'], obse_packet['spec'][:, 0, :, :])
+            boundarySpec = np.deg2rad(boundarySpec)
+        checkBoundarySkill(boundaryObs, boundarySpec, obse_packet['Frequencies'], boundaryDirs, stat_packet['time'][:],
+                           full=full, angadj=angadj)
+    else:
+        boundaryObs = None
 
  ######################################################################################################################
  ######################################################################################################################
  ##################################  Spatial Data HERE     ############################################################
  ######################################################################################################################
  ######################################################################################################################
-    # load Files
+    # load Files, only those that are selected as output products
     print '  ..begin loading spatial files ....'
-    rad_nest = stio.genLoad('rad', nested=True)
-    break_nest = stio.genLoad('break', nested=True)
+    rad_nest, break_nest, Tp_pack, Tp_nest, wave_pack, wave_nest = None, None, None, None, None, None
     dep_pack = prepdata.GetOriginalGridFromSTWAVE(stio.simfname[0], stio.depfname[0])
     dep_nest = prepdata.GetOriginalGridFromSTWAVE(stio.simfname_nest[0], stio.depfname_nest[0])
-    Tp_pack = stio.TPload(nested=0) # this function is currently faster than genLoad
-    # Tp_pack2 = stio.genLoad('waveTp', nested=False)
-    Tp_nest = stio.TPload(nested=1)  # this function is currently faster than genLoad
-    #  Tp_nest2 = stio.genLoad('waveTp', nested=True)
-    wave_pack = stio.waveload(nested=0)
-    # wave_pack2 = stio.genLoad('wave', nested=False)
-    wave_nest = stio.waveload(nested=1)
-    # wave_nest2 = stio.genLoad('wave', nested=True)
-
+    if 'Local' in grids:
+        if 'xRadGrad' in fields or 'yRadGrad' in fields:
+            rad_nest = stio.genLoad('rad', nested=True)
+        if 'dissipation' in fields:
+            break_nest = stio.genLoad('break', nested=True)
+        if 'waveTp' in fields:
+            Tp_nest = stio.TPload(nested=1)  # this function is currently faster than genLoad
+            #  Tp_nest2 = stio.genLoad('waveTp', nested=True)
+        wave_nest = stio.waveload(nested=1)
+        # wave_nest2 = stio.genLoad('wave', nested=True)
+    if 'Regional' in grids:
+        if 'waveTp' in fields:
+            Tp_pack = stio.TPload(nested=0) # this function is currently faster than genLoad
+            # Tp_pack2 = stio.genLoad('waveTp', nested=False)
+        wave_pack = stio.waveload(nested=0)
+        # wave_pack2 = stio.genLoad('wave', nested=False)
 
     print 'Files loaded, in %s ' %(DT.datetime.now() - d)
 
@@ -386,142 +523,120 @@ def STanalyze(startTime, inputDict):
         d = DT.datetime.now()
         plotFnameRegional = 'figures/CMTB_waveModels_STWAVE_%s_Regional-' % version_prefix
         plotFnameLocal = 'figures/CMTB_waveModels_STWAVE_%s_Local-' % version_prefix
-        ## first make dicts for nested plots
-        dep_nest_plot = {'title': 'Local FRF Property: Bathymetry', 'xlabel': 'Longshore distance [m]',
-                         'ylabel': 'Cross-shore distance [m]',      'field': dep_nest['bathy'],
-                         'xcoord': dep_nest['xFRF'],                'ycoord': dep_nest['yFRF'],
-                         'cblabel': 'Water Depth - NAVD88 $[m]$',   'time': dep_nest['time']}
-        Hs_nest_plot = {'title': 'Local FRF North Property: Significant wave height $H_s$',
-                        'xlabel': 'Longshore distance [m]', 'ylabel': 'Cross-shore distance [m]',
-                        'field': wave_nest['Hs_field'],     'xcoord': dep_nest['xFRF'],
-                        'ycoord': dep_nest['yFRF'],         'cblabel': 'Wave height $H_s [m]$',
-                        'time': wave_nest['time']}
-        Tm_nest_plot = {'title': 'Local FRF North Property: Mean wave period $T_m$',
-                        'xlabel': 'Longshore distance [m]', 'ylabel': 'Cross-shore distance [m]',
-                        'field': wave_nest['Tm_field'],     'xcoord': dep_nest['xFRF'],
-                        'ycoord': dep_nest['yFRF'],         'cblabel': 'Mean Period $T_m [s]$',
-                        'time': wave_nest['time']}
-        # Dm_nest_plot = {'title': 'Local FRF North Property: Mean wave direction $D_m$',
-        #                 'xlabel': 'Longshore distance [m]', 'ylabel': 'Cross-shore distance [m]',
-        #                 'field': wave_nest['Dm_field'],     'xcoord': dep_nest['xFRF'],
-        #                 'ycoord': dep_nest['yFRF'],         'cblabel': 'Mean Direction $\degree Shore Normal$',
-        #                 'time': wave_nest['time']}
-        Tp_nest_plot = {'title': 'Local FRF North Property: Peak wave period $T_p$',
-                        'xlabel': 'Longshore distance [m]', 'ylabel': 'Cross-shore distance [m]',
-                        'field': Tp_nest['Tp_field'],       'xcoord': dep_nest['xFRF'],
-                        'ycoord': dep_nest['yFRF'],         'cblabel': 'Peak Period $T_p [s]$',
-                        'time': Tp_nest['time']}
-        break_nest_plot = {'title': 'Local FRF North Property: Wave Dissipation',
-                        'xlabel': 'Longshore distance [m]', 'ylabel': 'Cross-shore distance [m]',
-                        'field': break_nest['dissipation'],       'xcoord': dep_nest['xFRF'],
-                        'ycoord': dep_nest['yFRF'],         'cblabel': 'Wave Dissipation',
-                        'time': Tp_nest['time']}
-        # now create pickle if one's not around
-        rads_nest_plot_x = {'title': 'Local FRF North Property: Radiation Stress Gradients - X',
-                        'xlabel': 'Longshore distance [m]', 'ylabel': 'Cross-shore distance [m]',
-                        'field': rad_nest['xRadGrad'],       'xcoord': dep_nest['xFRF'],
-                        'ycoord': dep_nest['yFRF'],         'cblabel': 'Radiation Stress Gradients - X ',
-                        'time': Tp_nest['time']}
-        rads_nest_plot_y = {'title': 'Local FRF North Property: Radiation Stress Gradients - Y',
+        plotJobs = []  # animations to render, they're dispatched once the netCDF files are written
+        if wave_nest is not None:
+            # the bathymetry as it is now, the netCDF files are written (and dep_nest changed) before plotting
+            nestContours = {'bathy': dep_nest['bathy']}
+            ## first make dicts for nested plots
+            dep_nest_plot = {'title': 'Local FRF Property: Bathymetry', 'xlabel': 'Longshore distance [m]',
+                             'ylabel': 'Cross-shore distance [m]',      'field': dep_nest['bathy'],
+                             'xcoord': dep_nest['xFRF'],                'ycoord': dep_nest['yFRF'],
+                             'cblabel': 'Water Depth - NAVD88 $[m]$',   'time': dep_nest['time'],
+                             'static': True}  # one grid per run, drawn once without a time in the title
+            Hs_nest_plot = {'title': 'Local FRF North Property: Significant wave height $H_s$',
                             'xlabel': 'Longshore distance [m]', 'ylabel': 'Cross-shore distance [m]',
-                            'field': rad_nest['yRadGrad'], 'xcoord': dep_nest['xFRF'],
-                            'ycoord': dep_nest['yFRF'], 'cblabel': 'Radiation Stress Gradients - Y',
-                            'time': Tp_nest['time']}
-        # make nested plots
-        oP.plotSpatialFieldData(dep_nest, dep_nest_plot, os.path.join(fpath, plotFnameLocal + 'bathy'), nested=True)
-        oP.plotSpatialFieldData(dep_nest, Tp_nest_plot, os.path.join(fpath, plotFnameLocal + 'Tp'), nested=True)
-        oP.plotSpatialFieldData(dep_nest, Hs_nest_plot, os.path.join(fpath, plotFnameLocal + 'Hs'), nested=True, directions=wave_nest['Dm_field'])
-        oP.plotSpatialFieldData(dep_nest, Tm_nest_plot, os.path.join(fpath, plotFnameLocal + 'Tm'), nested=True)
-        # oP.plotSpatialFieldData(dep_nest, Dm_nest_plot, plotFnameLocal + 'Dm', fpath, nested=True)
-        oP.plotSpatialFieldData(dep_nest, rads_nest_plot_y, os.path.join(fpath, plotFnameLocal + 'xRG'), nested=True)
-        oP.plotSpatialFieldData(dep_nest, rads_nest_plot_x, os.path.join(fpath, plotFnameLocal + 'yRG'), nested=True)
-        oP.plotSpatialFieldData(dep_nest, break_nest_plot, os.path.join(fpath, plotFnameLocal + 'break'), nested=True)
-
-        # find xfshore profile loc
-        xshoreCoord = np.argmin(np.abs(dep_nest['yFRF']  - 945))
-        for ttime in range(wave_nest['Hs_field'].shape[0]):
-            fname = os.path.join(fpath, plotFnameLocal+ 'LocalxShoreWaveHeight_{}.png'.format(wave_nest['time'][ttime].strftime("%Y%m%dT%H%M%SZ")))
-            oP.plotWaveProfile(dep_nest['xFRF'], wave_nest['Hs_field'][ttime, xshoreCoord,:], -dep_nest['bathy'][0,xshoreCoord,:], fname)
+                            'field': wave_nest['Hs_field'],     'xcoord': dep_nest['xFRF'],
+                            'ycoord': dep_nest['yFRF'],         'cblabel': 'Wave height $H_s [m]$',
+                            'time': wave_nest['time']}
+            Tm_nest_plot = {'title': 'Local FRF North Property: Mean wave period $T_m$',
+                            'xlabel': 'Longshore distance [m]', 'ylabel': 'Cross-shore distance [m]',
+                            'field': wave_nest['Tm_field'],     'xcoord': dep_nest['xFRF'],
+                            'ycoord': dep_nest['yFRF'],         'cblabel': 'Mean Period $T_m [s]$',
+                            'time': wave_nest['time']}
+            # Dm_nest_plot = {'title': 'Local FRF North Property: Mean wave direction $D_m$',
+            #                 'xlabel': 'Longshore distance [m]', 'ylabel': 'Cross-shore distance [m]',
+            #                 'field': wave_nest['Dm_field'],     'xcoord': dep_nest['xFRF'],
+            #                 'ycoord': dep_nest['yFRF'],         'cblabel': 'Mean Direction $\degree Shore Normal$',
+            #                 'time': wave_nest['time']}
+            # make nested plots
+            plotJobs.append({'contourpacket': nestContours, 'fieldpacket': dep_nest_plot, 'nested': True,
+                             'prefix': os.path.join(fpath, plotFnameLocal + 'bathy')})
+            plotJobs.append({'contourpacket': nestContours, 'fieldpacket': Hs_nest_plot, 'nested': True,
+                             'prefix': os.path.join(fpath, plotFnameLocal + 'Hs'), 'directions': wave_nest['Dm_field']})
+            plotJobs.append({'contourpacket': nestContours, 'fieldpacket': Tm_nest_plot, 'nested': True,
+                             'prefix': os.path.join(fpath, plotFnameLocal + 'Tm')})
+            # oP.plotSpatialFieldData(dep_nest, Dm_nest_plot, plotFnameLocal + 'Dm', fpath, nested=True)
+            if Tp_nest is not None:
+                Tp_nest_plot = {'title': 'Local FRF North Property: Peak wave period $T_p$',
+                                'xlabel': 'Longshore distance [m]', 'ylabel': 'Cross-shore distance [m]',
+                                'field': Tp_nest['Tp_field'],       'xcoord': dep_nest['xFRF'],
+                                'ycoord': dep_nest['yFRF'],         'cblabel': 'Peak Period $T_p [s]$',
+                                'time': Tp_nest['time']}
+                plotJobs.append({'contourpacket': nestContours, 'fieldpacket': Tp_nest_plot, 'nested': True,
+                                 'prefix': os.path.join(fpath, plotFnameLocal + 'Tp')})
+            if break_nest is not None:
+                break_nest_plot = {'title': 'Local FRF North Property: Wave Dissipation',
+                                'xlabel': 'Longshore distance [m]', 'ylabel': 'Cross-shore distance [m]',
+                                'field': break_nest['dissipation'],       'xcoord': dep_nest['xFRF'],
+                                'ycoord': dep_nest['yFRF'],         'cblabel': 'Wave Dissipation',
+                                'time': wave_nest['time']}
+                plotJobs.append({'contourpacket': nestContours, 'fieldpacket': break_nest_plot, 'nested': True,
+                                 'prefix': os.path.join(fpath, plotFnameLocal + 'break')})
+            if rad_nest is not None:
+                rads_nest_plot_x = {'title': 'Local FRF North Property: Radiation Stress Gradients - X',
+                                'xlabel': 'Longshore distance [m]', 'ylabel': 'Cross-shore distance [m]',
+                                'field': rad_nest['xRadGrad'],       'xcoord': dep_nest['xFRF'],
+                                'ycoord': dep_nest['yFRF'],         'cblabel': 'Radiation Stress Gradients - X ',
+                                'time': wave_nest['time']}
+                rads_nest_plot_y = {'title': 'Local FRF North Property: Radiation Stress Gradients - Y',
+                                    'xlabel': 'Longshore distance [m]', 'ylabel': 'Cross-shore distance [m]',
+                                    'field': rad_nest['yRadGrad'], 'xcoord': dep_nest['xFRF'],
+                                    'ycoord': dep_nest['yFRF'], 'cblabel': 'Radiation Stress Gradients - Y',
+                                    'time': wave_nest['time']}
+                plotJobs.append({'contourpacket': nestContours, 'fieldpacket': rads_nest_plot_y, 'nested': True,
+                                 'prefix': os.path.join(fpath, plotFnameLocal + 'xRG')})
+                plotJobs.append({'contourpacket': nestContours, 'fieldpacket': rads_nest_plot_x, 'nested': True,
+                                 'prefix': os.path.join(fpath, plotFnameLocal + 'yRG')})
+
+            # find xfshore profile loc
+            xshoreCoord = np.argmin(np.abs(dep_nest['yFRF']  - 945))
+            fnames = [os.path.join(fpath, plotFnameLocal+ 'LocalxShoreWaveHeight_{}.png'.format(wave_nest['time'][ttime].strftime("%Y%m%dT%H%M%SZ")))
+                      for ttime in range(wave_nest['Hs_field'].shape[0])]
+            plotJobs.append({'x': dep_nest['xFRF'], 'waveHs': wave_nest['Hs_field'][:, xshoreCoord, :],
+                             'bathy': -dep_nest['bathy'][0, xshoreCoord, :], 'fnames': fnames})
         ###########################
         #
         # # now make dicts for parent plots
         #
         ###########################
-        dep_parent_plot = {'title': 'Regional Grid: Bathymetery',  'xlabel': 'Longshore distance [m]',
-                           'ylabel': 'Cross-shore distance [m]',   'field': dep_pack['bathy'],
-                           'xcoord': dep_pack['xFRF'],             'ycoord': dep_pack['yFRF'],
-                           'cblabel': 'Water Depth - NAVD88 $[m]$','time': dep_pack['time']}
-        Tp_parent_plot = {'title': 'Regional Grid: Peak wave period $T_p$',
-                          'xlabel': 'Longshore distance [m]',  'ylabel': 'Cross-shore distance [m]',
-                          'field': Tp_pack['Tp_field'], 'xcoord': dep_pack['xFRF'],
-                          'ycoord': dep_pack['yFRF'],   'cblabel': 'Peak Period $T_p [s]$',
-                          'time': Tp_pack['time']}
-        Hs_parent_plot = {'title': 'Regional Grid: Significant wave height $H_s$',
-                          'xlabel': 'Longshore distance [m]', 'ylabel': 'Cross-shore distance [m]',
-                          'field': wave_pack['Hs_field'],     'xcoord': dep_pack['xFRF'],
-                          'ycoord': dep_pack['yFRF'],         'cblabel': 'Wave Height $H_s [m]$',
-                          'time': wave_pack['time']}
-        Tm_parent_plot = {'title': 'Regional Grid: Mean wave period $T_m$',
-                          'xlabel': 'Longshore distance [m]', 'ylabel': 'Cross-shore distance [m]',
-                          'field': wave_pack['Tm_field'],     'xcoord': dep_pack['xFRF'],
-                          'ycoord': dep_pack['yFRF'],         'cblabel': 'Mean Period $T_m [s]$',
-                          'time': wave_pack['time']}
-        # Dm_parent_plot = {'title': 'Regional Grid: Mean wave direction $D_m$',
-        #                   'xlabel': 'Longshore distance [m]',  'ylabel': 'Cross-shore distance [m]',
-        #                   'field': wave_pack['Dm_field'],      'xcoord': dep_pack['xFRF'],
-        #                   'ycoord': dep_pack['yFRF'],          'cblabel': 'Mean Direction $\degree Shore Normal$',
-        #                   'time': wave_pack['time']}
-
-        oP.plotSpatialFieldData(dep_pack, dep_parent_plot, os.path.join(fpath, plotFnameRegional + 'bathy'), nested=0)
-        oP.plotSpatialFieldData(dep_pack, Tm_parent_plot, prefix=os.path.join(fpath, plotFnameRegional + 'Tm'), nested=0)
-        # oP.plotSpatialFieldData(dep_pack, Dm_parent_plot, plotFnameRegional + 'Dm', fpath, nested=0)
-        oP.plotSpatialFieldData(dep_pack, Hs_parent_plot, os.path.join(fpath, plotFnameRegional + 'Hs'), nested=0, directions=wave_pack['Dm_field'])
-        oP.plotSpatialFieldData(dep_pack, Tp_parent_plot, os.path.join(fpath, plotFnameRegional + 'Tp'), nested=0)
-
-        # ################################
-        # Make GIFs from Images          #
-        # ## #############################
-
-        # localDm = sorted(glob.glob(os.path.join(fpath,'figures/*Local-Dm*.png')))
-        # sb.makegif(localDm, fpath+ plotFnameLocal + 'Dm_%s.gif' %(datestring))
-        # [os.remove(ff) for ff in localDm]
-        localTm = sorted(glob.glob(fpath + '/figures/*Local-Tm*.png'))
-        localHs = sorted(glob.glob(fpath + '/figures/*Local-Hs*.png'))
-        localTp = sorted(glob.glob(fpath + '/figures/*Local-Tp*.png'))
-        localxHs = sorted(glob.glob(fpath + '/figures/*LocalxShoreWaveHeight*.png'))
-        localxRad = sorted(glob.glob(fpath + '/figures/*Local-xRG*.png'))
-        localyRad = sorted(glob.glob(fpath + '/figures/*Local-yRG*.png'))
-        localBreak = sorted(glob.glob(fpath + '/figures/*Local-break*.png'))
-        regTm = sorted(glob.glob(fpath + '/figures/*Regional-Tm*.png'))
-        regHs = sorted(glob.glob(fpath + '/figures/*Regional-Hs*.png'))
-        regTp = sorted(glob.glob(fpath + '/figures/*Regional-Tp*.png'))
-
-        sb.makegif(localTm, os.path.join(fpath, plotFnameLocal + 'Tm_%s.gif'%(datestring)))
-        sb.makegif(localHs, os.path.join(fpath, plotFnameLocal + 'Hs_%s.gif' %(datestring)))
-        sb.makegif(localTp, os.path.join(fpath, plotFnameLocal + 'Tp_%s.gif' %(datestring)))
-        sb.makegif(localxHs, os.path.join(fpath, plotFnameLocal + 'xShoreWaveHeight_%s.gif' %(datestring)))
-        sb.makegif(localxRad, os.path.join(fpath, plotFnameLocal + 'xRadGrad_{}.gif'.format(datestring)))
-        sb.makegif(localyRad, os.path.join( fpath, plotFnameLocal + 'yRadGrad_{}.gif'.format(datestring)))
-        sb.makegif(localBreak, os.path.join(fpath, plotFnameLocal + 'Break_{}.gif'.format(datestring)))
-        sb.makegif(regTm, os.path.join(fpath, plotFnameRegional +  'Tm_%s.gif' %(datestring)))
-        sb.makegif(regHs, os.path.join(fpath, plotFnameRegional + 'Hs_%s.gif' %(datestring)))
-        sb.makegif(regTp, os.path.join(fpath, plotFnameRegional + 'Tp_%s.gif' %(datestring)))
-
-        [os.remove(ff) for ff in localHs]
-        [os.remove(ff) for ff in localTp]
-        [os.remove(ff) for ff in localxHs]
-        [os.remove(ff) for ff in localxRad]
-        [os.remove(ff) for ff in localyRad]
-        [os.remove(ff) for ff in localBreak]
-        [os.remove(ff) for ff in regTm]
-        [os.remove(ff) for ff in regHs]
-        [os.remove(ff) for ff in regTp]
-        [os.remove(ff) for ff in localTm]
-
-        # regDm = sorted(glob.glob(fpath + '/figures/*Regional-Dm*.png'))
-        # sb.makegif(regDm, fpath+ plotFnameRegional + 'Dm_%s.gif' %(datestring))
-        # [os.remove(ff) for ff in regDm]
-        print '-- Spatial plots were made in %s ' %(DT.datetime.now() - d)
+        if wave_pack is not None:
+            parentContours = {'bathy': dep_pack['bathy']}
+            dep_parent_plot = {'title': 'Regional Grid: Bathymetery',  'xlabel': 'Longshore distance [m]',
+                               'ylabel': 'Cross-shore distance [m]',   'field': dep_pack['bathy'],
+                               'xcoord': dep_pack['xFRF'],             'ycoord': dep_pack['yFRF'],
+                               'cblabel': 'Water Depth - NAVD88 $[m]$','time': dep_pack['time'],
+                               'static': True}
+            Hs_parent_plot = {'title': 'Regional Grid: Significant wave height $H_s$',
+                              'xlabel': 'Longshore distance [m]', 'ylabel': 'Cross-shore distance [m]',
+                              'field': wave_pack['Hs_field'],     'xcoord': dep_pack['xFRF'],
+                              'ycoord': dep_pack['yFRF'],         'cblabel': 'Wave Height $H_s [m]$',
+                              'time': wave_pack['time']}
+            Tm_parent_plot = {'title': 'Regional Grid: Mean wave period $T_m$',
+                              'xlabel': 'Longshore distance [m]', 'ylabel': 'Cross-shore distance [m]',
+                              'field': wave_pack['Tm_field'],     'xcoord': dep_pack['xFRF'],
+                              'ycoord': dep_pack['yFRF'],         'cblabel': 'Mean Period $T_m [s]$',
+                              'time': wave_pack['time']}
+            # Dm_parent_plot = {'title': 'Regional Grid: Mean wave direction $D_m$',
+            #                   'xlabel': 'Longshore distance [m]',  'ylabel': 'Cross-shore distance [m]',
+            #                   'field': wave_pack['Dm_field'],      'xcoord': dep_pack['xFRF'],
+            #                   'ycoord': dep_pack['yFRF'],          'cblabel': 'Mean Direction $\degree Shore Normal$',
+            #                   'time': wave_pack['time']}
+
+            plotJobs.append({'contourpacket': parentContours, 'fieldpacket': dep_parent_plot, 'nested': 0,
+                             'prefix': os.path.join(fpath, plotFnameRegional + 'bathy')})
+            plotJobs.append({'contourpacket': parentContours, 'fieldpacket': Tm_parent_plot, 'nested': 0,
+                             'prefix': os.path.join(fpath, plotFnameRegional + 'Tm')})
+            # oP.plotSpatialFieldData(dep_pack, Dm_parent_plot, plotFnameRegional + 'Dm', fpath, nested=0)
+            plotJobs.append({'contourpacket': parentContours, 'fieldpacket': Hs_parent_plot, 'nested': 0,
+                             'prefix': os.path.join(fpath, plotFnameRegional + 'Hs'), 'directions': wave_pack['Dm_field']})
+            if Tp_pack is not None:
+                Tp_parent_plot = {'title': 'Regional Grid: Peak wave period $T_p$',
+                                  'xlabel': 'Longshore distance [m]',  'ylabel': 'Cross-shore distance [m]',
+                                  'field': Tp_pack['Tp_field'], 'xcoord': dep_pack['xFRF'],
+                                  'ycoord': dep_pack['yFRF'],   'cblabel': 'Peak Period $T_p [s]$',
+                                  'time': Tp_pack['time']}
+                plotJobs.append({'contourpacket': parentContours, 'fieldpacket': Tp_parent_plot, 'nested': 0,
+                                 'prefix': os.path.join(fpath, plotFnameRegional + 'Tp')})
 
     # ################################
     # Make NETCDF files              #
@@ -536,90 +651,106 @@ def STanalyze(startTime, inputDict):
     locVarYml =  'yaml_files/waveModels/{}/Field_var.yml'.format(model)
     regVarYml = 'yaml_files/waveModels/{}/Field_var.yml'.format(model)
     flagfname = fpath + '/Flags%s.out.txt' % datestring  # startTime # the name of flag file
+    # netCDF files are named for the window, or for the start of the month/year they are appended to
+    if ncAppend == 'month':
+        ncDatestring = startTime.replace(day=1, hour=0, minute=0, second=0).strftime('%Y-%m-%dT%H%M%SZ')
+    elif ncAppend == 'year':
+        ncDatestring = startTime.replace(month=1, day=1, hour=0, minute=0, second=0).strftime('%Y-%m-%dT%H%M%SZ')
+    else:
+        ncDatestring = datestring
+    appendNC = ncAppend is not None
     if np.median(dep_pack['bathy']) < 0:
         dep_pack['bathy'] = - dep_pack['bathy']
     if np.median(dep_nest['bathy']) < 0:
         dep_nest['bathy'] = -dep_nest['bathy']
 
-    if dep_pack['gridFname'].lower().strip('"')=='regional_17mgrid_50m':
-        # check domain on server - assume that it's correct
-        def Fixup17mGrid(version_prefix, wave_pack, dep_pack, Tp_pack, fill_value=np.nan):
-            """This function is designed to add filler data to size the truncated grid that's created with the offshore
-            boundary is initalized from the 17m waverider not the 26m waverider,  data output from the model are placed
-            into filled arrays with the fill value default in this function
-
-            Args:
-                version_prefix (str): version prefix associated with output data, function uses this to pull full
-                    grid data (shape, cell coordinates, etc)
-                wave_pack (dict): will look for
-                dep_pack (dict):
-                Tp_pack (dict):
-                fill_value: will use this fill value to fill arrays where the model did not produce data (defaule=np.nan)
-
-            Returns:
-                new dictionaries that are the size of the full data arrays, using fill values
-
-            """
-            ncfile = nc.Dataset('http://bones/thredds/dodsC/cmtb/waveModels/STWAVE/{}/Regional-Field/Regional-Field.ncml'.format(version_prefix))
-            NJ, NI =  ncfile['waveHs'].shape[1:]
-            fill = np.ones((wave_pack['Hs_field'].shape[0], NJ, NI)) * fill_value
-            # replace all the field values with the filled, value to the same dim
-            # start with wave_pack
-            for var in wave_pack.keys():
-                if var.split('_')[-1].lower() == 'field':
-                    fill[:, :, slice(0, wave_pack[var].shape[2])] = wave_pack[var]
-                    wave_pack[var] = fill
-            # fill dep_pack
-            for var in dep_pack.keys():
-                if var.split('_')[-1].lower() == 'bathy':
-                    fill[:, :, slice(0, dep_pack[var].shape[2])] = dep_pack[var]
-                    dep_pack[var] = fill
-                elif var in ['yFRF', 'xFRF']:
-                    dep_pack[var] = ncfile[var][:]
-            try:
-                dep_pack['longitude'] = ncfile['longitude'][:]
-                dep_pack['latitude'] = ncfile['latitude'][:]
-            except IndexError:
-                pass
-            dep_pack['NI'] = NI  # reset the dimensions so its written properly
-            dep_pack['NJ'] = NJ  # reset dims
-            # finally Tp
-            fill[:, :, slice(0, Tp_pack['Tp_field'].shape[2])] = Tp_pack['Tp_field']
-            Tp_pack['Tp_field'] = fill
-
-            return wave_pack, dep_pack, Tp_pack
-        wave_pack, dep_pack, Tp_pack = Fixup17mGrid(version_prefix, wave_pack, dep_pack, Tp_pack)
-    # writing data librarys
-    regionalDataLib = {'time': nc.date2num(wave_pack['time'], units='seconds since 1970-01-01 00:00:00'),
-                       'station_name': 'Regional Simulation Field Data',
-                       'waveHs': wave_pack['Hs_field'],
-                       'waveTm': wave_pack['Tm_field'],
-                       'waveDm': wave_pack['Dm_field'],
-                       'waveTp': Tp_pack['Tp_field'],
-                       'bathymetry': dep_pack['bathy'],
-                       'latitude': dep_pack['latitude'],
-                       'longitude': dep_pack['longitude'],
-                       'xFRF': dep_pack['xFRF'],
-                       'yFRF': dep_pack['yFRF'],
-                       'DX': dep_pack['DX'],
-                       'DY': dep_pack['DY'],
-                       'NI': dep_pack['NI'],
-                       'NJ': dep_pack['NJ']}
-
-    # make regional field nc file, set file to be made on thredds
-    # TdsFldrBase = Thredds_Base + '/'+ fpath.split('/')[2] + '/Regional-Field'
-    TdsFldrBase = os.path.join(Thredds_Base,fldrArch)
-    NCpath = sb.makeNCdir(Thredds_Base, os.path.join(version_prefix, 'Regional-Field'), datestring, model=model)
-    NCname = 'CMTB-waveModels_{}_{}_Regional-Field_{}.nc'.format(model, version_prefix, datestring)
-    regionalOFName = os.path.join(NCpath, NCname)  # TdsF
-    if not os.path.exists(os.path.join(TdsFldrBase, 'Regional-Field')):
-        os.makedirs(os.path.join(TdsFldrBase, 'Regional-Field'))  # maameke the directory for the thredds data output
-    if not os.path.exists(os.path.join(TdsFldrBase, 'Regional-Field', 'Regional-Field.ncml')):
-        inputOutput.makencml(os.path.join(TdsFldrBase, 'Regional-Field', 'Regional-Field.ncml'))  # remake the ncml if its not there
-
-    assert os.path.isfile(regGlobYml), 'NetCDF yaml files are not created'
-    makenc.makenc_field(data_lib=regionalDataLib, globalyaml_fname=regGlobYml, flagfname=flagfname,
-                        ofname=regionalOFName, var_yaml_fname=regVarYml)
+    if 'Regional' in grids:
+        if dep_pack['gridFname'].lower().strip('"')=='regional_17mgrid_50m':
+            # check domain on server - assume that it's correct
+            def Fixup17mGrid(version_prefix, wave_pack, dep_pack, Tp_pack, fill_value=np.nan):
+                """This function is designed to add filler data to size the truncated grid that's created with the offshore
+                boundary is initalized from the 17m waverider not the 26m waverider,  data output from the model are placed
+                into filled arrays with the fill value default in this function
+
+                Args:
+                    version_prefix (str): version prefix associated with output data, function uses this to pull full
+                        grid data (shape, cell coordinates, etc)
+                    wave_pack (dict): will look for
+                    dep_pack (dict):
+                    Tp_pack (dict):
+                    fill_value: will use this fill value to fill arrays where the model did not produce data (defaule=np.nan)
+
+                Returns:
+                    new dictionaries that are the size of the full data arrays, using fill values
+
+                """
+                ncfile = nc.Dataset('http://bones/thredds/dodsC/cmtb/waveModels/STWAVE/{}/Regional-Field/Regional-Field.ncml'.format(version_prefix))
+                NJ, NI =  ncfile['waveHs'].shape[1:]
+                fill = np.ones((wave_pack['Hs_field'].shape[0], NJ, NI)) * fill_value
+                # replace all the field values with the filled, value to the same dim
+                # start with wave_pack
+                for var in wave_pack.keys():
+                    if var.split('_')[-1].lower() == 'field':
+                        fill[:, :, slice(0, wave_pack[var].shape[2])] = wave_pack[var]
+                        wave_pack[var] = fill
+                # fill dep_pack
+                for var in dep_pack.keys():
+                    if var.split('_')[-1].lower() == 'bathy':
+                        fill[:, :, slice(0, dep_pack[var].shape[2])] = dep_pack[var]
+                        dep_pack[var] = fill
+                    elif var in ['yFRF', 'xFRF']:
+                        dep_pack[var] = ncfile[var][:]
+                try:
+                    dep_pack['longitude'] = ncfile['longitude'][:]
+                    dep_pack['latitude'] = ncfile['latitude'][:]
+                except IndexError:
+                    pass
+                dep_pack['NI'] = NI  # reset the dimensions so its written properly
+                dep_pack['NJ'] = NJ  # reset dims
+                # finally Tp, if it was loaded
+                if Tp_pack is not None:
+                    fill[:, :, slice(0, Tp_pack['Tp_field'].shape[2])] = Tp_pack['Tp_field']
+                    Tp_pack['Tp_field'] = fill
+
+                return wave_pack, dep_pack, Tp_pack
+            wave_pack, dep_pack, Tp_pack = Fixup17mGrid(version_prefix, wave_pack, dep_pack, Tp_pack)
+        # writing data librarys
+        regionalDataLib = {'time': nc.date2num(wave_pack['time'], units='seconds since 1970-01-01 00:00:00'),
+                           'station_name': 'Regional Simulation Field Data',
+                           'waveHs': wave_pack['Hs_field'],
+                           'bathymetry': dep_pack['bathy'],
+                           'latitude': dep_pack['latitude'],
+                           'longitude': dep_pack['longitude'],
+                           'xFRF': dep_pack['xFRF'],
+                           'yFRF': dep_pack['yFRF'],
+                           'DX': dep_pack['DX'],
+                           'DY': dep_pack['DY'],
+                           'NI': dep_pack['NI'],
+                           'NJ': dep_pack['NJ']}
+
+        for var, key in [('waveTm', 'Tm_field'), ('waveDm', 'Dm_field')]:
+            if var in fields:
+                regionalDataLib[var] = wave_pack[key]
+        if Tp_pack is not None:
+            regionalDataLib['waveTp'] = Tp_pack['Tp_field']
+        # make regional field nc file, set file to be made on thredds
+        # TdsFldrBase = Thredds_Base + '/'+ fpath.split('/')[2] + '/Regional-Field'
+        TdsFldrBase = os.path.join(Thredds_Base,fldrArch)
+        NCpath = sb.makeNCdir(Thredds_Base, os.path.join(version_prefix, 'Regional-Field'), ncDatestring, model=model)
+        NCname = 'CMTB-waveModels_{}_{}_Regional-Field_{}'.format(model, version_prefix, ncDatestring) + outExt
+        regionalOFName = os.path.join(NCpath, NCname)  # TdsF
+        if not os.path.exists(os.path.join(TdsFldrBase, 'Regional-Field')):
+            os.makedirs(os.path.join(TdsFldrBase, 'Regional-Field'))  # maameke the directory for the thredds data output
+        if not os.path.exists(os.path.join(TdsFldrBase, 'Regional-Field', 'Regional-Field.ncml')):
+            inputOutput.makencml(os.path.join(TdsFldrBase, 'Regional-Field', 'Regional-Field.ncml'))  # remake the ncml if its not there
+
+        assert os.path.isfile(regGlobYml), 'NetCDF yaml files are not created'
+        makenc.makenc_field(data_lib=regionalDataLib, globalyaml_fname=regGlobYml, flagfname=flagfname,
+                            ofname=regionalOFName, var_yaml_fname=regVarYml, staticBathymetry=staticBathymetry,
+                            append=appendNC, backend=outputFormat, diskless=ncDiskless)
+        makenc.update_nc_catalog(os.path.join(TdsFldrBase, 'Regional-Field', 'Regional-Field.catalog.sqlite'),
+                                 regionalOFName, regionalDataLib['time'], version_prefix, 'Regional-Field',
+                                 append=appendNC)
 
     # Making record of the Date of the survey/inversion in datetime format
     gridNameSplit = dep_nest['gridFname'].split('_')
@@ -631,53 +762,56 @@ def STanalyze(startTime, inputDict):
         except ValueError:
             bathyTime = DT.datetime.strptime(bathyDateA, '%Y-%m-%d')
 
-    localDataLib = {'time': nc.date2num(wave_nest['time'], units='seconds since 1970-01-01 00:00:00'),
-                    'station_name': 'Nested Simulation Field Data',
-                    'waveHs': wave_nest['Hs_field'],
-                    'waveTm': wave_nest['Tm_field'],
-                    'waveDm': wave_nest['Dm_field'],
-                    'waveTp': Tp_nest['Tp_field'],
-                    'bathymetry': dep_nest['bathy'],
-                    'xRadGrad': rad_nest['xRadGrad'],
-                    'yRadGrad': rad_nest['yRadGrad'],
-                    'dissipation': break_nest['dissipation'],
-                    'bathymetryDate': nc.date2num(bathyTime, units='seconds since 1970-01-01 00:00:00'),
-                    'latitude': dep_nest['latitude'],
-                    'longitude': dep_nest['longitude'],
-                    'xFRF': dep_nest['xFRF'],
-                    'yFRF': dep_nest['yFRF'],
-                    'NI': dep_nest['NI'],
-                    'NJ': dep_nest['NJ'],
-                    'DX': dep_nest['DX'],
-                    'DY': dep_nest['DY']}
-
-    # make local field nc file
-    TdsFldrBase = os.path.join(Thredds_Base,fldrArch)
-    NCpath = sb.makeNCdir(Thredds_Base, os.path.join(version_prefix, 'Local-Field'), datestring, model=model)
-    NCname = 'CMTB-waveModels_{}_{}_Local-Field_{}.nc'.format(model, version_prefix, datestring)
-    localOFName = os.path.join(NCpath, NCname)  # Td
-
-    if not os.path.exists(os.path.join(TdsFldrBase, 'Local-Field')):
-        os.makedirs(os.path.join(TdsFldrBase, 'Local-Field')) # maameke the directory for th
-    if not os.path.exists(os.path.join(TdsFldrBase, 'Local-Field', 'Local-Field.ncml')):
-        inputOutput.makencml(os.path.join(TdsFldrBase, 'Local-Field', 'Local-Field.ncml'))
-    makenc.makenc_field(data_lib=localDataLib, globalyaml_fname=locGlobYml, flagfname=flagfname,
-                        ofname=localOFName, var_yaml_fname=locVarYml)
+    if 'Local' in grids:
+        localDataLib = {'time': nc.date2num(wave_nest['time'], units='seconds since 1970-01-01 00:00:00'),
+                        'station_name': 'Nested Simulation Field Data',
+                        'waveHs': wave_nest['Hs_field'],
+                        'bathymetry': dep_nest['bathy'],
+                        'bathymetryDate': nc.date2num(bathyTime, units='seconds since 1970-01-01 00:00:00'),
+                        'latitude': dep_nest['latitude'],
+                        'longitude': dep_nest['longitude'],
+                        'xFRF': dep_nest['xFRF'],
+                        'yFRF': dep_nest['yFRF'],
+                        'NI': dep_nest['NI'],
+                        'NJ': dep_nest['NJ'],
+                        'DX': dep_nest['DX'],
+                        'DY': dep_nest['DY']}
+
+        for var, key in [('waveTm', 'Tm_field'), ('waveDm', 'Dm_field')]:
+            if var in fields:
+                localDataLib[var] = wave_nest[key]
+        if Tp_nest is not None:
+            localDataLib['waveTp'] = Tp_nest['Tp_field']
+        if rad_nest is not None:
+            for var in ['xRadGrad', 'yRadGrad']:
+                if var in fields:
+                    localDataLib[var] = rad_nest[var]
+        if break_nest is not None:
+            localDataLib['dissipation'] = break_nest['dissipation']
+        # make local field nc file
+        TdsFldrBase = os.path.join(Thredds_Base,fldrArch)
+        NCpath = sb.makeNCdir(Thredds_Base, os.path.join(version_prefix, 'Local-Field'), ncDatestring, model=model)
+        NCname = 'CMTB-waveModels_{}_{}_Local-Field_{}'.format(model, version_prefix, ncDatestring) + outExt
+        localOFName = os.path.join(NCpath, NCname)  # Td
+
+        if not os.path.exists(os.path.join(TdsFldrBase, 'Local-Field')):
+            os.makedirs(os.path.join(TdsFldrBase, 'Local-Field')) # maameke the directory for th
+        if not os.path.exists(os.path.join(TdsFldrBase, 'Local-Field', 'Local-Field.ncml')):
+            inputOutput.makencml(os.path.join(TdsFldrBase, 'Local-Field', 'Local-Field.ncml'))
+        makenc.makenc_field(data_lib=localDataLib, globalyaml_fname=locGlobYml, flagfname=flagfname,
+                            ofname=localOFName, var_yaml_fname=locVarYml, staticBathymetry=staticBathymetry,
+                            append=appendNC, backend=outputFormat, diskless=ncDiskless)
+        makenc.update_nc_catalog(os.path.join(TdsFldrBase, 'Local-Field', 'Local-Field.catalog.sqlite'),
+                                 localOFName, localDataLib['time'], version_prefix, 'Local-Field', append=appendNC)
     ######################################################################################################################
     ######################################################################################################################
     ##################################  Wave Station Files HERE (loop) ###################################################
     ######################################################################################################################
     ######################################################################################################################
-    RegionalStations = ['waverider-26m', 'waverider-17m', 'awac-11m', ':', ':', ':', ':', ':', ':', ':'] # where :'s are for sims in the nested
-    NestedStations = [':', ':', ':','8m-array', 'awac-6m', 'awac-4.5m', 'adop-3.5m', 'xp200m', 'xp150m', 'xp125m']
-    if (version_prefix == 'CB' or version_prefix == 'CBHP') and \
-            (startTime >= DT.datetime(2015,10,15) and endTime < DT.datetime(2015, 11, 1)):
-        NestedStations.extend(('Station_p11', 'Station_p12', 'Station_p13', 'Station_p14', 'Station_p21', 'Station_p22',
-                              'Station_p23', 'Station_p24'))
     # writing station files from regional/parent simulation
     for gg, station in enumerate(RegionalStations):
         stat_yaml_fname = station_var_yaml
-        if station != ':':
+        if stationSelected(station):
             # getting lat lon
             coords = gp.FRFcoord(stat_packet['Easting'][0, gg], stat_packet['Northing'][0, gg])
             stat_data = {'time': nc.date2num(stat_packet['time'][:], units='seconds since 1970-01-01 00:00:00'),
@@ -693,17 +827,18 @@ def STanalyze(startTime, inputDict):
                          'Latitude' : coords['Lat'],
                          'Longitude' : coords['Lon'],
                          'station_name': station,
-                         'directionalWaveEnergyDensity': obse_packet['ncSpec'][:,gg,:,:],
-                         'waveDirectionBins': obse_packet['ncDirs'],
-                         'waveFrequency': obse_packet['Frequencies'],
                          'DX': dep_pack['DX'],
                          'DY': dep_pack['DY'],
                          'NI': dep_pack['NI'],
                          'NJ': dep_pack['NJ']}
+            if products['spectra'] == True:
+                stat_data['directionalWaveEnergyDensity'] = obse_packet['ncSpec'][:,gg,:,:]
+                stat_data['waveDirectionBins'] = obse_packet['ncDirs']
+                stat_data['waveFrequency'] = obse_packet['Frequencies']
             # move Local netCDF to Thredds
             TdsFldrBase = os.path.join(Thredds_Base,fldrArch)
-            NCpath = sb.makeNCdir(Thredds_Base, os.path.join(version_prefix, station), datestring, model=model)
-            NCname = 'CMTB-waveModels_{}_{}_{}_{}.nc'.format(model, version_prefix, station, datestring)
+            NCpath = sb.makeNCdir(Thredds_Base, os.path.join(version_prefix, station), ncDatestring, model=model)
+            NCname = 'CMTB-waveModels_{}_{}_{}_{}'.format(model, version_prefix, station, ncDatestring) + outExt
             outFileName = os.path.join(NCpath, NCname)  # Td
 
             if not os.path.exists(os.path.join(TdsFldrBase, station)):
@@ -712,10 +847,13 @@ def STanalyze(startTime, inputDict):
                 inputOutput.makencml(os.path.join(TdsFldrBase, station, station+'.ncml'))
             assert os.path.isfile(globalyaml_fname_station), 'NetCDF yaml files are not created'
             makenc.makenc_Station(stat_data, globalyaml_fname=globalyaml_fname_station, flagfname=flagfname,
-                                     ofname=outFileName, stat_yaml_fname=stat_yaml_fname)
+                                     ofname=outFileName, stat_yaml_fname=stat_yaml_fname, append=appendNC,
+                                     backend=outputFormat, diskless=ncDiskless)
+            makenc.update_nc_catalog(os.path.join(TdsFldrBase, station, station + '.catalog.sqlite'), outFileName,
+                                     stat_data['time'], version_prefix, station, append=appendNC)
     for gg, station in enumerate(NestedStations):
         stat_yaml_fname = station_var_yaml
-        if station != ':': # stations marked with ':' for file names are not in the nested simulation
+        if stationSelected(station): # stations marked with ':' for file names are not in the nested simulation
             # getting lat lon
             coords = gp.FRFcoord(stat_packet['Easting'][0, gg], stat_packet['Northing'][0, gg])
             stat_dataNest = {'time': nc.date2num(modelpacket_nest['time'][:], units='seconds since 1970-01-01 00:00:00'),
@@ -731,17 +869,18 @@ def STanalyze(startTime, inputDict):
                          'Latitude': coords['Lat'],
                          'Longitude': coords['Lon'],
                          'station_name': station,
-                         'directionalWaveEnergyDensity': obse_nested['ncSpec'][:, gg, :, :],
-                         'waveDirectionBins': obse_nested['ncDirs'],
-                         'waveFrequency': obse_nested['Frequencies'],
                          'DX': dep_nest['DX'],
                          'DY': dep_nest['DY'],
                          'NI': dep_nest['NI'],
                          'NJ': dep_nest['NJ']}
+            if products['spectra'] == True:
+                stat_dataNest['directionalWaveEnergyDensity'] = obse_nested['ncSpec'][:, gg, :, :]
+                stat_dataNest['waveDirectionBins'] = obse_nested['ncDirs']
+                stat_dataNest['waveFrequency'] = obse_nested['Frequencies']
             # move Local netCDF to Thredds
             TdsFldrBase = os.path.join(Thredds_Base,fldrArch)
-            NCpath = sb.makeNCdir(Thredds_Base, os.path.join(version_prefix, station), datestring, model=model)
-            NCname = 'CMTB-waveModels_{}_{}_{}_{}.nc'.format(model, version_prefix, station, datestring)
+            NCpath = sb.makeNCdir(Thredds_Base, os.path.join(version_prefix, station), ncDatestring, model=model)
+            NCname = 'CMTB-waveModels_{}_{}_{}_{}'.format(model, version_prefix, station, ncDatestring) + outExt
             outFileName = os.path.join(NCpath, NCname)  # Td
 
             if not os.path.exists(os.path.join(TdsFldrBase, station)):
@@ -750,9 +889,45 @@ def STanalyze(startTime, inputDict):
                 inputOutput.makencml(os.path.join(TdsFldrBase, station, station+'.ncml'))
             assert os.path.isfile(globalyaml_fname_station), 'NetCDF yaml files are not created'
             makenc.makenc_Station(stat_dataNest, globalyaml_fname=globalyaml_fname_station, flagfname=flagfname,
-                                    ofname=outFileName, stat_yaml_fname=stat_yaml_fname)
+                                    ofname=outFileName, stat_yaml_fname=stat_yaml_fname, append=appendNC,
+                                    backend=outputFormat, diskless=ncDiskless)
+            makenc.update_nc_catalog(os.path.join(TdsFldrBase, station, station + '.catalog.sqlite'), outFileName,
+                                     stat_dataNest['time'], version_prefix, station, append=appendNC)
 
     print("netCDF file's created for {} in {}".format(startTime, DT.datetime.now()-d))
+    if plotFlag == True:
+        # ################################
+        # Make GIFs from the frames      #
+        # ## #############################
+        # (file name pattern, gif name) frames are streamed straight into the gif, pngs only on request
+        gifList = [('Local-Tm', plotFnameLocal + 'Tm_%s.gif' % (datestring)),
+                   ('Local-Hs', plotFnameLocal + 'Hs_%s.gif' % (datestring)),
+                   ('Local-Tp', plotFnameLocal + 'Tp_%s.gif' % (datestring)),
+                   ('LocalxShoreWaveHeight', plotFnameLocal + 'xShoreWaveHeight_%s.gif' % (datestring)),
+                   ('Local-xRG', plotFnameLocal + 'xRadGrad_{}.gif'.format(datestring)),
+                   ('Local-yRG', plotFnameLocal + 'yRadGrad_{}.gif'.format(datestring)),
+                   ('Local-break', plotFnameLocal + 'Break_{}.gif'.format(datestring)),
+                   ('Regional-Tm', plotFnameRegional + 'Tm_%s.gif' % (datestring)),
+                   ('Regional-Hs', plotFnameRegional + 'Hs_%s.gif' % (datestring)),
+                   ('Regional-Tp', plotFnameRegional + 'Tp_%s.gif' % (datestring))]
+        # ('Local-Dm', plotFnameLocal + 'Dm_%s.gif' %(datestring)), ('Regional-Dm', plotFnameRegional + 'Dm_%s.gif' %(datestring))
+        for job in plotJobs:
+            if 'fieldpacket' in job:
+                job['raster'] = inputDict.get('rasterPlots', False)  # pcolormesh rather than contourf fields
+            for pattern, gifName in gifList:
+                if pattern in job.get('prefix', job.get('fnames', [''])[0]):
+                    job['animation'] = os.path.join(fpath, gifName)
+                    job['savePng'] = inputDict.get('savePngFrames', False)
+        # the data products are written, the spatial plots are made now (in the background with a plot queue)
+        d = DT.datetime.now()
+        plotQueue.dispatch(inputDict.get('plotQueue', None), 'STWAVE spatial plots {}'.format(datestring),
+                           oP.plotSpatialFrames, plotJobs,
+                           nproc=plotQueue.workersPerJob(inputDict.get('plotQueue', None), inputDict.get('plotWorkers', None)),
+                           renderCache=inputDict.get('renderCache', None))  # reuse identical frames (e.g. bathymetry)
+        if inputDict.get('plotQueue', None) is None:
+            print '-- Spatial plots were made in %s ' %(DT.datetime.now() - d)
+        else:
+            print '-- Spatial plots were queued, see the plot queue report for their completion'
     # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
     ## COLLECT  ALL data (process, rotate, time pair and make comparison plots)
     # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
@@ -761,17 +936,29 @@ def STanalyze(startTime, inputDict):
         print '  Plotting Time Series Data '
         stationList = ['waverider-26m', 'waverider-17m', 'awac-11m', '8m-array', 'awac-6m', 'awac-4.5m', 'adop-3.5m', 'xp200m', 'xp150m', 'xp125m']
         for gg, station in enumerate(stationList):
+            if not stationSelected(station):
+                continue
             print 'working on %s' %station
-            # go get comparison data
-            w = go.getWaveSpec(station)
+            # go get comparison data, the boundary gauge was already retrieved (and chopped) for validation
+            if station == 'waverider-26m' and boundaryObs is not None:
+                w = boundaryObs
+            else:
+                w = go.getWaveSpec(station)
             if 'time' in w:  # if there's data (not only location)
                 if station in go.directional:
-                    if full == False and station in go.directional:
+                    if full == False and station in go.directional and w is not boundaryObs:
                         w['dWED'], w['wavedirbin'] = sbwave.HPchop_spec(w['dWED'], w['wavedirbin'], angadj=angadj)
                     obsStats = sbwave.waveStat(w['dWED'], w['wavefreqbin'], w['wavedirbin'])
                 else: # calc non directional stats
                     obsStats = sbwave.stats1D(w['fspec'], w['wavefreqbin'])
-                if station in ['waverider-17m', 'awac-11m', 'waverider-26m']:
+                if products['spectra'] == False:
+                    # the spectra weren't rotated, compare the bulk parameters from the station files
+                    if station in ['waverider-17m', 'awac-11m', 'waverider-26m']:
+                        modPacket = stat_packet
+                    else:
+                        modPacket = modelpacket_nest
+                    modStats = {'Hm0': modPacket['Hs'][:, gg], 'Tp': modPacket['Tp'][:, gg], 'Dm': modPacket['WaveDm'][:, gg]}
+                elif station in ['waverider-17m', 'awac-11m', 'waverider-26m']:
                     modStats = sbwave.waveStat(obse_packet['ncSpec'][:, gg, :, :], obse_packet['Frequencies'], obse_packet['ncDirs'])  # compute model stats here
                 else:
                     modStats = sbwave.waveStat(obse_nested['ncSpec'][:, gg, :, :], obse_nested['Frequencies'], obse_nested['ncDirs'])  # compute model stats here
@@ -786,6 +973,7 @@ def STanalyze(startTime, inputDict):
                     plotList = ['Hm0', 'Tm', 'sprdF', 'sprdD', 'Tp', 'Dm']
                 else:
                     plotList = ['Hm0', 'Tm', 'sprdF', 'Tp']
+                ofnames, dataDicts = [], []  # all of the parameters at this station are plotted together below
                 for param in modStats:
                     if np.size(obsi) > 1 and np.size(modi) > 1 and param in plotList:
                         if param in ['Tm', 'Tp', 'Tm10', 'Tave']:
@@ -815,23 +1003,7 @@ def STanalyze(startTime, inputDict):
                                     'var_name': param,
                                     'units': units,
                                     'p_title': title}
-                        oP.obs_V_mod_TS(ofname, dataDict, logo_path='ArchiveFolder/CHL_logo.png')
-                        if station == 'waverider-26m' and param == 'Hm0':
-                            # this is a fail safe to abort run if the boundary conditions don't
-                            # meet quality standards below
-                            bias = 0.1  # bias has to be within 10 centimeters
-                            RMSE = 0.1  # RMSE has to be within 10 centimeters
-                            if isinstance(dataDict['obs'], np.ma.masked_array) and ~dataDict['obs'].mask.any():
-                                dataDict['obs'] = np.array(dataDict['obs'])
-                            stats = sb.statsBryant(dataDict['obs'], dataDict['model'])
-                            try:
-                                assert stats['RMSE'] < RMSE, 'RMSE test on spectral boundary energy failed'
-                                assert np.abs(stats['bias']) < bias, 'bias test on spectral boundary energy failed'
-                            except:
-                                print('!!!!!!!!!!FAILED BOUNDARY!!!!!!!!')
-                                print('boundary condition RMSE  = {} threshold = {}'.format(stats['RMSE'], RMSE))
-                                print('boundary condition bias  = {} threshold = {}'.format(stats['bias'], bias))
-                                print('deleting data from thredds!')
-                                # os.remove(fieldOfname)
-                                os.remove(outFileName)
-                                raise RuntimeError('The Model Is not validating its offshore boundary condition')
+                        ofnames.append(ofname)
+                        dataDicts.append(dataDict)
+                plotQueue.dispatch(inputDict.get('plotQueue', None), 'STWAVE {} plots {}'.format(station, datestring),
+                                   oP.obs_V_mod_TS_batch, ofnames, dataDicts, logo_path='ArchiveFolder/CHL_logo.png')
@@ -8,10 +8,23 @@ part of the Coastal Model Test Bed (CMTB)
 """
 import numpy as np
 import netCDF4 as nc
-import csv, yaml
+import csv, yaml, os, sqlite3, contextlib, json
 import datetime as DT
 import time as ttime
 
+# per process cache of parsed (and compiled) yaml templates keyed by absolute path, entries are (mtime, template)
+_template_cache = {}
+# List all possible variable attributes in the template
+possible_var_attr = ['standard_name', 'long_name', 'coordinates', 'flag_values', 'flag_meanings', 'description',
+                     'notes', 'positive', 'valid_min', 'valid_max', 'calendar', 'description', 'cf_role',
+                     'missing_value']
+# default storage policy for [time, ...] arrays (uncompressed, library chunking), a template opts in to chunking and
+# compression with a '_storage' block and each variable with its own zlib, complevel, shuffle and chunksizes keys
+# (least_significant_digit quantizes the data)
+default_storage = {}
+storage_keys = ['zlib', 'complevel', 'shuffle', 'chunksizes']
+_pending_renames = {}  # id of open diskless files: (temporary file name, final file name)
+
 def readflags(flagfname, header=1):
     """This function reads the flag file from the data in to the STWAVE CMTB runs
 
@@ -58,36 +71,348 @@ def import_template_file(yaml_location):
 
     Step 1 in netCDF file creation, open global and variable yamls
 
+    Each yaml is parsed once per process and kept until the file's modification time changes, variable templates
+    (those with '_variables') are validated and compiled (see compile_template) when they are parsed
+
     Args:
       yaml_location: yaml file location
 
     Returns:
-        dictionary with variables from the yaml file
+        dictionary with variables from the yaml file, a shallow copy of the cached template so callers can add
+        attributes to it
+
+    """
+    key = os.path.abspath(yaml_location)
+    mtime = os.path.getmtime(key)
+    if key not in _template_cache or _template_cache[key][0] != mtime:
+        # load the template
+        f = open(yaml_location)
+        # use safe_load instead load
+        vars_dict = yaml.safe_load(f)
+        f.close()
+        if isinstance(vars_dict, dict) and '_variables' in vars_dict:
+            vars_dict['_compiled'] = compile_template(vars_dict, yaml_location)
+        _template_cache[key] = (mtime, vars_dict)
+
+    return dict(_template_cache[key][1])
+
+def compile_template(template_vars, yaml_location=''):
+    """Validates a variable template and precomputes the createVariable arguments and the attributes of each variable
+    so write_data_to_nc doesn't walk the template for every file written.  Problems are kept with the variable and
+    only reported (as write errors) when a data dictionary holds the variable, templates list variables not every
+    product writes (e.g. qcFlags)
+
+    Args:
+      template_vars (dict): variable and meta data loaded from a variable yaml
+      yaml_location (str): name of the yaml, kept in the error of a variable that can't be defined (Default value = '')
+
+    Returns:
+      dictionary keyed by variable with 'create' (createVariable keyword arguments), 'storage' (chunking and
+      compression keyword arguments, see define_nc_variable), 'attrs' (list of (attribute, value) pairs), 'ndim' and
+      'data_type', or 'error' (str) if the variable can't be defined
+
+    """
+    storage = dict(default_storage)
+    if template_vars.get('_storage', None) is not None:
+        storage.update(template_vars['_storage'])
+    compiled = {}
+    for var in template_vars['_variables']:
+        if var not in template_vars:
+            compiled[var] = {'error': '{}: no template for variable'.format(yaml_location)}
+        else:
+            missing = [key for key in ['name', 'data_type', 'dim', 'units'] if key not in template_vars[var]]
+            if len(missing) > 0:
+                compiled[var] = {'error': '{}: template is missing {}'.format(yaml_location, missing)}
+        if var in compiled:
+            continue
+        tmp = template_vars[var]
+        create = {'varname': tmp['name'], 'datatype': tmp['data_type'], 'dimensions': tmp['dim']}
+        if "fill_value" in tmp:
+            create['fill_value'] = tmp['fill_value']
+        if "least_significant_digit" in tmp:
+            create['least_significant_digit'] = tmp['least_significant_digit']
+        varStorage = {}
+        if len(storage) > 0 and len(tmp['dim']) > 1 and tmp['dim'][0] == 'time' and not str(tmp['data_type']).startswith('S'):
+            varStorage.update(storage)  # time varying arrays get the template's policy
+            varStorage.setdefault('chunksizes', 'auto')
+        for key in storage_keys:
+            if key in tmp:
+                varStorage[key] = tmp[key]
+        attrs = [('units', tmp['units'])]
+        # Write the attributes, only write attributes listed in possible_var_attr
+        for attr in possible_var_attr:
+            if attr in tmp:
+                attrs.append((attr, np.nan if tmp[attr] == 'NaN' else tmp[attr]))
+        # Write the short_name attribute as the variable name
+        attrs.append(('short_name', tmp.get('short_name', tmp['name'])))
+        compiled[var] = {'create': create, 'storage': varStorage, 'attrs': attrs, 'ndim': len(tmp['dim']), 'data_type': tmp['data_type']}
+
+    return compiled
+
+def update_nc_catalog(catalog_fname, ofname, times, version_prefix=None, station=None, append=False):
+    """Records a written netCDF file in a small local sqlite catalog of the product's coverage, so tools can find the
+    files holding a time range without scanning the output directories or aggregating remotely.  Catalogs are kept
+    one per product next to the product's ncml file.  Re-writing a file replaces its record
+
+    Args:
+      catalog_fname: sqlite catalog file name (created if it does not exist)
+      ofname: netCDF file that was written
+      times: times in the file in epoch seconds ('seconds since 1970-01-01')
+      version_prefix: version prefix of the simulation that made the file (Default value = None)
+      station: station or product name (Default value = None)
+      append: the file was appended to (see append_data_to_nc), extend its recorded time range rather than
+            replacing it (Default value = False)
+
+    Returns:
+      None
+
+    """
+    times = np.array(times, dtype=float).ravel()
+    conn = sqlite3.connect(catalog_fname, timeout=60)
+    try:
+        with conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, tstart REAL, tend REAL, '
+                         'version_prefix TEXT, station TEXT, modified TEXT)')
+            conn.execute('CREATE INDEX IF NOT EXISTS files_time ON files (tstart, tend)')
+            tstart, tend = float(np.nanmin(times)), float(np.nanmax(times))
+            if append == True:
+                row = conn.execute('SELECT tstart, tend FROM files WHERE path = ?', (os.path.abspath(ofname),)).fetchone()
+                if row is not None:
+                    tstart, tend = min(tstart, row[0]), max(tend, row[1])
+            conn.execute('INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)',
+                         (os.path.abspath(ofname), tstart, tend, version_prefix, station,
+                          ttime.strftime("%Y-%m-%dT%H:%M:%SZ", ttime.gmtime())))
+    finally:
+        conn.close()
+
+def query_nc_catalog(catalog_fname, start, end, version_prefix=None, station=None):
+    """Finds the netCDF files in a coverage catalog (see update_nc_catalog) with data between start and end
+
+    Args:
+      catalog_fname: sqlite catalog file name
+      start: datetime or epoch seconds of the start of the time range
+      end: datetime or epoch seconds of the end of the time range
+      version_prefix: only return files of this version prefix (Default value = None)
+      station: only return files of this station (Default value = None)
+
+    Returns:
+      list of (path, start time, end time) tuples sorted by start time, times are in epoch seconds
+
+    """
+    if isinstance(start, DT.datetime):
+        start = nc.date2num(start, 'seconds since 1970-01-01')
+    if isinstance(end, DT.datetime):
+        end = nc.date2num(end, 'seconds since 1970-01-01')
+    query = 'SELECT path, tstart, tend FROM files WHERE tstart <= ? AND tend >= ?'
+    args = [float(end), float(start)]
+    if version_prefix is not None:
+        query += ' AND version_prefix = ?'
+        args.append(version_prefix)
+    if station is not None:
+        query += ' AND station = ?'
+        args.append(station)
+    conn = sqlite3.connect(catalog_fname, timeout=60)
+    try:
+        rows = conn.execute(query + ' ORDER BY tstart', args).fetchall()
+    finally:
+        conn.close()
+
+    return rows
+
+def close_nc_file(ncfile, discard=False):
+    """Closes a netCDF file opened with init_nc_file, diskless files are written to disk and renamed into place
+
+    Args:
+      ncfile: open netCDF file
+      discard: the write failed, a diskless file's temporary file is removed rather than renamed into place
+            (Default value = False)
+
+    Returns:
+      None
+
+    """
+    pending = _pending_renames.pop(id(ncfile), None)
+    try:
+        ncfile.close()
+    except Exception:
+        discard = True
+        raise
+    finally:
+        if pending is not None and discard == True:
+            if os.path.isfile(pending[0]):
+                os.remove(pending[0])
+        elif pending is not None:
+            os.rename(pending[0], pending[1])
+
+@contextlib.contextmanager
+def new_nc_file(nc_filename, attributes, diskless=False):
+    """Opens a new netCDF file with init_nc_file for a with block, the file is closed with close_nc_file when the
+    block ends.  If the block raises, a diskless file is discarded instead of being renamed into place
+
+    Args:
+      nc_filename: output netCDF file name
+      attributes: attributes from global yaml load
+      diskless: assemble the file in memory (see init_nc_file) (Default value = False)
+
+    """
+    ncfile = init_nc_file(nc_filename, attributes, diskless=diskless)
+    try:
+        yield ncfile
+    except BaseException:
+        close_nc_file(ncfile, discard=True)
+        raise
+    close_nc_file(ncfile)
+
+def variable_stats(data, fill_value=None):
+    """Computes the min, max, mean, number of valid and number of missing (NaN, masked or fill) values for each time
+    step of a [time, ...] array, these are computed on the data in memory as it's written so files don't have to be
+    reopened to find color bar ranges or daily means
+
+    Args:
+      data: array with a leading time dimension
+      fill_value: values equal to this are counted as missing (Default value = None)
+
+    Returns:
+      dictionary of lists (one entry per time step) with keys 'min', 'max', 'mean', 'count', 'nanCount', None where a
+      time step has no valid data
 
     """
-    # load the template
-    f = open(yaml_location)
-    # use safe_load instead load
-    vars_dict = yaml.safe_load(f)
-    f.close()
-    return vars_dict
+    # a masked view of the data as [time, values], only the mask is new
+    values = np.ma.asanyarray(data)
+    values = np.ma.masked_invalid(values.reshape(values.shape[0], -1), copy=False)
+    if fill_value is not None:
+        values = np.ma.masked_equal(values, fill_value, copy=False)
+    count = values.count(axis=1)
+    stepStats = {'min': values.min(axis=1), 'max': values.max(axis=1),
+                 'mean': values.sum(axis=1) / np.maximum(count, 1)}
+    toList = lambda arr: [None if val is np.ma.masked or not np.isfinite(val) else float(val)
+                          for val in np.ma.asarray(arr, dtype=float)]
+    stats = dict((key, toList(val)) for key, val in stepStats.items())
+    stats['count'] = [int(val) for val in count]
+    stats['nanCount'] = [int(val) for val in values.shape[1] - count]
+
+    return stats
+
+def file_stats(stats):
+    """Summarizes per time step statistics (from variable_stats) over the whole file
+
+    Args:
+      stats (dict): per time step statistics of a variable
+
+    Returns:
+      dictionary with keys 'min', 'max', 'mean', 'count', 'nanCount' for the file
+
+    """
+    count = np.array(stats['count'], dtype=float)
+    mins = [val for val in stats['min'] if val is not None]
+    maxs = [val for val in stats['max'] if val is not None]
+    means = np.array([0. if val is None else val for val in stats['mean']])
+    return {'min': min(mins) if len(mins) > 0 else None, 'max': max(maxs) if len(maxs) > 0 else None,
+            'mean': float((means * count).sum() / count.sum()) if count.sum() > 0 else None,
+            'count': int(count.sum()), 'nanCount': int(sum(stats['nanCount']))}
+
+def is_stats_variable(var, compiled_var):
+    """True for floating point [time, ...] variables, the ones summarized with variable_stats"""
+    try:
+        isFloat = np.dtype(compiled_var['data_type']).kind == 'f'
+    except TypeError:
+        isFloat = False
+    return var != 'time' and isFloat and compiled_var['create']['dimensions'][:1] == ['time']
+
+def record_stats(stats, var, compiled_var, data):
+    """Adds a variable's per time step statistics to a stats dictionary (see write_stats_sidecar) and returns its
+    [min, max] for the actual_range attribute (None if there's no valid data)"""
+    stats.setdefault('variables', {})[var] = variable_stats(data, compiled_var['create'].get('fill_value', None))
+    summary = file_stats(stats['variables'][var])
+    if summary['min'] is None:
+        return None
+    return [summary['min'], summary['max']]
+
+def merge_range(new_var, actualRange):
+    """Sets the actual_range attribute of a netCDF variable or zarr array, extending any range already there"""
+    if actualRange is None:
+        return
+    if hasattr(new_var, 'ncattrs'):  # netCDF variable
+        attrs = dict((key, new_var.getncattr(key)) for key in new_var.ncattrs())
+    else:  # zarr array
+        attrs = new_var.attrs
+    if 'actual_range' in attrs:
+        actualRange = [min(actualRange[0], attrs['actual_range'][0]), max(actualRange[1], attrs['actual_range'][1])]
+    if hasattr(new_var, 'setncattr'):
+        new_var.setncattr('actual_range', actualRange)
+    else:
+        new_var.attrs['actual_range'] = actualRange
+
+def write_stats_sidecar(ofname, stats, append=False):
+    """Writes the statistics collected while writing a file to a small JSON sidecar (ofname + '.stats.json') that
+    plotting and monitoring can read instead of the data, see read_stats_sidecar
+
+    Args:
+      ofname: data file name
+      stats (dict): with 'time' (epoch seconds written) and 'variables' (per time step statistics by variable)
+      append: the file was appended to, extend the existing sidecar (Default value = False)
+
+    Returns:
+      None
 
-def init_nc_file(nc_filename, attributes):
+    """
+    sidecar = {'time': [float(tt) for tt in np.ravel(stats.get('time', []))], 'variables': {}}
+    for var, varStats in stats.get('variables', {}).items():
+        sidecar['variables'][var] = dict((key, varStats[key]) for key in ['min', 'max', 'mean', 'count', 'nanCount'])
+    if append == True and os.path.isfile(ofname + '.stats.json'):
+        old = read_stats_sidecar(ofname)
+        sidecar['time'] = old['time'] + sidecar['time']
+        for var, varStats in sidecar['variables'].items():
+            if var in old['variables']:
+                for key in varStats:
+                    varStats[key] = old['variables'][var][key] + varStats[key]
+    for var, varStats in sidecar['variables'].items():
+        varStats['file'] = file_stats(varStats)
+    with open(ofname + '.stats.json', 'w') as f:
+        json.dump(sidecar, f)
+
+def read_stats_sidecar(ofname):
+    """Reads the statistics sidecar of a file written by makenc_field or makenc_Station
+
+    Args:
+      ofname: data file name (not the sidecar name)
+
+    Returns:
+      dictionary with 'time' (epoch seconds) and 'variables', each variable has per time step lists 'min', 'max',
+      'mean', 'count', 'nanCount' and a 'file' summary, None if there's no sidecar
+
+    """
+    if not os.path.isfile(ofname + '.stats.json'):
+        return None
+    with open(ofname + '.stats.json') as f:
+        return json.load(f)
+
+def init_nc_file(nc_filename, attributes, diskless=False):
     """Create the netCDF file and write the Global Attributes
     written by ASA
 
     will initalize netCDF file and set global attributes, write date created and issued to global meta data
 
+    In diskless mode the file is assembled in memory and written to a temporary file beside nc_filename in one
+    sequential write when it's closed with close_nc_file, which then renames it into place (atomic on the same file
+    system).  This avoids the many small metadata writes of building a small file on network storage
+
     Args:
       nc_filename: output netCDF file name
       attributes: attributes from global yaml load
+      diskless: assemble the file in memory (Default value = False)
 
     Returns:
-        open netCDF file ready for writing data
+        open netCDF file ready for writing data, close it with close_nc_file (or use new_nc_file)
 
     """
-
-    ncfile = nc.Dataset(nc_filename, 'w', clobber=True)
+    if diskless == True:
+        tmpFname = os.path.join(os.path.dirname(nc_filename), '.{}.{}.tmp'.format(os.path.basename(nc_filename),
+                                                                                  os.getpid()))
+        ncfile = nc.Dataset(tmpFname, 'w', clobber=True, diskless=True, persist=True)
+        _pending_renames[id(ncfile)] = (tmpFname, nc_filename)
+    else:
+        ncfile = nc.Dataset(nc_filename, 'w', clobber=True)
 
     # Write some Global Attributes
     for key, value in attributes.iteritems():
@@ -101,7 +426,109 @@ def init_nc_file(nc_filename, attributes):
 
     return ncfile
 
-def write_data_to_nc(ncfile, template_vars, data_dict, write_vars='_variables'):
+def default_chunksizes(ncfile, dimensions):
+    """Chooses chunk sizes for a [time, ...] variable suited to reading long time series at a single point, the whole
+    time dimension goes in each chunk with spatial dimensions tiled to at most 32 cells.  Spectral dimensions
+    (waveFrequency, waveDirectionBins) are kept whole so each chunk holds complete spectra
+
+    Args:
+      ncfile: an already opened netCDF file with already defined dimensions
+      dimensions (list): dimension names of the variable
+
+    Returns:
+      list of chunk sizes, or None to use the library default (e.g. a dimension has no length yet)
+
+    """
+    spectralDims = ['waveFrequency', 'waveDirectionBins']
+    chunks = []
+    for ii, dim in enumerate(dimensions):
+        size = len(ncfile.dimensions[dim])
+        if ii == 0 and ncfile.dimensions[dim].isunlimited():
+            size = max(size, 512)  # unlimited time grows, don't tie chunks to the first write
+        if size == 0:
+            return None
+        if ii == 0 or dim in spectralDims:
+            chunks.append(size)
+        else:
+            chunks.append(min(size, 32))
+
+    return chunks
+
+def define_nc_variable(ncfile, compiled_var):
+    """Creates a variable in an open netCDF file and writes its attributes from a compiled template entry
+
+    Args:
+      ncfile: an already opened netCDF file with already defined dimensions
+      compiled_var (dict): a single variable's entry from compile_template
+
+    Returns:
+      the netCDF variable
+
+    """
+    kwargs = dict(compiled_var['create'])
+    kwargs.update(compiled_var.get('storage', {}))
+    if kwargs.get('chunksizes', None) == 'auto':
+        kwargs['chunksizes'] = default_chunksizes(ncfile, kwargs['dimensions'])
+    if kwargs.get('chunksizes', None) is None:
+        kwargs.pop('chunksizes', None)
+    new_var = ncfile.createVariable(**kwargs)
+    for attr, value in compiled_var['attrs']:
+        setattr(new_var, attr, value)
+
+    return new_var
+
+def write_nc_variable(new_var, var, compiled_var, data):
+    """Writes data into a defined netCDF variable (1D, 2D, or 3D)
+
+    Args:
+      new_var: netCDF variable (from define_nc_variable)
+      var (str): key of the variable in the template/data dictionary
+      compiled_var (dict): a single variable's entry from compile_template
+      data: data to write
+
+    Returns:
+      None
+
+    """
+    if var == "station_name":
+        station_id = data
+        data = np.empty((1,), 'S'+repr(len(station_id)))
+        data[0] = station_id
+        new_var[:] = nc.stringtochar(data)
+    elif compiled_var['ndim'] == 0:
+        try:
+            new_var[:] = data
+        except Exception:
+            pass  # scalars that can't be sliced into are left as the fill value
+
+    elif compiled_var['ndim'] == 1:
+        # catch some possible errors for frequency and direction arrays
+        if compiled_var['data_type'] == 'str':
+            for i, c in enumerate(compiled_var['data_type']):
+                new_var[i] = data[i]
+        else:
+            try:
+                new_var[:] = data
+            except IndexError:
+                new_var[:] = data[0][0]
+
+    elif compiled_var['ndim'] == 2:
+        # write the callers array directly (netCDF4 casts to the template data_type on write)
+        data = np.asanyarray(data)  # no copy for arrays
+        if np.ndim(data) > 2:
+            # squeeze the 3d array in to 2d as dimension is not needed, a view not a copy
+            data = data.reshape(data.shape[0], -1)
+        if np.shape(data) != new_var.shape and np.shape(data)[::-1] == new_var.shape:
+            # handles row vs col data, the transpose is a strided view
+            data = data.T
+        new_var[:] = data
+
+    elif compiled_var['ndim'] == 3:
+        # this portion was modified by Spicer Bak
+        assert data.shape == new_var.shape, 'The data must have the Same Dimensions  (missing time?)'
+        new_var[:] = data
+
+def write_data_to_nc(ncfile, template_vars, data_dict, write_vars='_variables', stats=None):
     """This function actually writes the variables and the variable attributes to
     the netCDF file
 
@@ -115,6 +542,8 @@ def write_data_to_nc(ncfile, template_vars, data_dict, write_vars='_variables'):
       template_vars (dict): variable and meta data associated with data_dict
       data_dict (dict): this is a dictionary with keys associated to those hopefully in template_vars, this holds the data
       write_vars: Unknown (Default value = '_variables')
+      stats (dict): if given, per time step statistics of floating point [time, ...] variables are added to it (see
+            write_stats_sidecar) and written as each variable's actual_range attribute (Default value = None)
 
     Returns:
       netCDF file (still open)
@@ -131,107 +560,327 @@ def write_data_to_nc(ncfile, template_vars, data_dict, write_vars='_variables'):
             if var in data_dict:
                 setattr(ncfile, var, data_dict[var])
 
-    # List all possible variable attributes in the template
-    possible_var_attr = ['standard_name', 'long_name', 'coordinates', 'flag_values', 'flag_meanings', 'description',
-                         'notes', 'positive', 'valid_min', 'valid_max', 'calendar', 'description', 'cf_role',
-                         'missing_value']
-
     # Write variables to file
-    accept_vars = template_vars['_variables']
+    compiled = template_vars.get('_compiled', None)
+    if compiled is None:  # template wasn't loaded through import_template_file
+        compiled = compile_template(template_vars)
 
-    for var in accept_vars:  # only write varibles that were loaded from .yaml file
+    for var in template_vars['_variables']:  # only write varibles that were loaded from .yaml file
         if var in data_dict:
             try:
-                if "fill_value" in template_vars[var] and "least_significant_digit" in template_vars[var]:
-                    new_var = ncfile.createVariable(template_vars[var]["name"],
-                                                    template_vars[var]["data_type"],
-                                                    template_vars[var]["dim"],
-                                                    fill_value=template_vars[var]["fill_value"],
-                                                    least_significant_digit=template_vars[var]['least_significant_digit'] )
-                elif "fill_value" in template_vars[var]:
-                    new_var = ncfile.createVariable(template_vars[var]["name"], template_vars[var]["data_type"],
-                            template_vars[var]["dim"], fill_value=template_vars[var]["fill_value"])
-                else:
-                    new_var = ncfile.createVariable(template_vars[var]["name"],
-                                                    template_vars[var]["data_type"],
-                                                    template_vars[var]["dim"])
-
-                new_var.units = template_vars[var]["units"]
-
-                # Write the attributes
-                for attr in possible_var_attr:  # only write attributes listed in this list above
-                    if attr in template_vars[var]:
-                        if template_vars[var][attr] == 'NaN':
-                            setattr(new_var, attr, np.nan)
-                        else:
-                            setattr(new_var, attr, template_vars[var][attr])
-                # Write the short_name attribute as the variable name
-                if 'short_name' in template_vars[var]:
-                    new_var.short_name = template_vars[var]["short_name"]
-                else:
-                    new_var.short_name = template_vars[var]["name"]
-                # _____________________________________________________________________________________
-                # Write the data (1D, 2D, or 3D)
-                #______________________________________________________________________________________
-                if var == "station_name":
-                    station_id = data_dict[var]
-                    data = np.empty((1,), 'S'+repr(len(station_id)))
-                    data[0] = station_id
-                    new_var[:] = nc.stringtochar(data)
-                elif len(template_vars[var]["dim"]) == 0:
-                    try:
-                        new_var[:] = data_dict[var]
-                    except Exception, e:
-                        new_var = data_dict[var]
-
-                elif len(template_vars[var]["dim"]) == 1:
-                    # catch some possible errors for frequency and direction arrays
-                    if template_vars[var]["data_type"] == 'str':
-                        for i, c in enumerate(template_vars[var]["data_type"]):
-                            new_var[i] = data_dict[var][i]
-                    else:
-                        try:
-                            new_var[:] = data_dict[var]
-                        except IndexError:
-                            try:
-                                new_var[:] = data_dict[var][0][0]
-                            except Exception, e:
-                                raise e
-
-                elif len(template_vars[var]["dim"]) == 2:
-                    # create an empty 2d data set of the correct sizes
-                    try:
-                        # handles row vs col data, rather than transposing the array just figure out which it is
-                        length = data_dict[var][0].shape[1]
-                        if data_dict[var][0].shape[0] > length:
-                            length = data_dict[var][0].shape[0]
-
-                        x = np.empty([data_dict[var].shape[0], length], dtype=np.float64)
-                        for i in range(data_dict[var].shape[0]):
-                            # squeeze the 3d array in to 2d as dimension is not needed
-                            x[i] = np.squeeze(data_dict[var][i])
-                        new_var[:, :] = x
-                    except Exception, e:
-                        # if the tuple fails must be right...right?
-                        new_var[:] = data_dict[var]
-
-                elif len(template_vars[var]["dim"]) == 3:
-                    # create an empty 3d data set of the correct sizes
-                    # this portion was modified by Spicer Bak
-                    assert data_dict[var].shape == new_var.shape, 'The data must have the Same Dimensions  (missing time?)'
-                    x = np.empty([data_dict[var].shape[0], data_dict[var].shape[1], data_dict[var].shape[2]], np.float64)
-                    for i in range(data_dict[var].shape[0]):
-                        x[i] = data_dict[var][i]
-                    new_var[:, :, :] = x[:, :, :]
-
+                if 'error' in compiled[var]:
+                    raise KeyError(compiled[var]['error'])
+                new_var = define_nc_variable(ncfile, compiled[var])
+                write_nc_variable(new_var, var, compiled[var], data_dict[var])
+                if stats is not None and is_stats_variable(var, compiled[var]):
+                    merge_range(new_var, record_stats(stats, var, compiled[var], data_dict[var]))
             except Exception, e:
                 num_errors += 1
                 print('ERROR WRITING VARIABLE: {} - {} \n'.format(var, str(e)))
+    if stats is not None:
+        stats['time'] = np.ravel(data_dict['time'])
 
 
     return num_errors, error_str
 
-def makenc_field(data_lib, globalyaml_fname, flagfname, ofname, var_yaml_fname):
+@contextlib.contextmanager
+def lock_nc_file(ofname):
+    """Holds an exclusive lock (on ofname + '.lock') while a netCDF file is written, so concurrent writers appending
+    to the same file wait their turn.  The lock file is removed before the lock is released so none are left next to
+    the products, a writer that was waiting on a removed lock file takes a new one.  Uses fcntl so it's only
+    available on unix
+
+    Args:
+      ofname: netCDF file name to lock
+
+    """
+    import fcntl
+    lockName = ofname + '.lock'
+    while True:
+        lockFile = open(lockName, 'a')
+        fcntl.flock(lockFile, fcntl.LOCK_EX)
+        try:
+            if os.path.samestat(os.fstat(lockFile.fileno()), os.stat(lockName)):
+                break  # still the lock file on disk, it's ours
+        except OSError:
+            pass  # the lock file was removed by the writer before us
+        lockFile.close()
+    try:
+        yield
+    finally:
+        os.remove(lockName)
+        fcntl.flock(lockFile, fcntl.LOCK_UN)
+        lockFile.close()
+
+def append_data_to_nc(ofname, globalatts, template_vars, data_dict, dimensions, stats=None):
+    """Appends the records of a simulation window to a (monthly, yearly, ...) netCDF file with an unlimited time
+    dimension rather than writing a new file for every window.  The file is created on the first call, after that
+    its dimensions, variable meta data and static data are checked against the templates and only times not already
+    in the file are added.  Times earlier than the end of the file (eg a backfilled window) are merged in so the time
+    axis stays in order.  The file is locked while it's written
+
+    Args:
+      ofname: output netCDF file name
+      globalatts (dict): global attributes from global yaml load (only used when the file is created)
+      template_vars (dict): variable and meta data associated with data_dict (from import_template_file)
+      data_dict (dict): data to write, keys match those in template_vars, 'time' is required
+      dimensions (dict): names and sizes of all the dimensions other than time
+      stats (dict): if given, statistics of the appended records are added to it in time order (see
+            write_data_to_nc)
+
+    Returns:
+      number of time records appended
+
+    Raises:
+      ValueError: if the dimensions, variable meta data or static data of an existing file don't match
+      Exception: a variable can't be appended, nothing is written when its data can't be prepared
+
+    """
+    compiled = template_vars.get('_compiled', None)
+    if compiled is None:  # template wasn't loaded through import_template_file
+        compiled = compile_template(template_vars)
+    writeVars = [var for var in template_vars['_variables'] if var in data_dict and 'error' not in compiled[var]]
+    with lock_nc_file(ofname):
+        if not os.path.isfile(ofname):
+            fid = init_nc_file(ofname, globalatts, diskless=False)  # other writers wait on this file
+            fid.createDimension('time', None)
+            for dim, size in dimensions.items():
+                fid.createDimension(dim, size)
+            if '_attributes' in template_vars:
+                for var in template_vars['_attributes']:
+                    if var in data_dict:
+                        setattr(fid, var, data_dict[var])
+            for var in writeVars:
+                new_var = define_nc_variable(fid, compiled[var])
+                if 'time' not in compiled[var]['create']['dimensions']:  # static variables are written once
+                    write_nc_variable(new_var, var, compiled[var], data_dict[var])
+        else:
+            fid = nc.Dataset(ofname, 'a')
+            try:  # check the existing file matches what would be written
+                fileVar = lambda name: (fid[name].dimensions, getattr(fid[name], 'units', None), fid[name]) \
+                    if name in fid.variables else None
+                check_existing_product(ofname, compiled, writeVars, data_dict, dimensions,
+                                       dict((dim, len(fid.dimensions[dim])) for dim in fid.dimensions), fileVar)
+            except ValueError:
+                fid.close()
+                raise
+        # only append times that aren't already in the file
+        times = np.ravel(data_dict['time'])
+        start = len(fid.dimensions['time'])
+        if start > 0:
+            existing = np.ravel(fid[compiled['time']['create']['varname']][:])
+            new = ~np.in1d(times, existing)
+        else:
+            existing = np.array([])
+            new = np.ones(times.shape, dtype=bool)
+        idx = np.nonzero(new)[0]
+        idx = idx[np.argsort(times[idx], kind='mergesort')]  # the new records in time order
+        # records earlier than the end of the file are merged in, the records from the first new time on are
+        # rewritten in time order so the time axis stays monotonic
+        insertAt = start
+        if idx.size > 0 and start > 0 and times[idx].min() < existing.max():
+            insertAt = int(np.searchsorted(existing, times[idx].min()))
+        order = np.argsort(np.concatenate([existing[insertAt:], times[idx]]), kind='mergesort')
+        # every variable is prepared before any is written, so a bad variable aborts before the file is changed
+        records, var = {}, None
+        try:
+            for var in writeVars:
+                if compiled[var]['create']['dimensions'][:1] == ['time'] and idx.size > 0:
+                    name = compiled[var]['create']['varname']
+                    data = np.asanyarray(data_dict[var])[idx]  # in time order without duplicate times
+                    merged = data
+                    if insertAt < start:
+                        merged = np.ma.concatenate([fid[name][insertAt:start], data])[order]
+                    records[var] = (data, merged)
+            for var in records:
+                name = compiled[var]['create']['varname']
+                fid[name][insertAt:start + idx.size] = records[var][1]
+                if stats is not None and is_stats_variable(var, compiled[var]):
+                    merge_range(fid[name], record_stats(stats, var, compiled[var], records[var][0]))
+        except Exception as e:
+            print('ERROR APPENDING VARIABLE: {} - {} \n'.format(var, str(e)))
+            fid.close()
+            raise
+        fid.close()
+    if stats is not None:
+        stats['time'] = times[idx]
+
+    return idx.size
+
+def check_existing_product(ofname, compiled, writeVars, data_dict, dimensions, fileDims, fileVar):
+    """Checks an existing netCDF file or Zarr store matches the data about to be appended to it, the dimensions,
+    the dimensions and units of each variable and the data of the variables without a time dimension have to match
+
+    Args:
+      ofname: name of the existing file (for the error messages)
+      compiled (dict): compiled template (see compile_template)
+      writeVars (list): variables to be written
+      data_dict (dict): data to be written
+      dimensions (dict): names and sizes of all the dimensions other than time
+      fileDims (dict): names and sizes of the dimensions in the existing file
+      fileVar: function of a variable name returning (dimension names, units, variable) from the existing file, or
+            None if the variable isn't in it, variable[:] reads its data
+
+    Returns:
+      None
+
+    Raises:
+      ValueError: if anything doesn't match
+
+    """
+    usedDims = set([dim for var in writeVars for dim in compiled[var]['create']['dimensions']])
+    for dim, size in dimensions.items():
+        if dim in usedDims and fileDims.get(dim, None) != size:
+            raise ValueError('{} dimension {} does not match the existing file {}'.format(dim, size, ofname))
+    for var in writeVars:
+        name = compiled[var]['create']['varname']
+        found = fileVar(name)
+        if found is None:
+            raise ValueError('{} is not in the existing file {}'.format(name, ofname))
+        dims, units, fileData = found
+        if list(dims) != list(compiled[var]['create']['dimensions']) or units != dict(compiled[var]['attrs'])['units']:
+            raise ValueError('{} meta data does not match the existing file {}'.format(name, ofname))
+        if 'time' not in compiled[var]['create']['dimensions'] and not static_data_matches(fileData[:], data_dict[var]):
+            raise ValueError('{} does not match the static data in the existing file {}'.format(name, ofname))
+
+def static_data_matches(old, new):
+    """Checks the data of a variable without a time dimension already in a file against the data to be appended
+
+    Args:
+      old: data read from the file
+      new: data to be appended
+
+    Returns:
+      True if they're the same (NaN matches NaN, character arrays are compared as strings)
+
+    """
+    old = np.ma.asarray(old)
+    if old.dtype.kind in ['S', 'U']:  # character arrays, eg station_name
+        oldStr = ''.join([char.decode() if isinstance(char, bytes) else char for char in
+                          np.ravel(old.filled(''))]).strip()
+        newStr = new if isinstance(new, str) else ''.join(np.ravel(np.asarray(new)).astype(str))
+        return oldStr == newStr.strip()
+    try:
+        new = np.reshape(np.ma.filled(np.ma.asarray(new, dtype=float), np.nan), old.shape)
+    except (ValueError, TypeError):
+        return False
+    return bool(np.allclose(old.astype(float).filled(np.nan), new, equal_nan=True))
+
+def write_data_to_zarr(ofname, globalatts, template_vars, data_dict, dimensions, append=True, stats=None):
+    """Writes (or appends) data to a Zarr directory store, an alternative to netCDF driven by the same yaml templates.
+    Each template variable becomes an array carrying its CF attributes and its dimension names in
+    '_ARRAY_DIMENSIONS' (so xarray reads the store like the netCDF file), global attributes go on the root group.
+    Chunks follow default_chunksizes and zlib/complevel/least_significant_digit map to numcodecs Zlib/Quantize.
+    Arrays with a leading time dimension are appended to, skipping times already in the store, an existing store is
+    checked like append_data_to_nc checks an existing file
+
+    Args:
+      ofname: output store name (a directory, eg *.zarr)
+      globalatts (dict): global attributes from global yaml load
+      template_vars (dict): variable and meta data associated with data_dict (from import_template_file)
+      data_dict (dict): data to write, keys match those in template_vars, 'time' is required
+      dimensions (dict): names and sizes of all the dimensions other than time
+      append (bool): append to an existing store, if False the store is replaced (default=True)
+      stats (dict): if given, statistics of the written records are added to it (see write_data_to_nc)
+
+    Returns:
+      number of time records written
+
+    Raises:
+      ValueError: if the dimensions, variable meta data or static data of an existing store don't match
+
+    """
+    import zarr
+    import numcodecs
+    compiled = template_vars.get('_compiled', None)
+    if compiled is None:  # template wasn't loaded through import_template_file
+        compiled = compile_template(template_vars)
+    writeVars = [var for var in template_vars['_variables'] if var in data_dict and 'error' not in compiled[var]]
+    times = np.ravel(data_dict['time'])
+    with lock_nc_file(ofname):
+        root = zarr.open_group(ofname, mode='a' if append == True else 'w')
+        timeName = compiled['time']['create']['varname']
+        if timeName not in root:  # new store, write globals and static variables
+            attrs = dict((key, value) for key, value in globalatts.items() if value is not None)
+            attrs['date_created'] = attrs['date_issued'] = ttime.strftime("%Y-%m-%d")
+            if '_attributes' in template_vars:
+                attrs.update(dict((var, data_dict[var]) for var in template_vars['_attributes'] if var in data_dict))
+            root.attrs.update(attrs)
+        if timeName in root:  # check the existing store matches what would be written
+            fileDims = {}
+            for name, arr in root.arrays():
+                fileDims.update(zip(arr.attrs.get('_ARRAY_DIMENSIONS', []), arr.shape))
+            fileVar = lambda name: (root[name].attrs.get('_ARRAY_DIMENSIONS', []), root[name].attrs.get('units', None),
+                                    root[name]) if name in root else None
+            check_existing_product(ofname, compiled, writeVars, data_dict, dimensions, fileDims, fileVar)
+        start = root[timeName].shape[0] if timeName in root else 0
+        new = ~np.in1d(times, root[timeName][:]) if start > 0 else np.ones(times.shape, dtype=bool)
+        idx = np.nonzero(new)[0]
+        for var in writeVars:
+            create = compiled[var]['create']
+            dims = list(create['dimensions'])
+            data = data_dict[var]
+            if var == 'station_name':
+                data = np.array(list(data), dtype='S1')
+            data = np.asanyarray(data)
+            dtype = np.dtype('S1') if create['datatype'] in ['str', 'S1'] else np.dtype(create['datatype'])
+            if np.ma.isMaskedArray(data) and 'fill_value' in create:
+                data = data.filled(dtype.type(create['fill_value']))
+            if create['varname'] not in root:
+                shape = [0 if dim == 'time' else dimensions[dim] for dim in dims]
+                storage = compiled[var].get('storage', {})
+                # time chunks hold 512 records, [time, y, x] fields tile space to 32 cells, spectra are kept whole
+                chunks = [512 if dim == 'time' else size if dims[0] != 'time' or dim in ['waveFrequency', 'waveDirectionBins']
+                          else min(size, 32) for dim, size in zip(dims, shape)]
+                filters = None
+                if 'least_significant_digit' in create and dtype.kind == 'f':
+                    filters = [numcodecs.Quantize(digits=create['least_significant_digit'], dtype=dtype)]
+                compressor = numcodecs.Zlib(level=storage.get('complevel', 4)) if storage.get('zlib', False) \
+                    else zarr.storage.default_compressor
+                fill = dtype.type(create['fill_value']) if 'fill_value' in create else None
+                arr = root.create_dataset(create['varname'], shape=shape, chunks=chunks or None, dtype=dtype,
+                                          fill_value=fill, filters=filters, compressor=compressor)
+                attrs = dict(compiled[var]['attrs'])
+                attrs = dict((key, None if isinstance(value, float) and np.isnan(value) else value)
+                             for key, value in attrs.items())  # NaN isn't valid json
+                attrs['_ARRAY_DIMENSIONS'] = dims
+                arr.attrs.update(attrs)
+                if 'time' not in dims:
+                    arr[...] = np.reshape(data, shape)
+            if dims[:1] == ['time'] and idx.size > 0:
+                if idx.size != times.size:
+                    data = data[idx]  # drop duplicate times
+                root[create['varname']].append(np.reshape(data, (idx.size,) + root[create['varname']].shape[1:]))
+                if stats is not None and is_stats_variable(var, compiled[var]):
+                    merge_range(root[create['varname']], record_stats(stats, var, compiled[var], data))
+    if stats is not None:
+        stats['time'] = times[idx]
+
+    return idx.size
+
+def static_template(compiled_var):
+    """Makes a copy of a compiled template entry (see compile_template) without its time dimension, used to write
+    fields that don't change in time once
+
+    Args:
+      compiled_var (dict): a single variable's entry from compile_template
+
+    Returns:
+      compiled template entry with the leading 'time' dimension removed
+
+    """
+    static = dict(compiled_var)
+    static['create'] = dict(compiled_var['create'])
+    static['create']['dimensions'] = [dim for dim in compiled_var['create']['dimensions'] if dim != 'time']
+    static['ndim'] = len(static['create']['dimensions'])
+    static['storage'] = dict((key, value) for key, value in compiled_var.get('storage', {}).items() if key != 'chunksizes')
+    if static['ndim'] == 0:
+        static['storage'] = {}  # scalars can't be compressed
+
+    return static
+
+def makenc_field(data_lib, globalyaml_fname, flagfname, ofname, var_yaml_fname, staticBathymetry=False, append=False,
+                 backend='netCDF', diskless=False):
     """This is a function that takes wave nest dictionary and Tp_nest dictionnary and creates the high resolution
     near shore field data from the Coastal Model Test Bed
 
@@ -245,7 +894,12 @@ def makenc_field(data_lib, globalyaml_fname, flagfname, ofname, var_yaml_fname):
       ofname: the file name to be created
       flagfname: flag input file to flag data
       var_yaml_fname:  variable meta data yaml file name
-
+      staticBathymetry (bool): store the bathymetry once [Y_shore, X_shore] with a single bathymetryDate instead of
+            repeating it for every time step, only applies if the bathymetry doesn't change in time (default=False)
+      append (bool): append the records to ofname with an unlimited time dimension, creating it if it doesn't exist
+            (see append_data_to_nc) (default=False)
+      backend (str): 'netCDF' or 'zarr' to write a Zarr store instead (see write_data_to_zarr) (default='netCDF')
+      diskless: assemble the file in memory and write it in one go (see init_nc_file) (default=False)
 
     Returns:
         written netCDF file
@@ -268,34 +922,55 @@ def makenc_field(data_lib, globalyaml_fname, flagfname, ofname, var_yaml_fname):
     globalatts['n_cell_y'] = data_lib['NJ']
     globalatts['n_cell_x'] = data_lib['NI']
 
-    # making bathymetry the length of time so it can be concatnated
-    if data_lib['waveHs'].shape[1] != data_lib['bathymetry'].shape[1]:
-        data_lib['waveHs']=data_lib['waveHs'][:,:data_lib['bathymetry'].shape[1],:]
-    data_lib['bathymetry'] = np.full_like(data_lib['waveHs'], data_lib['bathymetry'], dtype=np.float32 )
-    if 'bathymetryDate' in data_lib:
-        data_lib['bathymetryDate'] = np.full_like(data_lib['time'], data_lib['bathymetryDate'], dtype=np.float32 )
-
+    bathyShape = np.shape(data_lib['bathymetry'])
+    if data_lib['waveHs'].shape[1] != bathyShape[-2]:
+        data_lib['waveHs']=data_lib['waveHs'][:,:bathyShape[-2],:]
+    if staticBathymetry == True and (len(bathyShape) == 2 or bathyShape[0] == 1):
+        # write bathymetry once, drop the time dimension from its template entries
+        data_lib['bathymetry'] = np.reshape(data_lib['bathymetry'], bathyShape[-2:])
+        if 'bathymetryDate' in data_lib:
+            data_lib['bathymetryDate'] = np.ravel(data_lib['bathymetryDate'])[0]
+        var_atts['_compiled'] = dict(var_atts['_compiled'])  # don't change the cached template
+        for var in ['bathymetry', 'bathymetryDate']:
+            if var in var_atts['_compiled'] and 'error' not in var_atts['_compiled'][var]:
+                var_atts['_compiled'][var] = static_template(var_atts['_compiled'][var])
+    else:
+        # making bathymetry the length of time so it can be concatnated, a broadcast view not a copy
+        data_lib['bathymetry'] = np.broadcast_to(data_lib['bathymetry'], data_lib['waveHs'].shape)
+        if 'bathymetryDate' in data_lib:
+            data_lib['bathymetryDate'] = np.broadcast_to(data_lib['bathymetryDate'], np.shape(data_lib['time']))
+
+
+    stats = {}  # summary statistics collected as the data are written
+    if append == True or backend == 'zarr':
+        dims = {'X_shore': data_lib['NI'], 'Y_shore': data_lib['NJ'], 'in_type': np.shape(flags)[1],
+                'station_name_length': len(data_lib['station_name'])}
+        if backend == 'zarr':
+            write_data_to_zarr(ofname, globalatts, var_atts, data_lib, dims, append=append, stats=stats)
+        else:
+            append_data_to_nc(ofname, globalatts, var_atts, data_lib, dims, stats=stats)
+        write_stats_sidecar(ofname, stats, append=append)
+        return
 
     #data_lib['bathymetry'] =
-    fid = init_nc_file(ofname, globalatts)  # initialize and write inital globals
+    with new_nc_file(ofname, globalatts, diskless=diskless) as fid:  # initialize and write inital globals
 
-    #### create dimensions
-    tdim = fid.createDimension('time', np.shape(data_lib['waveHs'])[0])
-    xdim = fid.createDimension('X_shore', data_lib['NI'])
-    ydim = fid.createDimension('Y_shore', data_lib['NJ'])
-    inputtypes = fid.createDimension('in_type', np.shape(flags)[1]) # there are 4 input data types for flags
-    statnamelen = fid.createDimension('station_name_length', len(data_lib['station_name']))
-    #if 'bathymetryDate' in data_lib:
-    #    bathyDate_length = fid.createDimension('bathyDate_length', np.shape(data_lib['bathymetry'])[0])
+        #### create dimensions
+        tdim = fid.createDimension('time', np.shape(data_lib['waveHs'])[0])
+        xdim = fid.createDimension('X_shore', data_lib['NI'])
+        ydim = fid.createDimension('Y_shore', data_lib['NJ'])
+        inputtypes = fid.createDimension('in_type', np.shape(flags)[1]) # there are 4 input data types for flags
+        statnamelen = fid.createDimension('station_name_length', len(data_lib['station_name']))
+        #if 'bathymetryDate' in data_lib:
+        #    bathyDate_length = fid.createDimension('bathyDate_length', np.shape(data_lib['bathymetry'])[0])
 
-    # bathydate = fid.createDimension('bathyDate_length', np.size(data_lib['bathymetryDate']))
+        # bathydate = fid.createDimension('bathyDate_length', np.size(data_lib['bathymetryDate']))
 
-    # write data to the nc file
-    write_data_to_nc(fid, var_atts, data_lib)
-    # close file
-    fid.close()
+        # write data to the nc file
+        write_data_to_nc(fid, var_atts, data_lib, stats=stats)
+    write_stats_sidecar(ofname, stats)
 
-def makenc_FRFTransect(bathyDict, ofname, globalYaml, varYaml):
+def makenc_FRFTransect(bathyDict, ofname, globalYaml, varYaml, diskless=False):
     """This function makes netCDF files from csv Transect data library created with testbedUtils.load_FRF_transect
 
     Args:
@@ -303,6 +978,7 @@ def makenc_FRFTransect(bathyDict, ofname, globalYaml, varYaml):
       ofname: the file name to be created
       globalYaml: global meta data yaml file name
       varYaml: variable meta data yaml file name
+      diskless: assemble the file in memory and write it in one go (see init_nc_file) (Default value = False)
 
     Returns:
         closed netCDF file
@@ -312,17 +988,41 @@ def makenc_FRFTransect(bathyDict, ofname, globalYaml, varYaml):
     varAtts = import_template_file(varYaml)  # loading variables to write and associated meta data
 
     # initializing output cshore_ncfile
-    fid =init_nc_file(ofname, globalAtts)
+    with new_nc_file(ofname, globalAtts, diskless=diskless) as fid:
 
-    # creating dimensions of data
-    tdim = fid.createDimension('time', np.shape(bathyDict['time'])[0])
+        # creating dimensions of data
+        tdim = fid.createDimension('time', np.shape(bathyDict['time'])[0])
 
-    # write data to the cshore_ncfile
-    write_data_to_nc(fid, varAtts, bathyDict)
-    # close file
-    fid.close()
+        # write data to the cshore_ncfile
+        write_data_to_nc(fid, varAtts, bathyDict)
+
+def FRFcoordArray(xFRF, yFRF, check=True):
+    """Converts arrays (eg meshgrids) of FRF coordinates to NC stateplane and lat/lon in one call, the array version of
+    geoprocess.FRFcoord for FRF coordinate input
+
+    Args:
+      xFRF: FRF cross-shore coordinates (any shape, broadcast against yFRF)
+      yFRF: FRF alongshore coordinates (any shape, broadcast against xFRF)
+      check (bool): convert stateplane back to FRF and check the round trip is within a centimeter (default=True)
+
+    Returns:
+      dictionary with keys 'StateplaneE', 'StateplaneN', 'Lat', 'Lon', 'FRF_X', 'FRF_Y' the shape of the broadcast
+      inputs, matching the keys of geoprocess.FRFcoord
 
-def makenc_FRFGrid(gridDict, ofname, globalYaml, varYaml):
+    """
+    from testbedutils import geoprocess as gp  # this might be creating a circular import
+    xFRF, yFRF = np.broadcast_arrays(np.asarray(xFRF, dtype=float), np.asarray(yFRF, dtype=float))
+    sp = gp.FRF2ncsp(xFRF, yFRF)
+    ll = gp.ncsp2LatLon(sp['StateplaneE'], sp['StateplaneN'])
+    if check == True:
+        frf = gp.ncsp2FRF(sp['StateplaneE'], sp['StateplaneN'])
+        assert np.allclose(frf['xFRF'], xFRF, atol=0.01) and np.allclose(frf['yFRF'], yFRF, atol=0.01), \
+            'FRF to stateplane conversion did not round trip'
+
+    return {'StateplaneE': np.asarray(sp['StateplaneE']), 'StateplaneN': np.asarray(sp['StateplaneN']),
+            'Lat': np.asarray(ll['lat']), 'Lon': np.asarray(ll['lon']), 'FRF_X': xFRF, 'FRF_Y': yFRF}
+
+def makenc_FRFGrid(gridDict, ofname, globalYaml, varYaml, diskless=False):
     """This is a function that makes netCDF files from the FRF Natural neighbor tool created by
     Spicer Bak using the pyngl library. the transect dictionary is created using the natural
     neighbor tool in FRF_natneighbor.py
@@ -333,56 +1033,45 @@ def makenc_FRFGrid(gridDict, ofname, globalYaml, varYaml):
       globalYaml: global meta data yaml file name
       ofname: the file name to be created
       varYaml: variable meta data yaml file name
+      diskless: assemble the file in memory and write it in one go (see init_nc_file) (Default value = False)
 
     Returns:
       netCDF file with gridded data in it
 
     """
-    from testbedutils import geoprocess as gp  # this might be creating a circular import
     globalAtts = import_template_file(globalYaml)
     varAtts = import_template_file(varYaml)
 
     # create netcdf file
-    fid = init_nc_file(ofname, globalAtts)
-
-    # creating dimensions of data
-    xShore = fid.createDimension('xShore', np.shape(gridDict['zgrid'])[0])
-    yShore = fid.createDimension('yShore', np.shape(gridDict['zgrid'])[1])
-    time = fid.createDimension('time', np.size(gridDict['time']))
-
-    # creating lat/lon and state plane coords
-    #xgrid, ygrid = np.meshgrid(gridDict['xgrid'], gridDict['ygrid'])
-    xx, yy = np.meshgrid(gridDict['xgrid'], gridDict['ygrid'])
-    latGrid = np.zeros(np.shape(yy))
-    lonGrid = np.zeros(np.shape(xx))
-    statePlN = np.zeros(np.shape(yy))
-    statePlE = np.zeros(np.shape(xx))
-    for iy in range(0, np.size(gridDict['zgrid'], axis=1)):
-        for ix in range(0, np.size(gridDict['zgrid'], axis=0)):
-            coords = gp.FRFcoord(xx[iy, ix], yy[iy, ix])#, grid[iy, ix]))
-            statePlE[iy, ix] = coords['StateplaneE']
-            statePlN[iy, ix] = coords['StateplaneN']
-            latGrid[iy, ix] = coords['Lat']
-            lonGrid[iy, ix] = coords['Lon']
-            assert xx[iy, ix] == coords['FRF_X']
-            assert yy[iy, ix] == coords['FRF_Y']
-
-    # put these data into the dictionary that matches the yaml
-    gridDict['Latitude'] = latGrid[:, 0]
-    gridDict['Longitude'] = lonGrid[0, :]
-    gridDict['Easting'] = statePlE[:, 0]
-    gridDict['Northing'] = statePlN[0, :]
-    gridDict['FRF_Xshore'] = gridDict.pop('xgrid')
-    gridDict['FRF_Yshore'] = gridDict.pop('ygrid')
-    # addding 3rd dimension for time
-    a=gridDict.pop('zgrid').T
-    gridDict['Elevation'] = np.full([1, a.shape[0], a.shape[1]], fill_value=[a], dtype=np.float32)
-    # write data to file
-    write_data_to_nc(fid, varAtts, gridDict)
-    # close file
-    fid.close()
-
-def makenc_Station(stat_data, globalyaml_fname, flagfname, ofname, stat_yaml_fname):
+    with new_nc_file(ofname, globalAtts, diskless=diskless) as fid:
+
+        # creating dimensions of data
+        xShore = fid.createDimension('xShore', np.shape(gridDict['zgrid'])[0])
+        yShore = fid.createDimension('yShore', np.shape(gridDict['zgrid'])[1])
+        time = fid.createDimension('time', np.size(gridDict['time']))
+
+        # creating lat/lon and state plane coords
+        #xgrid, ygrid = np.meshgrid(gridDict['xgrid'], gridDict['ygrid'])
+        xx, yy = np.meshgrid(gridDict['xgrid'], gridDict['ygrid'])
+        coords = FRFcoordArray(xx, yy)  # whole grid at once
+        statePlE, statePlN = coords['StateplaneE'], coords['StateplaneN']
+        latGrid, lonGrid = coords['Lat'], coords['Lon']
+
+        # put these data into the dictionary that matches the yaml
+        gridDict['Latitude'] = latGrid[:, 0]
+        gridDict['Longitude'] = lonGrid[0, :]
+        gridDict['Easting'] = statePlE[:, 0]
+        gridDict['Northing'] = statePlN[0, :]
+        gridDict['FRF_Xshore'] = gridDict.pop('xgrid')
+        gridDict['FRF_Yshore'] = gridDict.pop('ygrid')
+        # addding 3rd dimension for time
+        a=gridDict.pop('zgrid').T
+        gridDict['Elevation'] = np.full([1, a.shape[0], a.shape[1]], fill_value=[a], dtype=np.float32)
+        # write data to file
+        write_data_to_nc(fid, varAtts, gridDict)
+
+def makenc_Station(stat_data, globalyaml_fname, flagfname, ofname, stat_yaml_fname, append=False, backend='netCDF',
+                   diskless=False):
     """This function will make netCDF files from the station output data from the
     Coastal Model Test Bed of STWAVE for the STATion files
 
@@ -390,11 +1079,16 @@ def makenc_Station(stat_data, globalyaml_fname, flagfname, ofname, stat_yaml_fna
       stat_data: data lib is a library of data with keys the same name as associated variables to be written in the
             netCDF file to be created, This function will look for:
 
-            'time', 'DX', 'DY', 'NI', 'NJ', 'station_name', 'Northing', 'Easting', 'Longitude', 'Latitude', 'waveDirectionBins', 'waveFrequency'
+            'time', 'DX', 'DY', 'NI', 'NJ', 'station_name', 'Northing', 'Easting', 'Longitude', 'Latitude'
+            and optionally 'directionalWaveEnergyDensity', 'waveDirectionBins', 'waveFrequency' (spectra)
       flagfname: name/path of flag file
       globalyaml_fname: global yaml name
       stat_yaml_fname: varable yamle name
       ofname: output file name
+      append: append the records to ofname with an unlimited time dimension, creating it if it doesn't exist
+            (see append_data_to_nc) (Default value = False)
+      backend: 'netCDF' or 'zarr' to write a Zarr store instead (see write_data_to_zarr) (Default value = 'netCDF')
+      diskless: assemble the file in memory and write it in one go (see init_nc_file) (Default value = False)
 
     Returns:
       a nc file with station data in it
@@ -411,26 +1105,41 @@ def makenc_Station(stat_data, globalyaml_fname, flagfname, ofname, stat_yaml_fna
     globalatts['grid_dy'] = stat_data['DY']
     globalatts['n_cell_y'] = stat_data['NJ']
     globalatts['n_cell_x'] = stat_data['NI']
-    fid = init_nc_file(ofname, globalatts)  # initialize and write inital globals
-
-    #### create dimensions
-    tdim = fid.createDimension('time', np.shape(stat_data['time'])[0])  # None = size of the dimension, what does this gain me if i know it
-    inputtypes = fid.createDimension('input_types_length', np.shape(flags)[1]) # there are 4 input dtaa types for flags
-    statnamelen = fid.createDimension('station_name_length', len(stat_data['station_name']))
-    northing = fid.createDimension('Northing', 1L)
-    easting = fid.createDimension('Easting', 1L )
-    Lon = fid.createDimension('Longitude', np.size(stat_data['Longitude']))
-    Lat = fid.createDimension('Latitude', np.size(stat_data['Latitude']))
-    dirbin = fid.createDimension('waveDirectionBins', np.size(stat_data['waveDirectionBins']))
-    frqbin = fid.createDimension('waveFrequency', np.size(stat_data['waveFrequency']))
+    stats = {}  # summary statistics collected as the data are written
+    if append == True or backend == 'zarr':
+        dims = {'input_types_length': np.shape(flags)[1], 'station_name_length': len(stat_data['station_name']),
+                'Northing': 1, 'Easting': 1, 'Longitude': np.size(stat_data['Longitude']),
+                'Latitude': np.size(stat_data['Latitude'])}
+        if 'waveDirectionBins' in stat_data and 'waveFrequency' in stat_data:
+            dims['waveDirectionBins'] = np.size(stat_data['waveDirectionBins'])
+            dims['waveFrequency'] = np.size(stat_data['waveFrequency'])
+        if backend == 'zarr':
+            write_data_to_zarr(ofname, globalatts, stat_var_atts, stat_data, dims, append=append, stats=stats)
+        else:
+            append_data_to_nc(ofname, globalatts, stat_var_atts, stat_data, dims, stats=stats)
+        write_stats_sidecar(ofname, stats, append=append)
+        return
+
+    with new_nc_file(ofname, globalatts, diskless=diskless) as fid:  # initialize and write inital globals
+
+        #### create dimensions
+        tdim = fid.createDimension('time', np.shape(stat_data['time'])[0])  # None = size of the dimension, what does this gain me if i know it
+        inputtypes = fid.createDimension('input_types_length', np.shape(flags)[1]) # there are 4 input dtaa types for flags
+        statnamelen = fid.createDimension('station_name_length', len(stat_data['station_name']))
+        northing = fid.createDimension('Northing', 1L)
+        easting = fid.createDimension('Easting', 1L )
+        Lon = fid.createDimension('Longitude', np.size(stat_data['Longitude']))
+        Lat = fid.createDimension('Latitude', np.size(stat_data['Latitude']))
+        if 'waveDirectionBins' in stat_data and 'waveFrequency' in stat_data:  # spectra are optional products
+            dirbin = fid.createDimension('waveDirectionBins', np.size(stat_data['waveDirectionBins']))
+            frqbin = fid.createDimension('waveFrequency', np.size(stat_data['waveFrequency']))
     
-    #
-    # convert to Lat/lon here
+        #
+        # convert to Lat/lon here
 
-    # write data to the nc file
-    write_data_to_nc(fid, stat_var_atts, stat_data)
-    # close file
-    fid.close()
+        # write data to the nc file
+        write_data_to_nc(fid, stat_var_atts, stat_data, stats=stats)
+    write_stats_sidecar(ofname, stats)
 
 def convert_FRFgrid(gridFname, ofname, globalYaml, varYaml, plotFlag=False):
     """This function will convert the FRF gridded text product into a NetCDF file
@@ -515,13 +1224,14 @@ def convert_FRFgrid(gridFname, ofname, globalYaml, varYaml, plotFlag=False):
     # making the netCDF file from the gridded data
     makenc_FRFGrid(gridDict, ofname, globalYaml, varYaml)
 
-def makeDirectionalWavesWHOI(ofname, dataDict, globalYaml, varYaml):
+def makeDirectionalWavesWHOI(ofname, dataDict, globalYaml, varYaml, diskless=False):
     """
     Args:
       ofname: output file name
       dataDict: input data dictionary matching variable names in yaml
       globalYaml: global yaml for meta data ahead of file
       varYaml: variable data structured the same to that of the dataDict
+      diskless: assemble the file in memory and write it in one go (see init_nc_file) (Default value = False)
 
     Returns:
       None  - writes out the netCDF file
@@ -530,26 +1240,25 @@ def makeDirectionalWavesWHOI(ofname, dataDict, globalYaml, varYaml):
     globalAtts = import_template_file(globalYaml)
     varAtts = import_template_file(varYaml)
     # create netcdf file
-    fid = init_nc_file(ofname, globalAtts)
+    with new_nc_file(ofname, globalAtts, diskless=diskless) as fid:
 
-    #### create dimensions
-    tdim = fid.createDimension('time', np.shape(dataDict['time'])[0])  # None = size of the dimension, what does this gain me if i know it
-    statnamelen = fid.createDimension('station_name_length', len(dataDict['station_name']))
-    dirbin = fid.createDimension('waveDirectionBins', np.size(dataDict['directionBands']))
-    frqbin = fid.createDimension('waveFrequency', np.size(dataDict['freqBands']))
+        #### create dimensions
+        tdim = fid.createDimension('time', np.shape(dataDict['time'])[0])  # None = size of the dimension, what does this gain me if i know it
+        statnamelen = fid.createDimension('station_name_length', len(dataDict['station_name']))
+        dirbin = fid.createDimension('waveDirectionBins', np.size(dataDict['directionBands']))
+        frqbin = fid.createDimension('waveFrequency', np.size(dataDict['freqBands']))
 
-    # write data to the nc file
-    write_data_to_nc(fid, varAtts, dataDict)
-    # close file
-    fid.close()
+        # write data to the nc file
+        write_data_to_nc(fid, varAtts, dataDict)
 
-def makenc_todaysBathyCMTB(gridDict, ofname, globalYaml, varYaml):
+def makenc_todaysBathyCMTB(gridDict, ofname, globalYaml, varYaml, diskless=False):
     """Generate bathymetry file for CMTB
     Args:
       gridDict: data dictionary matching varYaml
       ofname: file output name
       globalYaml: yaml containing CF compliant meta data
       varYaml: yaml containing matching data structure to gridDict and CF compliant meta data
+      diskless: assemble the file in memory and write it in one go (see init_nc_file) (Default value = False)
 
     Returns:
 
@@ -558,18 +1267,16 @@ def makenc_todaysBathyCMTB(gridDict, ofname, globalYaml, varYaml):
     varAtts = import_template_file(varYaml)
 
     # create netcdf file
-    fid = init_nc_file(ofname, globalAtts)
-
-    # creating dimensions of data
-    xFRF = fid.createDimension('xFRF', gridDict['xFRF'].shape[0])
-    yFRF = fid.createDimension('yFRF', gridDict['yFRF'].shape[0])
-    time = fid.createDimension('time', np.size(gridDict['time']))
-    # write data to file
-    write_data_to_nc(fid, varAtts, gridDict)
-    # close file
-    fid.close()
-
-def makenc_CSHORErun(ofname, dataDict, globalYaml, varYaml):
+    with new_nc_file(ofname, globalAtts, diskless=diskless) as fid:
+
+        # creating dimensions of data
+        xFRF = fid.createDimension('xFRF', gridDict['xFRF'].shape[0])
+        yFRF = fid.createDimension('yFRF', gridDict['yFRF'].shape[0])
+        time = fid.createDimension('time', np.size(gridDict['time']))
+        # write data to file
+        write_data_to_nc(fid, varAtts, gridDict)
+
+def makenc_CSHORErun(ofname, dataDict, globalYaml, varYaml, diskless=False):
     """This is a function that makes netCDF files from CSHORE model runs created by
        David Young using all the stuff Spicer Bak used. You have to build dataDict from the different dictionaries
        output by cshore_io.load_CSHORE_results().  YOU DONT HAVE TO HAND IT LAT LON THOUGH!!!
@@ -629,209 +1336,64 @@ def makenc_CSHORErun(ofname, dataDict, globalYaml, varYaml):
       ofname (str): this is the FULL PATH INCLUDING FILENAME AND EXTENSION to the position where the ncFile will be saved when output
       globalYaml (str): full path to the globalYaml used to build this ncFile
       varYaml (str): full path to the variableYaml used to build this ncFile
+      diskless: assemble the file in memory and write it in one go (see init_nc_file) (Default value = False)
 
     Returns:
       netCDF file with CSHORE model results in it
 
     """
-    from testbedutils import geoprocess as gp  # this might create a circular import
     globalAtts = import_template_file(globalYaml)
     varAtts = import_template_file(varYaml)
 
     # create netcdf file
-    fid = init_nc_file(ofname, globalAtts)
-
-    # note: you have to hand this the yFRF coordinates of the BC gage if you want to get lat/lon..
-    lx = np.size(dataDict['xFRF'], axis=0)
-    lat = np.zeros(lx)
-    lon = np.zeros(lx)
-    for ii in range(0, lx):
-        coords = gp.FRFcoord(dataDict['xFRF'][ii], dataDict['yFRF'])
-        lat[ii] = coords['Lat']
-        lon[ii] = coords['Lon']
-    dataDict['latitude'] = lat
-    dataDict['longitude'] = lon
-
-    # ok, we are HARD CODING the dimensions to ALWAYS be at the 8m ARRAY (xFRF = 914.44 rounded DOWN to 914)
-    # we will just fill in the missing values with nans as required
-    array8m_loc = 914
-
-    # creating dimensions of data
-    new_s = np.shape(range(-50, array8m_loc+1))[0]
-    new_t = np.shape(dataDict['waveHs'])[0]
-    xFRF = fid.createDimension('xFRF', new_s)
-    time = fid.createDimension('time', new_t)
-
-    # check to see if the grid I am importing is smaller than my netCDF grid
-    if np.shape(range(-50, array8m_loc+1))[0] == np.shape(dataDict['xFRF']):
-        # the model grid is the same as the netCDF grid, so do nothing
-        dataDict_n = dataDict
-        pass
-    else:
-        dataDict_n = {'xFRF': np.flipud(np.array(range(-50, array8m_loc+1)) + 0.0),
-                      'time': dataDict['time'],
-                      'aveE': np.full((new_t, new_s), fill_value=np.nan),
-                      'stdE': np.full((new_t, new_s), fill_value=np.nan),
-                      'aveN': np.full((new_t, new_s), fill_value=np.nan),
-                      'stdN': np.full((new_t, new_s), fill_value=np.nan),
-                      'waveHs': np.full((new_t, new_s), fill_value=np.nan),
-                      'waveMeanDirection': np.full((new_t, new_s), fill_value=np.nan),
-                      'waterLevel': np.full((new_t, new_s), fill_value=np.nan),
-                      'stdWaterLevel': np.full((new_t, new_s), fill_value=np.nan),
-                      'setup': np.full((new_t, new_s), fill_value=np.nan),
-                      'runup2perc': dataDict['runup2perc'],
-                      'runupMean': dataDict['runupMean'],
-                      'qbx': np.full((new_t, new_s), fill_value=np.nan),
-                      'qsx': np.full((new_t, new_s), fill_value=np.nan),
-                      'qby': np.full((new_t, new_s), fill_value=np.nan),
-                      'qsy': np.full((new_t, new_s), fill_value=np.nan),
-                      'probabilitySuspension': np.full((new_t, new_s), fill_value=np.nan),
-                      'probabilityMovement': np.full((new_t, new_s), fill_value=np.nan),
-                      'suspendedSedVolume': np.full((new_t, new_s), fill_value=np.nan),
-                      'bottomElevation': np.full((new_t, new_s), fill_value=np.nan),
-                      'latitude': np.full((new_s), fill_value=np.nan),
-                      'longitude': np.full((new_s), fill_value=np.nan),
-                      'surveyNumber': dataDict['surveyNumber'],
-                      'profileNumber': dataDict['profileNumber'],
-                      'bathymetryDate': dataDict['bathymetryDate'],
-                      'yFRF': dataDict['yFRF'],}
-
-        if 'FIXED' in ofname:
-            dataDict_n['bottomElevation'] = np.full((new_s), fill_value=np.nan)
-        elif 'MOBILE' in ofname:
-            dataDict_n['bottomElevation'] = np.full((new_t, new_s), fill_value=np.nan)
-        else:
-            print 'You need to modify makenc_CSHORErun in makenc.py to accept your new version name!'
-
-        # find index of first point on dataDict grid
-        min_x = min(dataDict['xFRF'])
-        ind_minx = int(np.argwhere(dataDict_n['xFRF'] == min_x))
-        max_x = max(dataDict['xFRF'])
-        ind_maxx = int(np.argwhere(dataDict_n['xFRF'] == max_x))
-
-        for ii in range(0, int(new_t)):
-            dataDict_n['aveE'][ii][ind_maxx:ind_minx+1] = dataDict['aveE'][ii]
-            dataDict_n['stdE'][ii][ind_maxx:ind_minx+1] = dataDict['stdE'][ii]
-            dataDict_n['aveN'][ii][ind_maxx:ind_minx+1] = dataDict['aveN'][ii]
-            dataDict_n['stdN'][ii][ind_maxx:ind_minx+1] = dataDict['stdN'][ii]
-            dataDict_n['waveHs'][ii][ind_maxx:ind_minx+1] = dataDict['waveHs'][ii]
-            dataDict_n['waveMeanDirection'][ii][ind_maxx:ind_minx+1] = dataDict['waveMeanDirection'][ii]
-            dataDict_n['waterLevel'][ii][ind_maxx:ind_minx+1] = dataDict['waterLevel'][ii]
-            dataDict_n['stdWaterLevel'][ii][ind_maxx:ind_minx+1] = dataDict['stdWaterLevel'][ii]
-            dataDict_n['setup'][ii][ind_maxx:ind_minx+1] = dataDict['setup'][ii]
-            dataDict_n['qbx'][ii][ind_maxx:ind_minx+1] = dataDict['qbx'][ii]
-            dataDict_n['qsx'][ii][ind_maxx:ind_minx+1] = dataDict['qsx'][ii]
-            dataDict_n['qby'][ii][ind_maxx:ind_minx+1] = dataDict['qby'][ii]
-            dataDict_n['qsy'][ii][ind_maxx:ind_minx+1] = dataDict['qsy'][ii]
-            dataDict_n['probabilitySuspension'][ii][ind_maxx:ind_minx+1] = dataDict['probabilitySuspension'][ii]
-            dataDict_n['probabilityMovement'][ii][ind_maxx:ind_minx+1] = dataDict['probabilityMovement'][ii]
-            dataDict_n['suspendedSedVolume'][ii][ind_maxx:ind_minx+1] = dataDict['suspendedSedVolume'][ii]
-            dataDict_n['latitude'][ind_maxx:ind_minx+1] = dataDict['latitude'][ii]
-            dataDict_n['longitude'][ind_maxx:ind_minx+1] = dataDict['longitude'][ii]
-
-
-        if 'FIXED' in ofname:
-            dataDict_n['bottomElevation'][ind_maxx:ind_minx + 1] = dataDict['bottomElevation']
-        elif 'MOBILE' in ofname:
-            for ii in range(0, int(new_t)):
-                dataDict_n['bottomElevation'][ii][ind_maxx:ind_minx + 1] = dataDict['bottomElevation'][ii]
-        else:
-            print 'You need to modify makenc_CSHORErun in makenc.py to accept your new version name!'
-
-    # get rid of all masks
-    test = np.ma.masked_array(dataDict_n['aveE'], np.isnan(dataDict_n['aveE']))
-    dataDict_n['aveE'] = test
-    del test
-    test = np.ma.masked_array(dataDict_n['stdE'], np.isnan(dataDict_n['stdE']))
-    dataDict_n['stdE'] = test
-    del test
-    test = np.ma.masked_array(dataDict_n['aveN'], np.isnan(dataDict_n['aveN']))
-    dataDict_n['aveN'] = test
-    del test
-    test = np.ma.masked_array(dataDict_n['stdN'], np.isnan(dataDict_n['stdN']))
-    dataDict_n['stdN'] = test
-    del test
-    test = np.ma.masked_array(dataDict_n['waveHs'], np.isnan(dataDict_n['waveHs']))
-    dataDict_n['waveHs'] = test
-    del test
-    test = np.ma.masked_array(dataDict_n['waveMeanDirection'], np.isnan(dataDict_n['waveMeanDirection']))
-    dataDict_n['waveMeanDirection'] = test
-    del test
-    test = np.ma.masked_array(dataDict_n['waterLevel'], np.isnan(dataDict_n['waterLevel']))
-    dataDict_n['waterLevel'] = test
-    del test
-    test = np.ma.masked_array(dataDict_n['stdWaterLevel'], np.isnan(dataDict_n['stdWaterLevel']))
-    dataDict_n['stdWaterLevel'] = test
-    del test
-    test = np.ma.masked_array(dataDict_n['setup'], np.isnan(dataDict_n['setup']))
-    dataDict_n['setup'] = test
-    del test
-    test = np.ma.masked_array(dataDict_n['qbx'], np.isnan(dataDict_n['qbx']))
-    dataDict_n['qbx'] = test
-    del test
-    test = np.ma.masked_array(dataDict_n['qsx'], np.isnan(dataDict_n['qsx']))
-    dataDict_n['qsx'] = test
-    del test
-    test = np.ma.masked_array(dataDict_n['qby'], np.isnan(dataDict_n['qby']))
-    dataDict_n['qby'] = test
-    del test
-    test = np.ma.masked_array(dataDict_n['qsy'], np.isnan(dataDict_n['qsy']))
-    dataDict_n['qsy'] = test
-    del test
-    test = np.ma.masked_array(dataDict_n['probabilitySuspension'], np.isnan(dataDict_n['probabilitySuspension']))
-    dataDict_n['probabilitySuspension'] = test
-    del test
-    test = np.ma.masked_array(dataDict_n['probabilityMovement'], np.isnan(dataDict_n['probabilityMovement']))
-    dataDict_n['probabilityMovement'] = test
-    del test
-    test = np.ma.masked_array(dataDict_n['suspendedSedVolume'], np.isnan(dataDict_n['suspendedSedVolume']))
-    dataDict_n['suspendedSedVolume'] = test
-    del test
-    test = np.ma.masked_array(dataDict_n['latitude'], np.isnan(dataDict_n['latitude']))
-    dataDict_n['latitude'] = test
-    del test
-    test = np.ma.masked_array(dataDict_n['longitude'], np.isnan(dataDict_n['longitude']))
-    dataDict_n['longitude'] = test
-    del test
-    test = np.ma.masked_array(dataDict_n['bottomElevation'], np.isnan(dataDict_n['bottomElevation']))
-    dataDict_n['bottomElevation'] = test
-    del test
-
-    # check to see if I screwed up!
-    assert set(dataDict.keys()) == set(dataDict_n.keys()), 'You are missing dictionary keys in the new dictionary!'
-    # replace the dictionary with the new dictionary
-    del dataDict
-    dataDict = dataDict_n
-    del dataDict_n
-
-    # now we flip everything that has a spatial dimension around so it will be all pretty like spicer wants?
-    dataDict['aveN'] = np.flip(dataDict['aveN'], 1)
-    dataDict['waveHs'] = np.flip(dataDict['waveHs'], 1)
-    dataDict['aveE'] = np.flip(dataDict['aveE'], 1)
-    dataDict['waveMeanDirection'] = np.flip(dataDict['waveMeanDirection'], 1)
-    dataDict['stdWaterLevel'] = np.flip(dataDict['stdWaterLevel'], 1)
-    dataDict['probabilitySuspension'] = np.flip(dataDict['probabilitySuspension'], 1)
-    dataDict['stdN'] = np.flip(dataDict['stdN'], 1)
-    dataDict['stdE'] = np.flip(dataDict['stdE'], 1)
-    dataDict['bottomElevation'] = np.flip(dataDict['bottomElevation'], 1)
-    dataDict['xFRF'] = np.flip(dataDict['xFRF'], 0)
-    dataDict['qsy'] = np.flip(dataDict['qsy'], 1)
-    dataDict['qsx'] = np.flip(dataDict['qsx'], 1)
-    dataDict['waterLevel'] = np.flip(dataDict['waterLevel'], 1)
-    dataDict['qbx'] = np.flip(dataDict['qbx'], 1)
-    dataDict['qby'] = np.flip(dataDict['qby'], 1)
-    dataDict['setup'] = np.flip(dataDict['setup'], 1)
-    dataDict['longitude'] = np.flip(dataDict['longitude'], 0)
-    dataDict['latitude'] = np.flip(dataDict['latitude'], 0)
-    dataDict['suspendedSedVolume'] = np.flip(dataDict['suspendedSedVolume'], 1)
-    dataDict['probabilityMovement'] = np.flip(dataDict['probabilityMovement'], 1)
-
-    # write data to file
-    write_data_to_nc(fid, varAtts, dataDict)
-    # close file
-    fid.close()
-
-def makenc_intBATHY(ofname, dataDict, globalYaml, varYaml):
+    with new_nc_file(ofname, globalAtts, diskless=diskless) as fid:
+
+        # note: you have to hand this the yFRF coordinates of the BC gage if you want to get lat/lon..
+        coords = FRFcoordArray(dataDict['xFRF'], dataDict['yFRF'])  # all cross-shore nodes at once
+        dataDict['latitude'] = coords['Lat']
+        dataDict['longitude'] = coords['Lon']
+
+        # ok, we are HARD CODING the dimensions to ALWAYS be at the 8m ARRAY (xFRF = 914.44 rounded DOWN to 914)
+        # we will just fill in the missing values with nans as required
+        array8m_loc = 914
+        xFRF_n = np.flipud(np.arange(-50, array8m_loc+1) + 0.0)  # same orientation as the model grid
+
+        # creating dimensions of data, the cross-shore dimension is named by the var yaml
+        crossDim = [dim for dim in varAtts['_dimensions'] if dim != 'time'][0]
+        new_s = np.size(xFRF_n)
+        new_t = np.shape(dataDict['waveHs'])[0]
+        xdim = fid.createDimension(crossDim, new_s)
+        time = fid.createDimension('time', new_t)
+
+        # find index of first and last point of the model grid on the netCDF grid
+        ind_minx = int(np.argwhere(xFRF_n == min(dataDict['xFRF'])))
+        ind_maxx = int(np.argwhere(xFRF_n == max(dataDict['xFRF'])))
+        fullGrid = ind_maxx == 0 and ind_minx == new_s - 1 and np.size(dataDict['xFRF']) == new_s
+        dataDict[crossDim] = dataDict['xFRF']
+
+        # single pass over the variables the var yaml puts on the cross-shore dimension:  pad onto the netCDF grid (only
+        # if the model grid is smaller), mask nans and flip so xFRF increases, masking and flipping are views not copies
+        ncDict = {}
+        for var, data in dataDict.items():
+            dims = varAtts[var]['dim'] if isinstance(varAtts.get(var, None), dict) and var in varAtts['_variables'] else []
+            if crossDim in dims:
+                axis = dims.index(crossDim)
+                if var == crossDim or var == 'xFRF':
+                    data = xFRF_n
+                else:
+                    data = np.asanyarray(data)
+                    if not fullGrid:
+                        padded = np.full(data.shape[:axis] + (new_s,) + data.shape[axis+1:], fill_value=np.nan)
+                        padded[(slice(None),) * axis + (slice(ind_maxx, ind_minx + 1),)] = data
+                        data = padded
+                    data = np.ma.masked_invalid(data, copy=False)
+                data = data[(slice(None),) * axis + (slice(None, None, -1),)]
+            ncDict[var] = data
+
+        # write data to file
+        write_data_to_nc(fid, varAtts, ncDict)
+
+def makenc_intBATHY(ofname, dataDict, globalYaml, varYaml, diskless=False):
     """
     TODO: can this be combined with makenc_t0BATHY
     Args:
@@ -843,6 +1405,7 @@ def makenc_intBATHY(ofname, dataDict, globalYaml, varYaml):
     
       globalYaml: yaml containing global meta data
       varYaml:  yaml containing variable meta data
+      diskless: assemble the file in memory and write it in one go (see init_nc_file) (Default value = False)
 
     Returns:
       writes out the ncfile
@@ -853,18 +1416,16 @@ def makenc_intBATHY(ofname, dataDict, globalYaml, varYaml):
     varAtts = import_template_file(varYaml)
 
     # create netcdf file
-    fid = init_nc_file(ofname, globalAtts)
+    with new_nc_file(ofname, globalAtts, diskless=diskless) as fid:
 
-    # creating dimensions of data
-    ni = fid.createDimension('ni', dataDict['utmEasting'].shape[1])
-    nj = fid.createDimension('nj', dataDict['utmEasting'].shape[0])
+        # creating dimensions of data
+        ni = fid.createDimension('ni', dataDict['utmEasting'].shape[1])
+        nj = fid.createDimension('nj', dataDict['utmEasting'].shape[0])
 
-    # write data to file
-    write_data_to_nc(fid, varAtts, dataDict)
-    # close file
-    fid.close()
+        # write data to file
+        write_data_to_nc(fid, varAtts, dataDict)
 
-def makenc_t0BATHY(ofname, dataDict, globalYaml, varYaml):
+def makenc_t0BATHY(ofname, dataDict, globalYaml, varYaml, diskless=False):
     """# this is the script that builds the t0 netCDF file from the initial Bathy DEM (intBathy)
 
     Args:
@@ -876,6 +1437,7 @@ def makenc_t0BATHY(ofname, dataDict, globalYaml, varYaml):
 
       globalYaml (str): CF compliant meta data in global file
       varYaml (str):  CF compliant variable meta data matching dataDict
+      diskless: assemble the file in memory and write it in one go (see init_nc_file) (Default value = False)
 
     Returns:
       writes out the cshore_ncfile
@@ -886,18 +1448,16 @@ def makenc_t0BATHY(ofname, dataDict, globalYaml, varYaml):
     varAtts = import_template_file(varYaml)
 
     # create netcdf file
-    fid = init_nc_file(ofname, globalAtts)
+    with new_nc_file(ofname, globalAtts, diskless=diskless) as fid:
 
-    # creating dimensions of data
-    xFRF = fid.createDimension('xFRF', dataDict['xFRF'].shape[0])
-    yFRF = fid.createDimension('yFRF', dataDict['yFRF'].shape[0])
+        # creating dimensions of data
+        xFRF = fid.createDimension('xFRF', dataDict['xFRF'].shape[0])
+        yFRF = fid.createDimension('yFRF', dataDict['yFRF'].shape[0])
 
-    # write data to file
-    write_data_to_nc(fid, varAtts, dataDict)
-    # close file
-    fid.close()
+        # write data to file
+        write_data_to_nc(fid, varAtts, dataDict)
 
-def makenc_tiBATHY(ofname, dataDict, globalYaml, varYaml):
+def makenc_tiBATHY(ofname, dataDict, globalYaml, varYaml, diskless=False):
     """# this is the script that builds the monthly ti netCDF file by incorporating the new survey data into the most recent Bathy DEM
 
     Args:
@@ -909,6 +1469,7 @@ def makenc_tiBATHY(ofname, dataDict, globalYaml, varYaml):
 
       globalYaml (str): path to global yaml with CF compliant meta data
       varYaml (str): path to variable CF compliant meta data and matching the keys in data Dict
+      diskless: assemble the file in memory and write it in one go (see init_nc_file) (Default value = False)
 
     Returns:
       writes out the netCDF file
@@ -919,16 +1480,14 @@ def makenc_tiBATHY(ofname, dataDict, globalYaml, varYaml):
     varAtts = import_template_file(varYaml)
 
     # create netcdf file
-    fid = init_nc_file(ofname, globalAtts)
+    with new_nc_file(ofname, globalAtts, diskless=diskless) as fid:
 
-    # creating dimensions of data
-    time = fid.createDimension('time', dataDict['time'].shape[0])
-    xFRF = fid.createDimension('xFRF', dataDict['xFRF'].shape[0])
-    yFRF = fid.createDimension('yFRF', dataDict['yFRF'].shape[0])
+        # creating dimensions of data
+        time = fid.createDimension('time', dataDict['time'].shape[0])
+        xFRF = fid.createDimension('xFRF', dataDict['xFRF'].shape[0])
+        yFRF = fid.createDimension('yFRF', dataDict['yFRF'].shape[0])
 
-    # write data to file
-    write_data_to_nc(fid, varAtts, dataDict)
-    # close file
-    fid.close()
+        # write data to file
+        write_data_to_nc(fid, varAtts, dataDict)
 
 
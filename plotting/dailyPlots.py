@@ -20,6 +20,7 @@ from getdatatestbed import getDataFRF
 from testbedutils import waveLib as sbwave
 from testbedutils import sblib as sb
 from plotting import operationalPlots as oP
+import makenc
 # PARAMETERS
 modelList = ['STWAVE', 'CMS']
 prefixList = {'STWAVE': ['HP', 'FP', 'CB'],
@@ -31,10 +32,11 @@ numDays = 7
 workDir = '/home/number/cmtb/liveDataPlots'
 angadj = 70
 logo_path = '../ArchiveFolder/CHL_logo.png'
+catalogDir = None  # local THREDDS base with the products' coverage catalogs (see makenc.update_nc_catalog)
 
 # MAIN CODE
 def main():
-    startTime, endTime, modelList, prefixList, workDir = getUsrInp()
+    startTime, endTime, modelList, prefixList, workDir, catalogDir = getUsrInp()
     datestring = (startTime.strftime('%Y-%m-%dT%H0000Z') + '_' +
                   endTime.strftime('%Y-%m-%dT%H0000Z'))
     for model in modelList:
@@ -52,22 +54,34 @@ def main():
             go = getDataFRF.getObs(startTime, endTime)
             gm = getDataFRF.getDataTestBed(startTime, endTime)
             for station in stationList:
+                if not hasCoverage(catalogDir, model, prefix, station, startTime, endTime):
+                    print('No ' + model + ' ' + prefix + ' data for station ' + station + ' in the catalog')
+                    continue
                 (time, obsStats, modStats, 
                 plotList, obsi, modi) = getStats(startTime, endTime, model, prefix, 
                                                 station, go, gm)
                 if time is None:
                     continue
+                ofnames, dataDicts = [], []
                 for param in plotList:
                     obs = obsStats[param][obsi.astype(np.int)]
                     obs = checkMask(obs, 'observation')
                     mod = modStats[param][modi.astype(np.int)]
                     mod = checkMask(mod, 'model')
-                    ofname = os.path.join(fpath, 'CMTB-waveModels_{}_{}_station_{}_{}_{}.png'
-                                        .format(model, prefix, station, param, datestring))
-                    makePlots(ofname, param, time, obs, mod)
+                    ofnames.append(os.path.join(fpath, 'CMTB-waveModels_{}_{}_station_{}_{}_{}.png'
+                                        .format(model, prefix, station, param, datestring)))
+                    dataDicts.append(makeDataDict(param, time, obs, mod))
+                makePlots(ofnames, dataDicts)
             # Now do field
             gm = getDataFRF.getDataTestBed(startTime, endTime)
             for isLocal in [True, False]:
+                if model == 'CMS':
+                    product = 'Field'
+                else:
+                    product = 'Local-Field' if isLocal else 'Regional-Field'
+                if not hasCoverage(catalogDir, model, prefix, product, startTime, endTime):
+                    print('No ' + model + ' ' + product + ' ' + prefix + ' data in the catalog for ' + datestring)
+                    continue
                 try:
                     bathy = gm.getModelField('bathymetry', prefix, isLocal, model=model)
                 except AssertionError as err:
@@ -77,6 +91,8 @@ def main():
                         continue
                     else:
                         raise err
+                grid = 'Local' if isLocal else 'Regional'
+                plotJobs = []
                 for varName in fieldVarList:
                     try:
                         var = gm.getModelField(varName, prefix, isLocal, model=model)
@@ -88,24 +104,84 @@ def main():
                     for key in var.keys(): # Check data for masks
                         var[key] = checkMask(var[key], key + ' (in ' + varName + ')')
                     fieldpacket = makeFieldpacket(varName, var, isLocal)
-                    grid = 'Local' if isLocal else 'Regional'
+                    fieldRange = catalogFieldRange(catalogDir, model, prefix, product, varName, startTime, endTime)
+                    if fieldRange is not None:  # colorbar from the files' statistics, not the whole field
+                        fieldpacket['fieldRange'] = fieldRange
                     kwargs = {}
                     if varName == 'waveHs':
                         waveDm = gm.getModelField('waveDm', prefix, isLocal, model=model)['waveDm']
                         kwargs['directions'] = waveDm
-                    print('Generating field variable plots for ' + prefix + ' ' + 
-                        model + ' ' + grid + ' ' + varName)
-                    oP.plotSpatialFieldData(bathy, fieldpacket, os.path.join(fpath, varName), 
-                                                isLocal, model=model, **kwargs)
-                    imList = sorted(glob.glob(fpath + '/' + varName + '_*.png'))
-                    print('Generating field variable gifs for ' + prefix + ' ' + model 
-                        + ' ' + grid + ' ' + varName)
-                    ofname = os.path.join(fpath, 'CMTB-waveModels_{}_{}_{}_{}_{}.gif'
-                                        .format(model, prefix, grid, varName, datestring))
-                    sb.makegif(imList, ofname)
-                    [os.remove(ff) for ff in imList]
+                    kwargs.update({'contourpacket': bathy, 'fieldpacket': fieldpacket, 'nested': isLocal,
+                                   'model': model, 'prefix': os.path.join(fpath, varName),
+                                   'animation': os.path.join(fpath, 'CMTB-waveModels_{}_{}_{}_{}_{}.gif'
+                                        .format(model, prefix, grid, varName, datestring))})
+                    plotJobs.append(kwargs)
+                print('Generating field variable gifs for ' + prefix + ' ' +
+                    model + ' ' + grid)
+                oP.plotSpatialFrames(plotJobs)
 
 # SUBROUTINES
+def hasCoverage(catalogDir, model, prefix, product, startTime, endTime):
+    """Checks the local coverage catalog of a product for files between startTime and endTime, so products that
+    weren't run aren't requested from THREDDS
+
+    Args:
+      catalogDir: local THREDDS base the catalogs are in ([catalogDir]/[model]/[prefix]/[product]), None to skip
+            the check
+      model: model name (e.g. 'STWAVE')
+      prefix: version prefix
+      product: station or field name (e.g. 'awac-6m', 'Local-Field')
+      startTime: start of the plotted period (datetime)
+      endTime: end of the plotted period (datetime)
+
+    Returns:
+      False if the catalog has no files in the period, True otherwise (or if there is no catalog to check)
+
+    """
+    if catalogDir is None:
+        return True
+    catalog = os.path.join(catalogDir, model, prefix, product, product + '.catalog.sqlite')
+    if not os.path.isfile(catalog):
+        return True
+    return len(makenc.query_nc_catalog(catalog, startTime, endTime, version_prefix=prefix)) > 0
+
+def catalogFieldRange(catalogDir, model, prefix, product, varName, startTime, endTime):
+    """Finds the colorbar range of a field from the statistics sidecars (see makenc.write_stats_sidecar) of the
+    product's files in the catalog, instead of from the whole field
+
+    Args:
+      catalogDir: local THREDDS base the catalogs are in (see hasCoverage), None to skip
+      model: model name (e.g. 'STWAVE')
+      prefix: version prefix
+      product: field name (e.g. 'Local-Field')
+      varName: field variable (e.g. 'waveHs')
+      startTime: start of the plotted period (datetime)
+      endTime: end of the plotted period (datetime)
+
+    Returns:
+      (min, max) of the variable in the period, None if there is no catalog or a file has no statistics
+
+    """
+    if catalogDir is None:
+        return None
+    catalog = os.path.join(catalogDir, model, prefix, product, product + '.catalog.sqlite')
+    if not os.path.isfile(catalog):
+        return None
+    start, end = nc.date2num([startTime, endTime], 'seconds since 1970-01-01')
+    mins, maxs = [], []
+    for path, tstart, tend in makenc.query_nc_catalog(catalog, startTime, endTime, version_prefix=prefix):
+        sidecar = makenc.read_stats_sidecar(path)
+        if sidecar is None or varName not in sidecar['variables']:
+            return None
+        varStats = sidecar['variables'][varName]
+        for tt, varMin, varMax in zip(sidecar['time'], varStats['min'], varStats['max']):
+            if start <= tt <= end and varMin is not None:
+                mins.append(varMin)
+                maxs.append(varMax)
+    if len(mins) == 0:
+        return None
+    return min(mins), max(maxs)
+
 def makeFieldpacket(varName, var, isLocal):
     grid = 'Local FRF North Property' if isLocal else 'Regional Grid'
     fieldpacket = {'xlabel': 'Longshore distance [m]', 
@@ -147,6 +223,8 @@ def getUsrInp():
                               '"' + "{'STWAVE': ['HP', 'FP', 'CB'], 'CMS': ['HP']}" + '"'))
     parser.add_argument('-workDir', type=str,
                         help='path where the plots will be saved')
+    parser.add_argument('-catalogDir', type=str,
+                        help='local THREDDS base with the coverage catalogs, products without data are skipped')
     args = parser.parse_args()
     args.endTime = DT.datetime.strptime(args.endTime, '%Y-%m-%dT%H:%M:%SZ')
     if args.numDays == None:
@@ -163,12 +241,14 @@ def getUsrInp():
         args.prefix = eval(args.prefix)
     if args.workDir == None:
         args.workDir = workDir
+    if args.catalogDir == None:
+        args.catalogDir = catalogDir
     for model in args.model:
         if model not in args.prefix.keys():
             sys.exit('Error: ' + model + ' prefixes not provided')
     startTime = args.endTime - DT.timedelta(days=numDays)
     
-    return startTime, args.endTime, args.model, args.prefix, args.workDir
+    return startTime, args.endTime, args.model, args.prefix, args.workDir, args.catalogDir
 
 def getStats(startTime, endTime, model, prefix, station, go, gm):
     # Get observation data
@@ -203,7 +283,7 @@ def getStats(startTime, endTime, model, prefix, station, go, gm):
         plotList = ['Hm0', 'Tm', 'sprdF', 'Tp']
     return time, obsStats, modStats, plotList, obsi, modi
 
-def makePlots(ofname, param, time, obs, mod):
+def makeDataDict(param, time, obs, mod):
     if param in ['Tm', 'Tp', 'Tm10', 'Tave']:
         units = 's'
         title = '%s period' % param
@@ -225,9 +305,13 @@ def makePlots(ofname, param, time, obs, mod):
                 'var_name': param,
                 'units': units,
                 'p_title': title}
-    print('Plotting ' + ofname)
+    return dataDict
+
+def makePlots(ofnames, dataDicts):
+    for ofname in ofnames:
+        print('Plotting ' + ofname)
     with warnings.catch_warnings(record=True) as w:
-        oP.obs_V_mod_TS(ofname, dataDict, logo_path=logo_path)
+        oP.obs_V_mod_TS_batch(ofnames, dataDicts, logo_path=logo_path)
         # if w != []:
         #     assert str(w[0].message) == (
         #         'This figure includes Axes that are not compatible ' +
@@ -594,7 +594,7 @@ def plotTS(ofname, plotpacket1, plotpacket2, plotpacket3, **kwargs):
     plt.close()
 
 # these are all the ones that were formerly in gridTools!
-def plotBathyInterp(ofname, dataDict, title):
+def plotBathyInterp(ofname, dataDict, title, raster=False):
     """This is a quick plot of the bathy interp, Not sure if its used in any work flow or was part of a quality check
     This can probably be moved to a plotting library maybe be a more generic
     
@@ -611,6 +611,8 @@ def plotBathyInterp(ofname, dataDict, title):
         'modelGridX' 1 d array of model domain
         'modelGridY 1 d array of model domain
       title: Plot title
+      raster (bool): draw the bathymetries with pcolormesh rather than pcolor, much faster on large grids
+                (Default value = False)
 
     Returns:
 
@@ -638,19 +640,20 @@ def plotBathyInterp(ofname, dataDict, title):
     fig = plt.figure(figsize=(7,5))
     plt.suptitle(title, weight='bold')
     ax1 = plt.subplot(121)
-    ax1contOld = ax1.pcolor(modelGridX, modelGridY, goodOldBathy,  vmin=vmin, vmax=vmax)
+    pcolorFunc = 'pcolormesh' if raster == True else 'pcolor'
+    ax1contOld = getattr(ax1, pcolorFunc)(modelGridX, modelGridY, goodOldBathy,  vmin=vmin, vmax=vmax)
     # cbar = plt.colorbar(ax1cont)  # more sophicsticated color bar below
     # plot Box around removed data
     ax1.plot([newXfrf.min(), newXfrf.max()], [newYfrf.min(), newYfrf.min()], lineCodes, label='New data bounds')  # south Boundary
     ax1.plot([newXfrf.min(), newXfrf.min()], [newYfrf.min(), newYfrf.max()], lineCodes)  # dune Boundary
     ax1.plot([newXfrf.max(), newXfrf.max()], [newYfrf.min(), newYfrf.max()], lineCodes)  # offshore boundary
     ax1.plot([newXfrf.min(), newXfrf.max()], [newYfrf.max(), newYfrf.max()], lineCodes)  # north Boundary
-    ax1contNew = ax1.pcolor(newXfrf, newYfrf, newZfrf, vmin=vmin, vmax=vmax) # levels=levels,
+    ax1contNew = getattr(ax1, pcolorFunc)(newXfrf, newYfrf, newZfrf, vmin=vmin, vmax=vmax) # levels=levels,
     ax1.legend()
 
     # second Subplot
     ax2 = plt.subplot(122, sharex=ax1)  # , sharey=ax1)  this removed the y axis from both plots
-    ax2.pcolor(modelGridX, modelGridY, newBathyGrid, vmin=vmin, vmax=vmax)
+    getattr(ax2, pcolorFunc)(modelGridX, modelGridY, newBathyGrid, vmin=vmin, vmax=vmax)
     ax2.contour(modelGridX, modelGridY, newBathyGrid, levels= [-9,-6,-3,0], linestyles = '-', colors='k', labels=[-9,-6, -3, 0])
     ax2.set_yticks([])
     plt.subplots_adjust(wspace=0.05)
@@ -4,7 +4,7 @@ import numpy as np
 import matplotlib.dates as mdates
 import matplotlib.image as image
 import os, math
-from scipy.interpolate import interpn, RectBivariateSpline
+from scipy.interpolate import interpn
 from getdatatestbed.getDataFRF import getObs
 from testbedutils import sblib as sb
 from testbedutils.sblib import statsBryant
@@ -139,7 +139,8 @@ def plotTripleSpectra(fnameOut, time, Hs, raw, rot, interp, full=False):
     plt.savefig(fnameOut)
     plt.close()
 
-def plotSpatialFieldData(contourpacket, fieldpacket, prefix='', nested=True, model='STWAVE', **kwargs):
+def plotSpatialFieldData(contourpacket, fieldpacket, prefix='', nested=True, model='STWAVE', sink=None, savePng=None,
+                         raster=False, renderCache=None, **kwargs):
     """This function plots a 2D field of data
 
     Args:
@@ -158,6 +159,12 @@ def plotSpatialFieldData(contourpacket, fieldpacket, prefix='', nested=True, mod
 
         cblabel: label for the colorbar, the value being plotted
 
+        fieldRange: (optional) tuple of (min, max) to scale the colorbar with instead of the range of field, keeps
+            frames rendered in pieces (see plotSpatialFrames) on the same colorbar
+
+        static: (optional) True when the field does not change in time (e.g. bathymetry), only the first record is
+            drawn, once, and the title carries no time so the frame is reused from the render cache across runs
+
       prefix (str): prefix to savefile (path (Default value = '')
       namebase (str): a base to create filenames with, datetime will be appended (Default value = 'file')
       contourpacket(dict):
@@ -177,19 +184,24 @@ def plotSpatialFieldData(contourpacket, fieldpacket, prefix='', nested=True, mod
 
       nested (bool): demarks whether this is nested or not grid, will affect the gauge
                 labels on the plot (Default value = 1)
+      sink (FrameSink): each frame is streamed to this animation (see plottingTools.FrameSink) (Default value = None)
+      savePng (bool): write each frame to a png, defaults to True without a sink and False with one
+      raster (bool): draw the field as a raster of grid cells (pcolormesh) with the same color bands as the filled
+                contours, much faster on large regular grids (Default value = False)
+      renderCache (str): a directory to keep rendered frames in, identical frames are then reused not re-rendered
+                (Default value = None, no cache)
     Keyword Args:
           directions: this is a spatial direction data of same dimensions of spatail wave height data (or other scalar)
             if directional data should be wrt shore normal
 
     Returns:
-      a plot to file
-      
-      TODO:
-      increase speed with this capability
-      https://stackoverflow.com/questions/42386372/increase-the-speed-of-redrawing-contour-plot-in-matplotlib
+      list of the png file names written, one per time step.  The figure, colorbar, gauge labels and (static)
+      bathymetry contours are drawn once and only the field, quiver and title are redrawn for each time step
 
     """
     decimals, Norm = False, False # setting defaults
+    if savePng is None:
+        savePng = sink is None
     # Un pack Dictionary
     ycoord = fieldpacket['ycoord']
     xcoord = fieldpacket['xcoord']
@@ -198,9 +210,11 @@ def plotSpatialFieldData(contourpacket, fieldpacket, prefix='', nested=True, mod
     title = fieldpacket['title']
     clabel_text = fieldpacket['cblabel']
     time = fieldpacket['time']
-    numrecs = np.size(fieldpacket['field'], axis=0)
+    static = fieldpacket.get('static', False) == True
+    numrecs = 1 if static else np.size(fieldpacket['field'], axis=0)
     if numrecs == 1:
         time = [time]
+    frameTitle = lambda tt: title if static else title + '\n%s' % time[tt]
     # set the color map for the plot
     if clabel_text.split('$')[0].lower().strip() in ['wave height', 'wavehs', 'peak period']:
         colormap = 'GnBu'
@@ -224,14 +238,18 @@ def plotSpatialFieldData(contourpacket, fieldpacket, prefix='', nested=True, mod
 
     # cbar_max = sblib.baseRound(np.nanmax(fieldpacket['field']), sblib.oMagnitude(np.diff((np.nanmin(fieldpacket['field']), np.nanmax(fieldpacket['field'])))), ceil=True)
     # cbar_min = sblib.baseRound(np.nanmin(fieldpacket['field']), sblib.oMagnitude(np.diff((np.nanmin(fieldpacket['field']), np.nanmax(fieldpacket['field'])))), floor=True)
-    if np.diff((np.nanmin(fieldpacket['field']), np.nanmax(fieldpacket['field']))) < 3:
+    if 'fieldRange' in fieldpacket:
+        fieldMin, fieldMax = fieldpacket['fieldRange']
+    else:
+        fieldMin, fieldMax = np.nanmin(fieldpacket['field']), np.nanmax(fieldpacket['field'])
+    if np.diff((fieldMin, fieldMax)) < 3:
         from testbedutils import sblib
-        cbar_min = np.float('{:.3g}'.format(np.nanmin(fieldpacket['field'])))
-        cbar_max = np.float('{:.3g}'.format(np.nanmax(fieldpacket['field'])))
+        cbar_min = np.float('{:.3g}'.format(fieldMin))
+        cbar_max = np.float('{:.3g}'.format(fieldMax))
         decimals=True
     else:
-        cbar_min = np.floor(np.nanmin(fieldpacket['field']))
-        cbar_max = np.ceil(np.nanmax(fieldpacket['field']))
+        cbar_min = np.floor(fieldMin)
+        cbar_max = np.ceil(fieldMax)
     cbarlabels = np.linspace(cbar_min, cbar_max, num=5, endpoint=True)  # a list of labels
 
     # wave gauges in approx position
@@ -327,125 +345,240 @@ def plotSpatialFieldData(contourpacket, fieldpacket, prefix='', nested=True, mod
     import matplotlib.colors as mc
     levels = np.linspace(cbar_min, cbar_max, 35)  # draw 35 levels
     norm = mc.BoundaryNorm(levels, 256)
-    # make the bathycontour loopable
-    if contourpacket['bathy'].shape[0] != numrecs:
-        bathyContour = np.tile(contourpacket['bathy'], (numrecs, 1,1))
-    else:
-        bathyContour = contourpacket['bathy']
-    from plottingTools import  MidpointNormalize
-    # __LOOPING THROUGH PLOTS___
-    for tt in range(0, numrecs):
-        plt.figure(figsize=fgsize, dpi=80, tight_layout=True)
-        plt.title(title + '\n%s' % time[tt])
-        #
+    # make the bathycontour loopable, a static bathy (no time or a single time) is indexed not tiled
+    bathyContour = contourpacket['bathy']
+    if np.ndim(bathyContour) == 2:
+        bathyContour = bathyContour[np.newaxis]
+    bathyIdx = lambda tt: tt if bathyContour.shape[0] == numrecs else 0
+    from plottingTools import  MidpointNormalize, bilinearResample, cellEdges
+    # __BUILD THE FIGURE ONCE___ the colorbar, labels, gauges and (static) bathy contours are reused for every frame,
+    # only the field, quiver and title are updated for each time step
+    if raster == True:
+        # the color of each contour band (taken at its middle like contourf) drawn through a BoundaryNorm
+        if Norm == True:
+            bandNorm = MidpointNormalize(midpoint=0, vmin=cbar_min, vmax=cbar_max)
+        else:
+            bandNorm = mc.Normalize(vmin=cbar_min, vmax=cbar_max)
+        rasterCmap = mc.ListedColormap(plt.get_cmap(colormap)(bandNorm((levels[1:] + levels[:-1]) / 2.)))
+        rasterCmap.set_under('none')  # like contourf, values outside of the levels are not colored
+        rasterCmap.set_over('none')
+        rasterCmap.set_bad('none')
+        rasterNorm = mc.BoundaryNorm(levels, rasterCmap.N)
+        xEdges, yEdges = cellEdges(xcoord), cellEdges(ycoord)
+    def drawField(tt, cont=None):
+        if raster == True:
+            if cont is None:
+                return plt.pcolormesh(xEdges, yEdges, np.ma.masked_invalid(fieldpacket['field'][tt, :, :]),
+                                      cmap=rasterCmap, norm=rasterNorm)
+            cont.set_array(np.ma.masked_invalid(fieldpacket['field'][tt, :, :]).ravel())  # reuse the mesh
+            return cont
+        if cont is not None:
+            for coll in cont.collections:
+                coll.remove()
         if Norm == True:
-            cont = plt.contourf(xcoord, ycoord, fieldpacket['field'][tt, :, :], levels, vmin=cbar_min, vmax=cbar_max,
+            return plt.contourf(xcoord, ycoord, fieldpacket['field'][tt, :, :], levels, vmin=cbar_min, vmax=cbar_max,
                      cmap=colormap, levels=levels, norm=MidpointNormalize(midpoint=0,vmin=cbar_min, vmax=cbar_max))
         else:
-            cont = plt.contourf(xcoord, ycoord, fieldpacket['field'][tt, :, :], levels, vmin=cbar_min, vmax=cbar_max,
+            return plt.contourf(xcoord, ycoord, fieldpacket['field'][tt, :, :], levels, vmin=cbar_min, vmax=cbar_max,
                      cmap=colormap, levels=levels)
-        if 'directions' in kwargs:
-            Us = -np.rad2deg(np.cos(np.deg2rad(kwargs['directions'][tt])))
-            Vs = -np.rad2deg(np.sin(np.deg2rad(kwargs['directions'][tt])))
-            xp = xcoord
-            yp = ycoord
-            if model == 'CMS':
-                if nested == False:
-                    nx = 20
-                    ny = 25
-                else:
-                    nx = 14
-                    ny = 25
-                    xInd = np.logical_and(xcoord > 0, xcoord < 1000)
-                    yInd = np.logical_and(ycoord > -200, ycoord < 1600)
-                    xIndGrd, yIndGrd = np.meshgrid(xInd, yInd)
-                    indGrd = np.logical_and(xIndGrd, yIndGrd)
-                    xp= xcoord[xInd]
-                    yp = ycoord[yInd]
-                    Us = Us[indGrd].reshape(yp.size, xp.size)
-                    Vs = Vs[indGrd].reshape(yp.size, xp.size)
-            elif model == 'STWAVE':
+    fig = plt.figure(figsize=fgsize, dpi=80, tight_layout=True)
+    titleText = plt.title(frameTitle(0))
+    cont = drawField(0)
+    if 'directions' in kwargs:
+        xp = xcoord
+        yp = ycoord
+        if model == 'CMS':
+            if nested == False:
+                nx = 20
+                ny = 25
+            else:
                 nx = 14
                 ny = 25
-            x = np.linspace(xp[0], xp[-1], nx)
-            y = np.linspace(yp[0], yp[-1], ny)
-            Us = RectBivariateSpline(yp, xp, Us)(y, x)
-            Vs = RectBivariateSpline(yp, xp, Vs)(y, x)
-            locsX, locsY = np.meshgrid(x, y)
-            Q = plt.quiver(locsX, locsY, Us, Vs, pivot='mid', angles='xy')
-        ## write out text labels on plot
-        if nested == True:
-            ptStr = 'or'
-            plt.plot(x_8m, y_8m, ptStr)
-            plt.text(x_8m, y_8m, L_8m, fontsize=12, va='bottom',
-                     rotation=45, color='white', weight='bold')
-            plt.plot(x_5m, y_5m, ptStr)
-            plt.text(x_5m, y_5m, L_5m, fontsize=12, va='bottom',
-                     rotation=45, color='white', weight='bold')
-            plt.plot(x_4m, y_4m, ptStr)
-            plt.text(x_4m, y_4m, L_3m, fontsize=12, va='bottom',
-                     rotation=45, color='white', weight='bold')
-            plt.plot(x_3m, y_3m, ptStr)
-            plt.text(x_3m, y_3m, L_3m, fontsize=12, va='bottom',
-                     rotation=45, color='white', weight='bold')
-
-            plt.plot(x_xp200, y_xp200, ptStr)
-            plt.text(x_xp200, y_xp200, L_xp200, rotation=45, fontsize=12, va='bottom',
-                     color='white', weight='bold')
-            plt.plot(x_xp150, y_xp150, ptStr)
-            plt.text(x_xp150, y_xp150, L_xp150, rotation=45, fontsize=12, va='bottom',
-                     color='white', weight='bold')
-            plt.plot(x_xp125, y_xp125, ptStr)
-            plt.text(x_xp125, y_xp125, L_xp125, rotation=45, fontsize=12,va='bottom',
-                     color='white', weight='bold',ha='right')
-
-            plt.plot(x_pier, y_pier, 'k-', linewidth=5)
-            plt.text(x_pier[1], y_pier[1], L_pier, fontsize=12, va='bottom', ha='right',
-                     color='black', rotation=315, weight='bold')
-            cont_labels = [0, 2, 4, 6, 8, 10]  # labels for contours
-            plt.xlim(0, 1000)
-            plt.ylim(-200, 1600)
-        elif nested == False:
-            plt.plot(x_CBaccess, y_CBaccess, 'oy', ms=10)
-            plt.text(x_CBaccess, y_CBaccess, L_CBaccess, ha='right', va='bottom', fontsize=12,
-                     color='white', rotation=315, weight='bold')
-            plt.plot(x_Duck, y_Duck, '*w', ms=10)
-            plt.text(x_Duck, y_Duck, L_Duck, va='bottom', fontsize=12,
-                     color='white', weight='bold')
-            plt.plot(x_KHrd, y_KHrd, 'oc', ms=10)
-            plt.text(x_KHrd, y_KHrd, L_KHrd, fontsize=12, color='white',
-                     weight='bold', rotation=270, va='bottom', ha='left')
-            plt.plot(x_26m, y_26m, '+k')
-            plt.text(x_26m, y_26m, L_26m, va='bottom', ha='right', fontsize=12, color='white',
-                     weight='bold', rotation=0)
-            plt.plot(x_17m, y_17m, '+k')
-            plt.text(x_17m, y_17m, L_17m, va='bottom', fontsize=12, color='white',
-                     weight='bold')
-            plt.plot(x_11m, y_11m, '+k')
-            plt.text(x_11m, y_11m, L_11m, va='bottom', fontsize=12, color='white',
-                     weight='bold', ha='right', rotation=90)
-            plt.plot(x_pier, y_pier, 'k-', linewidth=5)
-            # plt.text(x_pier[1], y_pier[1], L_pier, fontsize=12, va='bottom', ha='right',
-            #          color='black', rotation=-20, weight='bold')
-            cont_labels = [0, 10, 16, 24]  # labels for contours
-        plt.ylabel(ylabel)
-        plt.xlabel(xlabel)
-        if decimals == True:
-            cbar = plt.colorbar(cont, format='%.3g')
-        else:
-            cbar = plt.colorbar(cont)
-        cbar.set_ticks(cbarlabels)
-        cbar.set_label(clabel_text, fontsize=12)
-        con = plt.contour(xcoord, ycoord, bathyContour[tt], levels=cont_labels, colors='k')
-        plt.clabel(con, inline=True, fmt='%d')
-
+                xp = xcoord[np.logical_and(xcoord > 0, xcoord < 1000)]
+                yp = ycoord[np.logical_and(ycoord > -200, ycoord < 1600)]
+        elif model == 'STWAVE':
+            nx = 14
+            ny = 25
+        x = np.linspace(xp[0], xp[-1], nx)
+        y = np.linspace(yp[0], yp[-1], ny)
+        locsX, locsY = np.meshgrid(x, y)
+        # resample the arrows of every time step onto the lattice at once
+        directions = np.deg2rad(np.ma.filled(np.ma.asarray(kwargs['directions'], dtype=float), np.nan))
+        if directions.ndim == 2:
+            directions = directions[np.newaxis]
+        Us = bilinearResample(-np.rad2deg(np.cos(directions)), xcoord, ycoord, x, y)
+        Vs = bilinearResample(-np.rad2deg(np.sin(directions)), xcoord, ycoord, x, y)
+        Q = plt.quiver(locsX, locsY, Us[0], Vs[0], pivot='mid', angles='xy')
+    ## write out text labels on plot
+    if nested == True:
+        ptStr = 'or'
+        plt.plot(x_8m, y_8m, ptStr)
+        plt.text(x_8m, y_8m, L_8m, fontsize=12, va='bottom',
+                 rotation=45, color='white', weight='bold')
+        plt.plot(x_5m, y_5m, ptStr)
+        plt.text(x_5m, y_5m, L_5m, fontsize=12, va='bottom',
+                 rotation=45, color='white', weight='bold')
+        plt.plot(x_4m, y_4m, ptStr)
+        plt.text(x_4m, y_4m, L_3m, fontsize=12, va='bottom',
+                 rotation=45, color='white', weight='bold')
+        plt.plot(x_3m, y_3m, ptStr)
+        plt.text(x_3m, y_3m, L_3m, fontsize=12, va='bottom',
+                 rotation=45, color='white', weight='bold')
+
+        plt.plot(x_xp200, y_xp200, ptStr)
+        plt.text(x_xp200, y_xp200, L_xp200, rotation=45, fontsize=12, va='bottom',
+                 color='white', weight='bold')
+        plt.plot(x_xp150, y_xp150, ptStr)
+        plt.text(x_xp150, y_xp150, L_xp150, rotation=45, fontsize=12, va='bottom',
+                 color='white', weight='bold')
+        plt.plot(x_xp125, y_xp125, ptStr)
+        plt.text(x_xp125, y_xp125, L_xp125, rotation=45, fontsize=12,va='bottom',
+                 color='white', weight='bold',ha='right')
+
+        plt.plot(x_pier, y_pier, 'k-', linewidth=5)
+        plt.text(x_pier[1], y_pier[1], L_pier, fontsize=12, va='bottom', ha='right',
+                 color='black', rotation=315, weight='bold')
+        cont_labels = [0, 2, 4, 6, 8, 10]  # labels for contours
+        plt.xlim(0, 1000)
+        plt.ylim(-200, 1600)
+    elif nested == False:
+        plt.plot(x_CBaccess, y_CBaccess, 'oy', ms=10)
+        plt.text(x_CBaccess, y_CBaccess, L_CBaccess, ha='right', va='bottom', fontsize=12,
+                 color='white', rotation=315, weight='bold')
+        plt.plot(x_Duck, y_Duck, '*w', ms=10)
+        plt.text(x_Duck, y_Duck, L_Duck, va='bottom', fontsize=12,
+                 color='white', weight='bold')
+        plt.plot(x_KHrd, y_KHrd, 'oc', ms=10)
+        plt.text(x_KHrd, y_KHrd, L_KHrd, fontsize=12, color='white',
+                 weight='bold', rotation=270, va='bottom', ha='left')
+        plt.plot(x_26m, y_26m, '+k')
+        plt.text(x_26m, y_26m, L_26m, va='bottom', ha='right', fontsize=12, color='white',
+                 weight='bold', rotation=0)
+        plt.plot(x_17m, y_17m, '+k')
+        plt.text(x_17m, y_17m, L_17m, va='bottom', fontsize=12, color='white',
+                 weight='bold')
+        plt.plot(x_11m, y_11m, '+k')
+        plt.text(x_11m, y_11m, L_11m, va='bottom', fontsize=12, color='white',
+                 weight='bold', ha='right', rotation=90)
+        plt.plot(x_pier, y_pier, 'k-', linewidth=5)
+        # plt.text(x_pier[1], y_pier[1], L_pier, fontsize=12, va='bottom', ha='right',
+        #          color='black', rotation=-20, weight='bold')
+        cont_labels = [0, 10, 16, 24]  # labels for contours
+    plt.ylabel(ylabel)
+    plt.xlabel(xlabel)
+    if decimals == True:
+        cbar = plt.colorbar(cont, format='%.3g')
+    else:
+        cbar = plt.colorbar(cont)
+    cbar.set_ticks(cbarlabels)
+    cbar.set_label(clabel_text, fontsize=12)
+    con = plt.contour(xcoord, ycoord, bathyContour[bathyIdx(0)], levels=cont_labels, colors='k')
+    conLabels = plt.clabel(con, inline=True, fmt='%d')
+    if renderCache is not None:  # everything but the frame data that goes into the image
+        import hashlib
+        figureHash = hashlib.sha1(repr(('plotSpatialFieldData', title, clabel_text, xlabel, ylabel, colormap, Norm,
+                                        decimals, cbar_min, cbar_max, nested, model, fgsize, raster)).encode('utf-8'))
+        for coord in [xcoord, ycoord]:
+            figureHash.update(np.ascontiguousarray(coord, dtype=float).tobytes())
+    # __LOOPING THROUGH PLOTS___
+    fnames = []
+    drawnFrame, drawnBathy = 0, bathyIdx(0)  # what the figure currently shows
+    for tt in range(0, numrecs):
         try:
-            plt.savefig(os.path.join(prefix +'_{}.png'.format(time[tt].strftime("%Y%m%d%H%M"))))
+            fname = os.path.join(prefix +'_{}.png'.format(time[tt].strftime("%Y%m%d%H%M")))
         except AttributeError:  # what throws this error
-            plt.savefig(os.path.join(prefix + '_{}.png'.format(time[tt][0].strftime("%Y%m%d%H%M"))))
-        plt.close()
+            fname = os.path.join(prefix + '_{}.png'.format(time[tt][0].strftime("%Y%m%d%H%M")))
+        if renderCache is not None:
+            frameHash = figureHash.copy()
+            frameHash.update(frameTitle(tt).encode('utf-8'))  # a static field has no time in the key
+            frameData = [fieldpacket['field'][tt], bathyContour[bathyIdx(tt)]]
+            if 'directions' in kwargs:
+                frameData.extend([Us[tt], Vs[tt]])
+            for data in frameData:
+                frameHash.update(np.ascontiguousarray(np.ma.filled(data, np.nan), dtype=float).tobytes())
+            cached = os.path.join(renderCache, frameHash.hexdigest())
+            if _renderCacheHit(cached, fname if savePng == True else None, sink):
+                if savePng == True:
+                    fnames.append(fname)
+                continue
+        if tt != drawnFrame:  # update the artists that change in time
+            titleText.set_text(frameTitle(tt))
+            cont = drawField(tt, cont)
+            if 'directions' in kwargs:
+                Q.set_UVC(Us[tt], Vs[tt])
+            if bathyIdx(tt) != drawnBathy:  # only redraw bathy contours if they change
+                for artist in list(con.collections) + list(conLabels):
+                    artist.remove()
+                con = plt.contour(xcoord, ycoord, bathyContour[bathyIdx(tt)], levels=cont_labels, colors='k')
+                conLabels = plt.clabel(con, inline=True, fmt='%d')
+            drawnFrame, drawnBathy = tt, bathyIdx(tt)
+
+        frame = None
+        if sink is not None:
+            frame = sink.addFigure(fig)
+        if savePng == True:
+            fnames.append(fname)
+            fig.savefig(fname)
+        if renderCache is not None:
+            _renderCacheStore(cached, fname if savePng == True else None, frame)
+    plt.close(fig)
+
+    return fnames
+
+def _renderCacheHit(cached, fname=None, sink=None):
+    """Serves a frame from the render cache, the png is linked (or copied) to fname and the RGB frame is sent to
+    the sink.  It is only a hit if every requested output is in the cache
+
+    Args:
+      cached (str): cache entry path without extension
+      fname (str): png file name to put the image at (Default value = None)
+      sink (FrameSink): animation to add the frame to (Default value = None)
+
+    Returns:
+      True when the frame came from the cache
+
+    """
+    if (fname is not None and not os.path.isfile(cached + '.png')) or \
+            (sink is not None and not os.path.isfile(cached + '.npy')):
+        return False
+    if fname is not None:
+        if os.path.lexists(fname):
+            os.remove(fname)
+        try:
+            os.link(cached + '.png', fname)
+        except (OSError, AttributeError):  # different file system or no hard links
+            import shutil
+            shutil.copyfile(cached + '.png', fname)
+    if sink is not None:
+        sink.addFrame(np.load(cached + '.npy'))
+
+    return True
+
+def _renderCacheStore(cached, fname=None, frame=None):
+    """Puts a rendered frame into the render cache
+
+    Args:
+      cached (str): cache entry path without extension
+      fname (str): png that was written for the frame (Default value = None)
+      frame: RGB array of the frame sent to an animation (Default value = None)
 
-def plotWaveProfile(x, waveHs, bathyToPlot, fname):
+    Returns:
+      None
+
+    """
+    import shutil
+    if not os.path.isdir(os.path.dirname(cached)):
+        os.makedirs(os.path.dirname(cached))
+    # write to a temporary name then rename, so a worker never reads a half written entry
+    if fname is not None:
+        shutil.copyfile(fname, cached + '.png.{}'.format(os.getpid()))
+        os.rename(cached + '.png.{}'.format(os.getpid()), cached + '.png')
+    if frame is not None:
+        with open(cached + '.npy.{}'.format(os.getpid()), 'wb') as fid:
+            np.save(fid, frame)
+        os.rename(cached + '.npy.{}'.format(os.getpid()), cached + '.npy')
+
+def plotWaveProfile(x, waveHs, bathyToPlot, fname, sink=None):
     """This function will plot the Cross shore Wave profile at the FRF Xshore array
 
     Args:
@@ -455,7 +588,8 @@ def plotWaveProfile(x, waveHs, bathyToPlot, fname):
           of the profile of wave height to be tak en  default 142, is the nested grid of the xshore array
       bathyField: this is a 2 dimensional array of bathymetry with Positive up
       bathyToPlot: 
-      fname:  output file name
+      fname:  output file name, None skips the png
+      sink (FrameSink): streams the plot to this animation (see plottingTools.FrameSink) (Default value = None)
 
     Returns:
       a saved plot
@@ -473,16 +607,190 @@ def plotWaveProfile(x, waveHs, bathyToPlot, fname):
     ## setup
 
     # figure
+    plotWaveProfileAnimation(x, np.asarray(profileToPlot)[np.newaxis], bathyToPlot,
+                             fnames=None if fname is None else [fname], sink=sink)
+
+def plotWaveProfileAnimation(x, waveHs, bathyToPlot, fnames=None, sink=None):
+    """Animates the cross shore wave profile (see plotWaveProfile) for every time step on one figure, only the
+    wave height line is updated for each frame
+
+    Args:
+      x: the x coordinates of the plot
+      waveHs: 2 dimensional array of wave height [t, x] along the profile, e.g. Hs_field[:, yIndex, :]
+      bathyToPlot: the bathymetry depth along the profile
+      fnames (list): png file name for each time step, None skips the pngs (Default value = None)
+      sink (FrameSink): streams the frames to this animation (see plottingTools.FrameSink) (Default value = None)
+
+    Returns:
+      saved plots and/or frames in the sink
+
+    """
     fig, ax1 = plt.subplots(figsize=(8,4))
-    ax1.plot(x, profileToPlot, 'b', lw=3)
+    profileLine, = ax1.plot(x, waveHs[0], 'b', lw=3)
     ax1.set_ylabel('Wave Height [m]', color='b')
     ax2 = ax1.twinx()
     ax2.plot(x, bathyToPlot, 'brown', lw=2)
     ax2.set_ylabel('Bathymetry Depth[m] NAVD88', color='brown')
     plt.xlabel('STWAVE Cross Shore Position [m]')
     plt.title('Wave Height at the FRF Cross Shore Array')
-    plt.savefig(fname)
-    plt.close()
+    for tt in range(np.shape(waveHs)[0]):
+        if tt > 0:
+            profileLine.set_ydata(waveHs[tt])
+            ax1.relim()  # keep scaling the wave height axis to each profile
+            ax1.autoscale_view()
+        if sink is not None:
+            sink.addFigure(fig)
+        if fnames is not None:
+            fig.savefig(fnames[tt])
+    plt.close(fig)
+
+def plotSpatialFrames(jobs, nproc=None, workDir=None, renderCache=None):
+    """Renders the frames of many spatial animations across a pool of processes.  The (job, time step) frames are
+    split into chunks of consecutive time steps so each worker still reuses its canvas.  The 3-D arrays are written
+    once to .npy files and memory mapped by the workers, so only the time steps a worker renders are read and the
+    full fields are never pickled.
+
+    Args:
+      jobs (list): dictionaries, one per animation, either
+        contourpacket, fieldpacket, prefix, nested, model and (optional) directions:  arguments of
+            plotSpatialFieldData
+
+        x, waveHs [t, x], bathy and fnames (one per time step):  arguments of plotWaveProfileAnimation
+
+        and optionally
+        animation:  file name of an animation (e.g. gif) the frames are streamed to in time order
+
+        duration: seconds each frame of the animation is shown (Default value = 0.5)
+
+        savePng: write each frame to a png too (Default value = True without an animation, False with one)
+
+        raster: draw the field as a raster, see plotSpatialFieldData (Default value = False)
+
+      nproc (int): number of processes to render with, 1 renders in this process (Default value = number of cores)
+      workDir (str): where to put the memory mapped arrays, they are removed when done (Default value = None, the
+            system temp directory)
+      renderCache (str): directory of rendered frames to reuse, see plotSpatialFieldData (Default value = None)
+
+    Returns:
+      list of lists of the png file names written for each job in time order
+
+    """
+    import multiprocessing, tempfile, shutil
+    from plottingTools import FrameSink
+    if nproc is None:
+        nproc = multiprocessing.cpu_count()
+    tmpDir = tempfile.mkdtemp(prefix='cmtbFrames', dir=workDir)
+    frames = [[] for job in jobs]
+    sinks = {}
+    pool = None
+    try:
+        frameJobs = [_memmapFrameJob(job, os.path.join(tmpDir, str(jj))) for jj, job in enumerate(jobs)]
+        for frameJob in frameJobs:
+            frameJob['renderCache'] = renderCache
+        # about two chunks per process to balance the load, but keep the chunks long enough to reuse the canvas
+        totalFrames = sum([frameJob['numrecs'] for frameJob in frameJobs])
+        chunk = max(1, int(math.ceil(totalFrames / (2. * nproc))))
+        tasks = []
+        for jj, frameJob in enumerate(frameJobs):
+            for t0 in range(0, frameJob['numrecs'], chunk):
+                tasks.append((jj, t0, min(t0 + chunk, frameJob['numrecs']), frameJob))
+            if jobs[jj].get('animation') is not None:
+                sinks[jj] = FrameSink(jobs[jj]['animation'], duration=jobs[jj].get('duration', 0.5))
+        if nproc > 1 and len(tasks) > 1:
+            pool = multiprocessing.Pool(min(nproc, len(tasks)))
+            rendered = pool.imap(_renderFrameChunk, tasks)  # keeps the order of the tasks, so frames are in time
+        else:
+            rendered = (_renderFrameChunk(task) for task in tasks)
+        for task, (fnames, images) in zip(tasks, rendered):
+            frames[task[0]].extend(fnames)
+            for image in images:
+                sinks[task[0]].addFrame(image)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        for sink in sinks.values():
+            sink.close()
+        shutil.rmtree(tmpDir, ignore_errors=True)
+
+    return frames
+
+def _memmapFrameJob(job, base):
+    """Writes the 3-D arrays of a plotSpatialFrames job to .npy files, returns a small picklable description of the
+    job that the workers load the arrays back from with a memory map
+
+    Args:
+      job (dict): a job as described in plotSpatialFrames
+      base (str): path and file name base for the .npy files
+
+    Returns:
+      dict of the job with the arrays replaced by file names and the number of time steps
+
+    """
+    def dump(name, array):
+        fname = '{}_{}.npy'.format(base, name)
+        np.save(fname, np.ma.filled(np.ma.asarray(array, dtype=float), np.nan))  # masked values to nan
+        return fname
+
+    animate = job.get('animation') is not None
+    frameJob = {'animate': animate, 'savePng': job.get('savePng', not animate)}
+    if 'fieldpacket' in job:
+        field = job['fieldpacket']['field']
+        if job['fieldpacket'].get('static', False) == True:
+            field = field[:1]  # drawn once, see plotSpatialFieldData
+        numrecs = np.size(field, axis=0)
+        fieldpacket = dict((key, value) for key, value in job['fieldpacket'].items() if key != 'field')
+        if 'fieldRange' not in fieldpacket:  # keep all the chunks on the colorbar of the whole field
+            fieldpacket['fieldRange'] = (np.nanmin(field), np.nanmax(field))
+        bathy = job['contourpacket']['bathy']
+        if np.ndim(bathy) == 3 and (bathy.shape[0] != numrecs or numrecs == 1):
+            bathy = bathy[:1]  # static bathymetry
+        frameJob.update({'field': dump('field', field), 'bathy': dump('bathy', bathy), 'fieldpacket': fieldpacket,
+                         'prefix': job['prefix'], 'nested': job.get('nested', True),
+                         'model': job.get('model', 'STWAVE'), 'raster': job.get('raster', False),
+                         'numrecs': numrecs})
+        if job.get('directions') is not None:
+            frameJob['directions'] = dump('directions', job['directions'])
+    else:
+        frameJob.update({'waveHs': dump('waveHs', job['waveHs']), 'x': job['x'], 'bathyProfile': job['bathy'],
+                         'fnames': job.get('fnames'), 'numrecs': np.shape(job['waveHs'])[0]})
+
+    return frameJob
+
+def _renderFrameChunk(task):
+    """Renders the time steps t0 to t1 of one plotSpatialFrames job, this is what the pool workers run
+
+    Args:
+      task (tuple): (job index, t0, t1, job from _memmapFrameJob)
+
+    Returns:
+      tuple of the png file names written and the list of RGB frames for the animation
+
+    """
+    from plottingTools import FrameSink
+    jj, t0, t1, frameJob = task
+    sink = FrameSink() if frameJob['animate'] else None  # holds the frames in memory to send back
+    if 'fieldpacket' not in frameJob:
+        fnames = frameJob['fnames'][t0:t1] if frameJob['savePng'] == True else []
+        plotWaveProfileAnimation(frameJob['x'], np.load(frameJob['waveHs'], mmap_mode='r')[t0:t1],
+                                 frameJob['bathyProfile'], fnames=fnames if frameJob['savePng'] == True else None,
+                                 sink=sink)
+    else:
+        fieldpacket = dict(frameJob['fieldpacket'])
+        fieldpacket['field'] = np.load(frameJob['field'], mmap_mode='r')[t0:t1]
+        if frameJob['numrecs'] > 1:  # plotSpatialFieldData expects a single time for a single record
+            fieldpacket['time'] = fieldpacket['time'][t0] if t1 - t0 == 1 else fieldpacket['time'][t0:t1]
+        bathy = np.load(frameJob['bathy'], mmap_mode='r')
+        if np.ndim(bathy) == 3 and bathy.shape[0] > 1:
+            bathy = bathy[t0:t1]
+        kwargs = {}
+        if 'directions' in frameJob:
+            kwargs['directions'] = np.load(frameJob['directions'], mmap_mode='r')[t0:t1]
+        fnames = plotSpatialFieldData({'bathy': bathy}, fieldpacket, frameJob['prefix'], nested=frameJob['nested'],
+                                      model=frameJob['model'], sink=sink, savePng=frameJob['savePng'],
+                                      raster=frameJob['raster'], renderCache=frameJob['renderCache'], **kwargs)
+
+    return fnames, (sink.frames if sink is not None else [])
 
 def obs_V_mod_TS(ofname, p_dict, logo_path='ArchiveFolder/CHL_logo.png'):
     """This script basically just compares two time series, under
@@ -511,10 +819,100 @@ def obs_V_mod_TS(ofname, p_dict, logo_path='ArchiveFolder/CHL_logo.png'):
       the dictionary of the statistics calculated
 
     """
-    # this function plots observed data vs. model data for time-series data and computes stats for it.
+    return obs_V_mod_TS_batch([ofname], [p_dict], logo_path=logo_path)[0]
+
+def obs_V_mod_TS_batch(ofnames, p_dicts, logo_path='ArchiveFolder/CHL_logo.png'):
+    """Makes the obs_V_mod_TS plot for many comparisons (e.g. every parameter at a station, or every station) on one
+    figure that is reused, only the plotted data and text are redrawn for each comparison
+
+    Args:
+      ofnames (list): output file names, one for each of p_dicts
+      p_dicts (list): dictionaries of the comparisons as described in obs_V_mod_TS
+      logo_path: path to a small logo to put at the bottom of the figure (Default value = 'ArchiveFolder/CHL_logo.png')
+
+    Returns:
+      model vs. observation time-series plots
+      list of the dictionaries of the statistics calculated, one for each of p_dicts
+
+    """
+    assert len(ofnames) == len(p_dicts), 'there must be an output file name for each comparison'
+    for p_dict in p_dicts:  # check everything before drawing anything
+        _check_obs_mod_dict(p_dict)
+    ####################################################################################################################
+    # Begin Plot
+    ####################################################################################################################
+    fig = plt.figure(figsize=(10, 10))
+    ax1 = plt.subplot2grid((2, 2), (0, 0), colspan=2)  # time series
+    ax2 = plt.subplot2grid((2, 2), (1, 0), colspan=1)  # 1-1 comparison
+    ax3 = plt.subplot2grid((2, 2), (1, 1), colspan=1)  # stats text
+    try:
+        CHL_logo = image.imread(os.path.join(logo_path))
+        ax4 = fig.add_axes([0.78, 0.02, 0.20, 0.20], anchor='SE', zorder=-1)
+        ax4.imshow(CHL_logo)
+        ax4.axis('off')
+    except:
+        print 'Plot generated sans CHL Logo!'
+
+    statsList = []
+    for ofname, p_dict in zip(ofnames, p_dicts):
+        for ax in [ax1, ax2, ax3]:
+            ax.cla()
+        statsList.append(_draw_obs_mod_TS(fig, ax1, ax2, ax3, p_dict))
+        fig.savefig(ofname, dpi=80)
+    plt.close(fig)
+
+    return statsList
+
+def obs_V_mod_stats(p_dict):
+    """Computes the statistics of obs_V_mod_TS without any plotting
+
+    Args:
+      p_dict: dictionary as described in obs_V_mod_TS ('var_name', 'units' and 'p_title' are not needed), masked
+        values of obs or model are removed from both in place
+
+    Returns:
+      the dictionary of the statistics calculated
+
+    """
+    _check_obs_mod_dict(p_dict)
+    stats_dict = {}
+    if isinstance(p_dict['obs'], np.ma.masked_array) and ~p_dict['obs'].mask.any():
+        p_dict['obs'] = np.array(p_dict['obs'])
+    elif isinstance(p_dict['obs'], np.ma.masked_array):
+        p_dict['model'] = p_dict['model'][~p_dict['obs'].mask]
+        p_dict['obs'] =  np.array(p_dict['obs'][~p_dict['obs'].mask])
+    if isinstance(p_dict['model'], np.ma.masked_array) and ~p_dict['model'].mask.any():
+        p_dict['model'] = np.array(p_dict['model'])
+    elif isinstance(p_dict['model'], np.ma.masked_array):
+        p_dict['obs'] = p_dict['obs'][~p_dict['model'].mask]
+        p_dict['model'] =  np.array(p_dict['model'][~p_dict['model'].mask])
+    stats_dict = statsBryant(p_dict['obs'], p_dict['model'])
+    stats_dict['m_mean'] = np.nanmean(p_dict['model'])
+    stats_dict['o_mean'] = np.nanmean(p_dict['obs'])
+    # the below are calculated in statsBryant... this keeps all statistics calcs in the same place
+
+    return stats_dict
 
+def _check_obs_mod_dict(p_dict):
+    """makes sure the time, obs and model of an obs_V_mod_TS dictionary line up and the times are datetimes"""
     assert len(p_dict['time']) == len(p_dict['obs']) == len(p_dict['model']), "Your time, model, and observation arrays are not all the same length!"
-    assert sum([isinstance(p_dict['time'][ss], DT.datetime) for ss in range(0, len(p_dict['time']))]) == len(p_dict['time']), 'Your times input must be an array of datetimes!'
+    # only the types present need checking, not every time stamp
+    assert all([issubclass(timeType, DT.datetime) for timeType in set(map(type, p_dict['time']))]), 'Your times input must be an array of datetimes!'
+
+def _draw_obs_mod_TS(fig, ax1, ax2, ax3, p_dict):
+    """draws one obs_V_mod_TS comparison on the (cleared) axes of the figure
+
+    Args:
+      fig: the figure
+      ax1: time series axis
+      ax2: 1-1 comparison axis
+      ax3: statistics text axis
+      p_dict: dictionary as described in obs_V_mod_TS
+
+    Returns:
+      the dictionary of the statistics calculated
+
+    """
     # calculate total duration of data to pick ticks for Xaxis on time series plot
     totalDuration = p_dict['time'][-1] - p_dict['time'][0]
     if totalDuration.days > 365:  # this is a year +  of data
@@ -539,14 +937,9 @@ def obs_V_mod_TS(ofname, p_dict, logo_path='ArchiveFolder/CHL_logo.png'):
         minorTickLocator = mdates.HourLocator(1)
         xfmt = mdates.DateFormatter('%Y-%m-%d %H:%M')
 
-    ####################################################################################################################
-    # Begin Plot
-    ####################################################################################################################
-    fig = plt.figure(figsize=(10, 10))
     fig.suptitle(p_dict['p_title'], fontsize=18, fontweight='bold', verticalalignment='top')
 
     # time series
-    ax1 = plt.subplot2grid((2, 2), (0, 0), colspan=2)
     min_val = np.nanmin([np.nanmin(p_dict['obs']), np.nanmin(p_dict['model'])])
     max_val = np.nanmax([np.nanmax(p_dict['obs']), np.nanmax(p_dict['model'])])
 
@@ -581,11 +974,10 @@ def obs_V_mod_TS(ofname, p_dict, logo_path='ArchiveFolder/CHL_logo.png'):
         tick.label.set_fontsize(14)
 
     ax1.tick_params(labelsize=14)
-    plt.legend(bbox_to_anchor=(0., 1.02, 1., .102), loc=3, ncol=3, borderaxespad=0., fontsize=14)
+    ax1.legend(bbox_to_anchor=(0., 1.02, 1., .102), loc=3, ncol=3, borderaxespad=0., fontsize=14)
 
     # Now working on the 1-1 comparison subplot
     one_one = np.linspace(min_val - 0.05 * (max_val - min_val), max_val + 0.05 * (max_val - min_val), 100)
-    ax2 = plt.subplot2grid((2, 2), (1, 0), colspan=1)
     ax2.plot(one_one, one_one, 'k-', label='unity-line')
     if min_val < 0 and max_val > 0:
         ax2.plot(one_one, np.zeros(len(one_one)), 'k--')
@@ -600,24 +992,10 @@ def obs_V_mod_TS(ofname, p_dict, logo_path='ArchiveFolder/CHL_logo.png'):
     for tick in ax2.yaxis.get_major_ticks():
         tick.label.set_fontsize(14)
     ax2.tick_params(labelsize=14)
-    plt.legend(loc=0, ncol=1, borderaxespad=0.5, fontsize=14)
+    ax2.legend(loc=0, ncol=1, borderaxespad=0.5, fontsize=14)
 
     # stats and stats text
-    stats_dict = {}
-    if isinstance(p_dict['obs'], np.ma.masked_array) and ~p_dict['obs'].mask.any():
-        p_dict['obs'] = np.array(p_dict['obs'])
-    elif isinstance(p_dict['obs'], np.ma.masked_array):
-        p_dict['model'] = p_dict['model'][~p_dict['obs'].mask]
-        p_dict['obs'] =  np.array(p_dict['obs'][~p_dict['obs'].mask])
-    if isinstance(p_dict['model'], np.ma.masked_array) and ~p_dict['model'].mask.any():
-        p_dict['model'] = np.array(p_dict['model'])
-    elif isinstance(p_dict['model'], np.ma.masked_array):
-        p_dict['obs'] = p_dict['obs'][~p_dict['model'].mask]
-        p_dict['model'] =  np.array(p_dict['model'][~p_dict['model'].mask])
-    stats_dict = statsBryant(p_dict['obs'], p_dict['model'])
-    stats_dict['m_mean'] = np.nanmean(p_dict['model'])
-    stats_dict['o_mean'] = np.nanmean(p_dict['obs'])
-    # the below are calculated in statsBryant... this keeps all statistics calcs in the same place
+    stats_dict = obs_V_mod_stats(p_dict)
 
     header_str = '%s Comparison \nModel to Observations:' % (p_dict['var_name'])
     m_mean_str = '\n Model Mean $=%s$ $(%s)$' % ("{0:.2f}".format(stats_dict['m_mean']), p_dict['units'])
@@ -630,19 +1008,6 @@ def obs_V_mod_TS(ofname, p_dict, logo_path='ArchiveFolder/CHL_logo.png'):
     RMSE_Norm_str = u'\n %%RMSE $=%s$ $(%s)$' % ("{0:.2f}".format(stats_dict['RMSEnorm']), p_dict['units'])
     num_String = '\n Number of samples $= %s$' %len(stats_dict['residuals'])
     plot_str = m_mean_str + o_mean_str + bias_str + RMSE_str + SI_str + sym_slp_str + corr_coef_str + RMSE_Norm_str + num_String
-    ax3 = plt.subplot2grid((2, 2), (1, 1), colspan=1)
-    ax3.axis('off')
-    ax4 = ax3.twinx()
-    ax3.axis('off')
-
-    try:
-        ax4.axis('off')
-        CHL_logo = image.imread(os.path.join(logo_path))
-        ax4 = fig.add_axes([0.78, 0.02, 0.20, 0.20], anchor='SE', zorder=-1)
-        ax4.imshow(CHL_logo)
-        ax4.axis('off')
-    except:
-        print 'Plot generated sans CHL Logo!'
 
     ax3.axis('off')
     ax3.text(0.01, 0.99, header_str, verticalalignment='top', horizontalalignment='left', color='black', fontsize=18,
@@ -651,8 +1016,7 @@ def obs_V_mod_TS(ofname, p_dict, logo_path='ArchiveFolder/CHL_logo.png'):
 
     fig.subplots_adjust(wspace=0.4, hspace=0.1)
     fig.tight_layout(pad=1, h_pad=2.5, w_pad=1, rect=[0.0, 0.0, 1.0, 0.925])
-    fig.savefig(ofname, dpi=80)
-    plt.close()
+
     return stats_dict
 
 def bc_plot(ofname, p_dict):
@@ -0,0 +1,150 @@
+"""
+Background plotting for the workflows, the analyze routines write their data products and hand the plots to a
+PlotQueue, so the driver can move on to the next simulation window while the figures are made.  Plot failures are
+collected and reported, they don't fail the window.
+"""
+import multiprocessing, traceback
+
+
+def _runPlotJob(name, func, args, kwargs, errors):
+    """runs one plot job in the background process, any exception is sent back through the errors queue"""
+    try:
+        func(*args, **kwargs)
+    except Exception:
+        errors.put((name, traceback.format_exc()))
+        raise SystemExit(1)
+
+
+class PlotQueue(object):
+    """Runs plot jobs in background processes.  Each job is a forked process, so it gets the arrays it plots by
+    reference (copy on write) at the moment it is submitted rather than pickling them, and it may start its own pool
+    (e.g. operationalPlots.plotSpatialFrames).
+
+    Examples:
+        queue = PlotQueue(maxJobs=2)
+        queue.submit('Hs field 2018-01-01', oP.plotSpatialFrames, plotJobs)
+        ... write the netCDF files, next window
+        failures = queue.report()
+
+    """
+    def __init__(self, maxJobs=2):
+        """
+        Args:
+            maxJobs (int): number of plot jobs to run at once, submit waits for a free slot (Default value = 2)
+
+        """
+        self.maxJobs = maxJobs
+        self.running = []  # (name, process)
+        self.finished = []  # names of the jobs that finished
+        self.failures = {}  # job name: traceback (or exit code) of the jobs that failed
+        self.errors = multiprocessing.Queue()
+
+    def submit(self, name, func, *args, **kwargs):
+        """Starts func(*args, **kwargs) in the background, waits for a free slot first if maxJobs are running
+
+        Args:
+            name (str): name of the job for the report
+            func: the plotting function
+            *args: arguments of func
+            **kwargs: keyword arguments of func
+
+        Returns:
+            None
+
+        """
+        while len(self.poll()) >= self.maxJobs:
+            self.running[0][1].join(1)
+        process = multiprocessing.Process(target=_runPlotJob, args=(name, func, args, kwargs, self.errors))
+        process.start()
+        self.running.append((name, process))
+
+    def poll(self):
+        """Collects the jobs that have finished
+
+        Returns:
+            list of the names of the jobs still running
+
+        """
+        self._drainErrors()
+        stillRunning = []
+        for name, process in self.running:
+            if process.is_alive():
+                stillRunning.append((name, process))
+                continue
+            process.join()
+            self.finished.append(name)
+            if process.exitcode != 0 and name not in self.failures:
+                self._drainErrors()
+                self.failures.setdefault(name, 'exit code {}'.format(process.exitcode))
+        self.running = stillRunning
+
+        return [name for name, process in self.running]
+
+    def wait(self):
+        """Waits for every submitted job to finish"""
+        while len(self.poll()) > 0:
+            self.running[0][1].join(1)
+
+    def report(self, wait=True):
+        """Prints a completion report of the plot jobs
+
+        Args:
+            wait (bool): wait for the running jobs first (Default value = True)
+
+        Returns:
+            dict of job name: error message of the jobs that failed
+
+        """
+        if wait == True:
+            self.wait()
+        running = self.poll()
+        print('Plot jobs: {} finished, {} failed, {} running'.format(len(self.finished), len(self.failures),
+                                                                    len(running)))
+        for name in sorted(self.failures):
+            print('  << PLOT FAILED >> {}\n{}'.format(name, self.failures[name]))
+
+        return dict(self.failures)
+
+    def _drainErrors(self):
+        while True:
+            try:
+                name, message = self.errors.get_nowait()
+            except Exception:  # Queue.Empty
+                break
+            self.failures[name] = message
+
+
+def workersPerJob(queue, nproc=None):
+    """Number of processes a plot job may render with (e.g. the nproc of operationalPlots.plotSpatialFrames).  The
+    jobs of a queue run at the same time, so they split the cores between them rather than each taking all of them
+
+    Args:
+        queue (PlotQueue): the background plotting queue or None
+        nproc (int): processes asked for, used as is when given (Default value = None)
+
+    Returns:
+        nproc, None (all cores) without a queue, otherwise the cores divided by the queue's maxJobs
+
+    """
+    if nproc is not None or queue is None:
+        return nproc
+    return max(1, multiprocessing.cpu_count() // queue.maxJobs)
+
+
+def dispatch(queue, name, func, *args, **kwargs):
+    """Hands a plot to the queue when there is one, otherwise makes it right away (and errors are raised as usual)
+
+    Args:
+        queue (PlotQueue): the background plotting queue or None
+        name (str): name of the job for the report
+        func: the plotting function
+        *args: arguments of func
+        **kwargs: keyword arguments of func
+
+    Returns:
+        None with a queue, otherwise what func returns
+
+    """
+    if queue is None:
+        return func(*args, **kwargs)
+    queue.submit(name, func, *args, **kwargs)
@@ -159,4 +159,134 @@ def gradient_fill(x, y, fill_color=None, ax=None, zfunc=False, **kwargs):
     ax.add_patch(clip_path)
     im.set_clip_path(clip_path)
     ax.autoscale(True)
-    return line, im
\ No newline at end of file
+    return line, im
+
+class FrameSink(object):
+    """Receives rendered matplotlib canvases and streams them into an animation (gif, or any format imageio can
+    write from the file extension) so no intermediate png is written or read back.  Without a file name the frames are
+    held in memory as RGB arrays (frames) to be handed to another sink, e.g. from a worker process.
+
+    Examples:
+        with FrameSink('Hs.gif') as sink:
+            for tt in range(numrecs):
+                ... update the figure
+                sink.addFigure(fig)
+
+    """
+    def __init__(self, fname=None, duration=0.5):
+        """
+        Args:
+            fname (str): animation file name, None keeps the frames in memory (Default value = None)
+            duration (float): seconds each frame is shown (Default value = 0.5)
+
+        """
+        self.fname = fname
+        self.frames = []
+        self.writer = None
+        if fname is not None:
+            import imageio
+            self.writer = imageio.get_writer(fname, mode='I', duration=duration)
+
+    def addFigure(self, fig):
+        """Renders the figure canvas and adds it as the next frame
+
+        Args:
+            fig: matplotlib figure drawn on an Agg canvas
+
+        Returns:
+            the RGB array of the frame
+
+        """
+        fig.canvas.draw()
+        width, height = fig.canvas.get_width_height()
+        frame = np.frombuffer(fig.canvas.tostring_rgb(), dtype=np.uint8).reshape(height, width, 3)
+        self.addFrame(frame)
+
+        return frame
+
+    def addFrame(self, frame):
+        """Adds an RGB array [height, width, 3] as the next frame
+
+        Args:
+            frame: RGB array of the image
+
+        Returns:
+            None
+
+        """
+        if self.writer is None:
+            self.frames.append(frame)
+        else:
+            self.writer.append_data(frame)
+
+    def close(self):
+        """finishes the animation file"""
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+def bilinearWeights(coord, targets):
+    """Finds the bilinear interpolation index and weight of each target location along a (monotonic) coordinate
+
+    Args:
+        coord: 1-D array of grid coordinates, increasing or decreasing
+        targets: 1-D array of locations to interpolate to, inside the range of coord
+
+    Returns:
+        idx (array): index of the grid point below each target
+        weight (array): weight of the grid point above (idx + 1) each target, 1 - weight goes to idx
+
+    """
+    coord = np.asarray(coord, dtype=float)
+    if coord[0] > coord[-1]:  # np.interp needs increasing coordinates
+        position = (coord.size - 1) - np.interp(targets, coord[::-1], np.arange(coord.size))
+    else:
+        position = np.interp(targets, coord, np.arange(coord.size))
+    idx = np.clip(np.floor(position).astype(int), 0, coord.size - 2)
+
+    return idx, position - idx
+
+def bilinearResample(field, xcoord, ycoord, x, y):
+    """Resamples a [t, y, x] field onto the lattice of x, y locations for all time steps at once, the indices and
+    weights are computed once for the lattice and applied to every time step
+
+    Args:
+        field: array of [t, ycoord, xcoord] (or [ycoord, xcoord]) values, nan's only spread to neighbouring points
+        xcoord: 1-D x coordinates of the field
+        ycoord: 1-D y coordinates of the field
+        x: 1-D x locations of the lattice
+        y: 1-D y locations of the lattice
+
+    Returns:
+        array of [t, y, x] (or [y, x]) resampled values
+
+    """
+    ix, wx = bilinearWeights(xcoord, x)
+    iy, wy = bilinearWeights(ycoord, y)
+    iy, wy, ix, wx = iy[:, np.newaxis], wy[:, np.newaxis], ix[np.newaxis, :], wx[np.newaxis, :]
+    field = np.asarray(field)
+
+    return (1 - wy) * ((1 - wx) * field[..., iy, ix] + wx * field[..., iy, ix + 1]) + \
+           wy * ((1 - wx) * field[..., iy + 1, ix] + wx * field[..., iy + 1, ix + 1])
+
+def cellEdges(coord):
+    """Finds the cell edges around each (cell centered) coordinate of a regular grid, to draw a field with pcolormesh
+    without dropping the last row and column
+
+    Args:
+        coord: 1-D array of cell center coordinates
+
+    Returns:
+        1-D array of the cell edges, one longer than coord
+
+    """
+    coord = np.asarray(coord, dtype=float)
+    middles = (coord[1:] + coord[:-1]) / 2.
+
+    return np.concatenate(([2 * coord[0] - middles[0]], middles, [2 * coord[-1] - middles[-1]]))